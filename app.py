@@ -1,39 +1,62 @@
 import sys, os
+import re
+import time
+import uuid
+import asyncio
 import pandas as pd
 
-import certifi
 from dotenv import load_dotenv
 
-import pymongo
-
 from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
 from machine_predictive_maintenance.logging.logger import logging
-from machine_predictive_maintenance.pipeline.training_pipeline import TrainingPipeline
 
-from machine_predictive_maintenance.utils.main_utils.utils import load_object, processing_test_data
-from machine_predictive_maintenance.utils.ml_utils.model.estimator import MachinePredictiveModel
+from machine_predictive_maintenance.utils.main_utils.utils import processing_test_data, read_yaml_file
+from machine_predictive_maintenance.utils.main_utils.schema_validator import SchemaValidator, VALIDATION_ERRORS_COLUMN
+from machine_predictive_maintenance.utils.main_utils.dtype_plan import DtypePlan
+from machine_predictive_maintenance.utils.main_utils.feature_engine import RollingFeatureEngine
+from machine_predictive_maintenance.utils.ml_utils.model.model_store import ModelStore
+from machine_predictive_maintenance.utils.ml_utils.model.prediction_cache import PredictionCache
+from machine_predictive_maintenance.monitoring.metrics import (
+    REGISTRY,
+    REQUEST_COUNT,
+    REQUEST_LATENCY,
+    ROWS_SCORED,
+    BATCH_SIZE,
+    CSV_PARSE_TIME,
+    PREPROCESSING_TIME,
+    MODEL_PREDICT_TIME,
+    RESPONSE_RENDER_TIME,
+)
 
-from machine_predictive_maintenance.constant.training_pipeline import DATA_INGESTION_DATABASE_NAME
-from machine_predictive_maintenance.constant.training_pipeline import DATA_INGESTION_COLLECTION_NAME
 from machine_predictive_maintenance.constant.training_pipeline import SCHEMA_FILE_PATH
+from machine_predictive_maintenance.constant.training_pipeline import PREDICTION_INVALID_DIR, PREDICTION_OPTIONAL_COLUMNS
+from machine_predictive_maintenance.constant.training_pipeline import (
+    PREDICTION_OUTPUT_DIR,
+    PREDICTION_HTML_PAGE_SIZE,
+    PREDICTION_HTML_MAX_PAGE_SIZE,
+)
+from machine_predictive_maintenance.entity.config_entity import ServingConfig
+from machine_predictive_maintenance.serving.prefork_server import PreforkServer
+from machine_predictive_maintenance.serving.async_mongo import AsyncMongoClient
+from machine_predictive_maintenance.serving.prediction_sink import BufferedPredictionSink, to_prediction_records
+from machine_predictive_maintenance.serving.response_rendering import (
+    RESPONSE_MEDIA_TYPES,
+    negotiate_format,
+    render_table,
+    arrow_available,
+    page_bounds,
+    write_prediction_output,
+)
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, File, UploadFile, Request
+from fastapi import FastAPI, File, UploadFile, Request, BackgroundTasks, HTTPException
 from uvicorn import run as app_run
-from fastapi.responses import Response
+from fastapi.responses import Response, PlainTextResponse, FileResponse
 from starlette.responses import RedirectResponse
 
 
-ca = certifi.where()
 load_dotenv()
 
-mongo_db_url = os.getenv("MONGO_DB_URL")
-
-client = pymongo.MongoClient(mongo_db_url, tlsCAFile=ca)
-
-database = client[DATA_INGESTION_DATABASE_NAME]
-collection = database[DATA_INGESTION_COLLECTION_NAME]
-
 app = FastAPI()
 origins = ["*"]
 
@@ -48,6 +71,96 @@ app.add_middleware(
 from fastapi.templating import Jinja2Templates
 templates = Jinja2Templates(directory="./templates")
 
+model_store = ModelStore()
+schema_validator = SchemaValidator.from_yaml(SCHEMA_FILE_PATH)
+dtype_plan = DtypePlan.from_yaml(SCHEMA_FILE_PATH)
+schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+# per-machine history across requests, bounded by FEATURE_ENGINE_MAX_MACHINES
+feature_engine = RollingFeatureEngine.from_schema(schema_config)
+prediction_cache = PredictionCache()
+mongo_client = AsyncMongoClient()
+prediction_sink = BufferedPredictionSink(mongo_client)
+
+
+async def poll_model_updates():
+
+    """
+    Periodically checks S3 for a newer model version and hot-swaps it in.
+    """
+
+    interval = model_store.model_puller_config.poll_interval_seconds
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(model_store.refresh)
+        except Exception as e:
+            logging.info(f"Model refresh failed: {e}")
+
+
+@app.on_event("startup")
+async def load_model():
+
+    """
+    Loads the latest model before serving and starts the background poller.
+    """
+
+    # forked workers inherit the model already loaded by the prefork parent
+    await asyncio.to_thread(model_store.get)
+    if model_store.model_puller_config.poll_interval_seconds > 0:
+        asyncio.create_task(poll_model_updates())
+    # the motor client binds to this worker's event loop, so it is opened here rather than at import
+    mongo_client.connect()
+    prediction_sink.start()
+
+
+@app.on_event("shutdown")
+async def close_connections():
+
+    """
+    Writes out buffered predictions and closes the Mongo connection pool.
+    """
+
+    await prediction_sink.stop()
+    mongo_client.close()
+
+
+def current_model_version():
+    return model_store.current.version if model_store.current is not None else "none"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+
+    """
+    Counts every request and records its latency by route and model version.
+    """
+
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        model_version = current_model_version()
+        REQUEST_COUNT.inc(route_path, request.method, status, model_version)
+        REQUEST_LATENCY.observe(route_path, request.method, model_version, value=time.perf_counter() - start)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_route():
+
+    """
+    Exposes serving metrics in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Counters, gauges and histograms, summed over the workers under the prefork server.
+    """
+
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 
 @app.get("/", tags=["authentication"])
 async def index():
@@ -74,59 +187,244 @@ async def train_route():
     """
 
     try:
+        # the training stack (components, imblearn, scipy, mlflow) is only loaded once training is requested
+        from machine_predictive_maintenance.pipeline.training_pipeline import TrainingPipeline
+
         train_pipeline = TrainingPipeline()
-        train_pipeline.run_pipeline()
+        # the pipeline uses blocking I/O throughout; keep it off the event loop
+        await asyncio.to_thread(train_pipeline.run_pipeline)
         return Response("Training is successful")
     
     except Exception as e:
         raise MachinePredictiveMaintenanceException(e, sys)
 
+@app.get("/machines/{product_id}/readings")
+async def machine_readings_route(product_id: str, limit: int = None):
+
+    """
+    Returns the latest stored sensor readings of a machine, newest first.
+
+    Args:
+        product_id (str): The machine's ``Product ID``.
+        limit (int, optional): Maximum number of readings.
+
+    Returns:
+        list: Reading documents.
+    """
+
+    try:
+        return await mongo_client.find_machine_history(product_id, limit)
+    except Exception as e:
+        raise MachinePredictiveMaintenanceException(e, sys)
+
+
+async def record_predictions(df: pd.DataFrame, request_id: str, model_version: str) -> None:
+
+    """
+    Queues a request's predictions for the buffered Mongo write-back; runs after the response.
+    """
+
+    try:
+        records = await asyncio.to_thread(to_prediction_records, df, request_id=request_id, model_version=model_version)
+        prediction_sink.add(records)
+    except Exception as e:
+        logging.info(f"Could not queue predictions of request {request_id}: {e}")
+
+
+def resolve_response_format(request: Request, requested_format: str = None) -> str:
+
+    """
+    Negotiates the response format, rejecting requests that accept none of the supported ones.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        requested_format (str, optional): The ``format`` query parameter.
+
+    Returns:
+        str: ``html``, ``json``, ``csv`` or ``arrow``.
+    """
+
+    response_format = negotiate_format(request.headers.get("accept", ""), requested_format)
+    if response_format is None:
+        raise HTTPException(status_code=406, detail=f"Supported formats: {', '.join(RESPONSE_MEDIA_TYPES)}")
+    if response_format == "arrow" and not arrow_available():
+        raise HTTPException(status_code=406, detail="Arrow responses need pyarrow installed on the server")
+    return response_format
+
+
+def prediction_response(request: Request, df: pd.DataFrame, response_format: str, request_id: str,
+                        page: int, page_size: int, first_row: int = 0, total_rows: int = None,
+                        has_next: bool = None) -> Response:
+
+    """
+    Renders predictions in the negotiated format. HTML shows a single page of rows.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        df (pd.DataFrame): All predictions, or just the requested page for HTML.
+        response_format (str): Negotiated format.
+        request_id (str): Identifier of the persisted prediction output.
+        page (int): Page number, starting at 1.
+        page_size (int): Rows per HTML page.
+        first_row (int, optional): Offset of ``df``'s first row within the full result.
+        total_rows (int, optional): Total rows when known.
+        has_next (bool, optional): Whether another page follows, if not derivable from ``total_rows``.
+
+    Returns:
+        Response: The rendered response.
+    """
+
+    if response_format != "html":
+        return Response(content=render_table(df, response_format), media_type=RESPONSE_MEDIA_TYPES[response_format],
+                        headers={"X-Request-ID": request_id})
+
+    page_df = df.iloc[:page_size]
+    if has_next is None:
+        has_next = total_rows is not None and first_row + len(page_df) < total_rows
+
+    table_html = page_df.to_html(classes='table table-striped')
+    return templates.TemplateResponse("table.html", {
+        "request": request,
+        "table": table_html,
+        "request_id": request_id,
+        "page": page,
+        "page_size": page_size,
+        "first_row": first_row + 1 if len(page_df) else 0,
+        "last_row": first_row + len(page_df),
+        "total_rows": total_rows,
+        "has_next": has_next,
+    }, headers={"X-Request-ID": request_id})
+
+
 @app.post("/predict")
-async def predict_route(request: Request, file: UploadFile=File(...)):
+async def predict_route(request: Request, background_tasks: BackgroundTasks, file: UploadFile=File(...),
+                        format: str = None, page_size: int = PREDICTION_HTML_PAGE_SIZE):
 
     """
     Accepts a CSV file, preprocesses the data, predicts using the trained model, 
-    and returns the predictions in an HTML table.
+    and returns the predictions in the format the client asked for.
+
+    The response is JSON, CSV or an Arrow stream when requested through the ``Accept`` header
+    or the ``format`` query parameter, and otherwise the first page of an HTML table. The full
+    result is written to ``prediction_output/<request_id>.csv`` after the response is sent and
+    can be paged through or downloaded from ``/predictions/<request_id>``.
 
     Args:
         request (Request): The incoming HTTP request.
+        background_tasks (BackgroundTasks): Runs the output and quarantine file writes after responding.
         file (UploadFile): The uploaded CSV file.
+        format (str, optional): ``html``, ``json``, ``csv`` or ``arrow``; overrides ``Accept``.
+        page_size (int, optional): Rows on the HTML page.
 
     Returns:
-        TemplateResponse: Rendered HTML table containing the predictions.
+        Response: The predictions in the negotiated format.
 
     """
 
+    response_format = resolve_response_format(request, format)
+
     try:
-        df=pd.read_csv(file.file)
-        #print(df)
-        preprocesor=load_object("final_model/preprocessor.pkl")
-        final_model=load_object("final_model/model.pkl")
+        loaded_model = model_store.get()
+        labels = ("/predict", loaded_model.version)
 
-        processing_data = processing_test_data(data= df, schema_file= SCHEMA_FILE_PATH, preprocessor= preprocesor)
+        with CSV_PARSE_TIME.time(*labels):
+            df=dtype_plan.read_csv(file.file)
 
-        predictive_model = MachinePredictiveModel(model= final_model)
-        print(processing_data.iloc[0])
-        
-        y_pred = predictive_model.predict(processing_data)
-        print(y_pred)
-        
-        df['predicted_column'] = y_pred
-        print(df['predicted_column'])
-        
-        #df['predicted_column'].replace(-1, 0)
-        #return df.to_json()
-        df.to_csv('prediction_output/output.csv')
-        table_html = df.to_html(classes='table table-striped')
-        #print(table_html)
+        validation = schema_validator.validate(df, optional_columns=PREDICTION_OPTIONAL_COLUMNS)
+        if not validation.is_valid:
+            # written after the response, off the event loop, like the prediction output
+            background_tasks.add_task(schema_validator.quarantine, validation,
+                                      os.path.join(PREDICTION_INVALID_DIR, f"{uuid.uuid4().hex}.csv"))
+        valid_df = validation.valid_rows()
+
+        df['predicted_column'] = None
+        if len(valid_df) > 0:
+            with PREPROCESSING_TIME.time(*labels):
+                feature_engine.reset_for(loaded_model.version)
+                processing_data = processing_test_data(data= valid_df, schema_file= SCHEMA_FILE_PATH, preprocessor= loaded_model.preprocessor,
+                                                       feature_engine= feature_engine)
+
+            with MODEL_PREDICT_TIME.time(*labels):
+                y_pred = prediction_cache.predict(loaded_model, processing_data)
 
-        return templates.TemplateResponse("table.html", {"request": request, "table": table_html})
+            df.loc[valid_df.index, 'predicted_column'] = y_pred
+
+        ROWS_SCORED.inc(*labels, amount=len(valid_df))
+        BATCH_SIZE.observe(*labels, value=len(df))
+        
+        if not validation.is_valid:
+            df[VALIDATION_ERRORS_COLUMN] = validation.invalid_rows()[VALIDATION_ERRORS_COLUMN]
+
+        request_id = uuid.uuid4().hex
+        background_tasks.add_task(write_prediction_output, df, os.path.join(PREDICTION_OUTPUT_DIR, f"{request_id}.csv"))
+        if prediction_sink.enabled:
+            background_tasks.add_task(record_predictions, df, request_id, loaded_model.version)
+
+        _, page_size, _ = page_bounds(1, page_size, PREDICTION_HTML_MAX_PAGE_SIZE)
+        with RESPONSE_RENDER_TIME.time(*labels):
+            return prediction_response(request, df, response_format, request_id,
+                                       page=1, page_size=page_size, total_rows=len(df))
     
     except Exception as e:
         raise MachinePredictiveMaintenanceException(e, sys)
 
 
+@app.get("/predictions/{request_id}")
+async def predictions_route(request: Request, request_id: str, format: str = None,
+                            page: int = 1, page_size: int = PREDICTION_HTML_PAGE_SIZE):
+
+    """
+    Serves the stored output of an earlier ``/predict`` call, one HTML page at a time or whole
+    as JSON, CSV or Arrow.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        request_id (str): The ``X-Request-ID`` returned by ``/predict``.
+        format (str, optional): ``html``, ``json``, ``csv`` or ``arrow``; overrides ``Accept``.
+        page (int, optional): HTML page number, starting at 1.
+        page_size (int, optional): Rows per HTML page.
+
+    Returns:
+        Response: The stored predictions in the negotiated format.
+    """
+
+    response_format = resolve_response_format(request, format)
+
+    if not re.fullmatch(r"[0-9a-f]{32}", request_id):
+        raise HTTPException(status_code=404, detail="Unknown prediction request")
+    file_path = os.path.join(PREDICTION_OUTPUT_DIR, f"{request_id}.csv")
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="Unknown prediction request")
+
+    try:
+        if response_format == "csv":
+            return FileResponse(file_path, media_type=RESPONSE_MEDIA_TYPES["csv"], headers={"X-Request-ID": request_id})
+
+        if response_format != "html":
+            return prediction_response(request, pd.read_csv(file_path), response_format, request_id,
+                                       page=1, page_size=page_size)
+
+        # read just this page (plus one row to know whether another page follows)
+        page, page_size, first_row = page_bounds(page, page_size, PREDICTION_HTML_MAX_PAGE_SIZE)
+        page_df = pd.read_csv(file_path, skiprows=range(1, first_row + 1), nrows=page_size + 1)
+        page_df.index = range(first_row, first_row + len(page_df))
+        return prediction_response(request, page_df, response_format, request_id, page=page, page_size=page_size,
+                                   first_row=first_row, has_next=len(page_df) > page_size)
+
+    except Exception as e:
+        raise MachinePredictiveMaintenanceException(e, sys)
+
+
     
 if __name__== "__main__":
-    app_run(app, host="0.0.0.0", port = 8080)
+    serving_config = ServingConfig()
+    if serving_config.workers > 1 and RollingFeatureEngine.is_enabled(schema_config):
+        # each worker would keep its own history and see only the readings routed to it, so
+        # a machine's features would depend on which worker accepted the connection
+        logging.info("Rolling features keep per-machine history in the serving process, serving with one worker")
+        serving_config.workers = 1
+    if serving_config.workers > 1 and hasattr(os, "fork"):
+        PreforkServer(app=app, model_store=model_store, serving_config=serving_config).run()
+    else:
+        app_run(app, host=serving_config.host, port = serving_config.port)
     
\ No newline at end of file
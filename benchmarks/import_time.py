@@ -0,0 +1,168 @@
+"""
+Import-time benchmark for the app and CLI entry points.
+
+Each entry point is imported in a fresh interpreter, several times, and the median wall time
+is reported together with the slowest modules from ``python -X importtime``. The serving
+entry point must not load the training stack; if any of ``TRAINING_ONLY_MODULES`` show up
+after ``import app`` the run fails regardless of timing.
+
+    python -m benchmarks.import_time --output import_time.json
+    python -m benchmarks.import_time --compare import_time.json --threshold 0.2
+
+Run from the repository root so ``app.py`` and ``data_schema/`` resolve.
+"""
+
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+
+ENTRY_POINTS = {
+    "app": "import app",
+    "batch_prediction": "import machine_predictive_maintenance.pipeline.batch_prediction",
+    "streaming_scorer": "import machine_predictive_maintenance.streaming.scorer",
+    "training_pipeline": "import machine_predictive_maintenance.pipeline.training_pipeline",
+}
+
+# modules the serving path must only load once /train is called
+TRAINING_ONLY_MODULES = (
+    "mlflow",
+    "imblearn",
+    "machine_predictive_maintenance.pipeline.training_pipeline",
+    "machine_predictive_maintenance.components.data_ingestion",
+    "machine_predictive_maintenance.components.data_validation",
+    "machine_predictive_maintenance.components.data_transformation",
+    "machine_predictive_maintenance.components.model_trainer",
+    "machine_predictive_maintenance.components.chunked_model_trainer",
+)
+SERVING_ENTRY_POINTS = ("app", "batch_prediction", "streaming_scorer")
+
+
+def time_import(statement: str) -> float:
+
+    """
+    Imports a module in a fresh interpreter and returns the wall time of the import alone.
+    """
+
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; "
+        "print(time.perf_counter() - start)"
+    )
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def loaded_modules(statement: str) -> set:
+    code = f"import sys, json; {statement}; print(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return set(json.loads(output.strip().splitlines()[-1]))
+
+
+def slowest_imports(statement: str, top: int = 15) -> list:
+
+    """
+    Returns the modules with the largest cumulative import time from ``-X importtime``.
+    """
+
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        rows.append({"module": module.strip(), "self_ms": int(self_us) / 1000,
+                     "cumulative_ms": int(cumulative_us) / 1000})
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+
+def run(entry_points: list, repeat: int) -> dict:
+    results = []
+    for name in entry_points:
+        statement = ENTRY_POINTS[name]
+        timings = [time_import(statement) for _ in range(repeat)]
+        result = {
+            "name": name,
+            "repeat": repeat,
+            "median_s": round(statistics.median(timings), 4),
+            "min_s": round(min(timings), 4),
+            "slowest_imports": slowest_imports(statement),
+        }
+        if name in SERVING_ENTRY_POINTS:
+            modules = loaded_modules(statement)
+            result["training_modules_loaded"] = sorted(
+                module for module in TRAINING_ONLY_MODULES if module in modules
+            )
+        results.append(result)
+        print(f"{name:<20} median {result['median_s']:.3f}s  min {result['min_s']:.3f}s")
+
+    return {"python": platform.python_version(), "results": results}
+
+
+def find_regressions(current: dict, baseline: dict, threshold: float) -> list:
+
+    """
+    Lists entry points that got slower than the baseline or load training-only modules.
+
+    Args:
+        current (dict): Results of this run.
+        baseline (dict, optional): Results of a previous run.
+        threshold (float): Allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        list: Descriptions of the failures.
+    """
+
+    failures = []
+    baseline_by_name = {result["name"]: result for result in (baseline or {}).get("results", [])}
+    for result in current["results"]:
+        if result.get("training_modules_loaded"):
+            failures.append(f"{result['name']} imports training-only modules: {result['training_modules_loaded']}")
+
+        base = baseline_by_name.get(result["name"])
+        if base and base["median_s"]:
+            change = result["median_s"] / base["median_s"] - 1
+            if change > threshold:
+                failures.append(f"{result['name']}: {base['median_s']:.3f}s -> {result['median_s']:.3f}s ({change:+.0%})")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entry-points", default=",".join(ENTRY_POINTS), help="Comma separated entry points.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per entry point.")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown before failing.")
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.entry_points.split(",") if name.strip()]
+    unknown = set(selected) - set(ENTRY_POINTS)
+    if unknown:
+        parser.error(f"Unknown entry points: {sorted(unknown)}")
+
+    report = run(selected, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(report, file_obj, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file_obj:
+            baseline = json.load(file_obj)
+
+    failures = find_regressions(report, baseline, args.threshold)
+    if failures:
+        print(f"{len(failures)} import-time check(s) failed:")
+        for line in failures:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
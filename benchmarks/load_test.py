@@ -0,0 +1,272 @@
+"""
+Load-test harness for the FastAPI service.
+
+Boots ``app.py`` in-process behind uvicorn with a local Mongo stand-in (``mongomock`` by
+default, or any local ``mongod`` via ``--mongo-url``) and replays sensor traffic against
+``/predict``. Traffic is either synthetic or replayed from recorded CSV files, sent at a fixed
+arrival rate (open model) or as fast as ``--concurrency`` clients allow (closed model).
+
+    python -m benchmarks.load_test --concurrency 16 --duration 30 --batch-size 100
+    python -m benchmarks.load_test --rate 50 --replay Machine_Predictive_Data/predictive_maintenance.csv
+    python -m benchmarks.load_test --target-url http://staging:8080 --rate 20 --output report.json
+
+Run from the repository root so ``final_model/`` and ``templates/`` resolve.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import threading
+
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_dataset
+
+
+def use_mongo_stand_in(mongo_url: str = None) -> None:
+
+    """
+    Points the app at a local Mongo before it is imported.
+
+    Args:
+        mongo_url (str, optional): URL of a local ``mongod``. If omitted, ``pymongo.MongoClient``
+            is replaced with ``mongomock.MongoClient`` (and motor's client with
+            ``mongomock_motor.AsyncMongoMockClient`` when installed) so no server is needed at all.
+    """
+
+    if mongo_url:
+        os.environ["MONGO_DB_URL"] = mongo_url
+        return
+
+    try:
+        import mongomock
+    except ImportError:
+        raise SystemExit("mongomock is required for the in-process Mongo stand-in "
+                         "(pip install mongomock) or pass --mongo-url for a local mongod")
+
+    import pymongo
+    pymongo.MongoClient = mongomock.MongoClient
+
+    # the app's async client; without mongomock_motor it stays lazily unconnected
+    try:
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+    except ImportError:
+        pass
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server() -> str:
+
+    """
+    Starts the app under uvicorn on a background thread.
+
+    Returns:
+        str: Base URL of the running server.
+    """
+
+    import uvicorn
+    from app import app
+
+    port = _free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 60
+    while not server.started:
+        if time.time() > deadline or not thread.is_alive():
+            raise SystemExit("uvicorn did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def load_payloads(replay_paths: list, batch_size: int, n_payloads: int = 64) -> list:
+
+    """
+    Builds the CSV request bodies to send.
+
+    Args:
+        replay_paths (list): Recorded CSV files to replay; synthetic data is used if empty.
+        batch_size (int): Rows per request.
+        n_payloads (int, optional): Number of distinct synthetic payloads. Defaults to 64.
+
+    Returns:
+        list: CSV payloads as bytes.
+    """
+
+    if replay_paths:
+        frame = pd.concat([pd.read_csv(path) for path in replay_paths], ignore_index=True)
+    else:
+        frame = generate_dataset(batch_size * n_payloads, seed=7)
+
+    frame = frame.drop(columns=["Target", "Failure Type"], errors="ignore")
+    return [
+        frame.iloc[start:start + batch_size].to_csv(index=False).encode()
+        for start in range(0, len(frame) - batch_size + 1, batch_size)
+    ] or [frame.to_csv(index=False).encode()]
+
+
+def percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class LoadTest:
+
+    """
+    Sends requests and collects latencies and errors.
+
+    Args:
+        base_url (str): Server to target.
+        route (str): Route receiving the CSV upload.
+        payloads (list): CSV bodies, sent round-robin.
+        concurrency (int): Maximum requests in flight.
+        rate (float): Target arrivals per second; 0 sends back-to-back per client.
+        duration (float): Seconds to generate load for.
+        batch_size (int): Rows per request, used for the rows/s figure.
+    """
+
+    def __init__(self, base_url: str, route: str, payloads: list, concurrency: int,
+                 rate: float, duration: float, batch_size: int):
+        self.base_url = base_url
+        self.route = route
+        self.payloads = payloads
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.batch_size = batch_size
+        self.latencies = []
+        self.errors = {}
+        self._sent = 0
+
+    async def _send(self, client, scheduled_at: float = None) -> None:
+        payload = self.payloads[self._sent % len(self.payloads)]
+        self._sent += 1
+        # open-model latency counts from the scheduled arrival, so time spent queued is included
+        start = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            response = await client.post(self.route, files={"file": ("batch.csv", payload, "text/csv")})
+            if response.status_code >= 400:
+                key = f"HTTP {response.status_code}"
+                self.errors[key] = self.errors.get(key, 0) + 1
+                return
+        except Exception as e:
+            key = type(e).__name__
+            self.errors[key] = self.errors.get(key, 0) + 1
+            return
+        self.latencies.append(time.perf_counter() - start)
+
+    async def _closed_loop(self, client, stop_at: float) -> None:
+        while time.perf_counter() < stop_at:
+            await self._send(client)
+
+    async def _open_loop(self, client, stop_at: float) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = []
+
+        async def send_limited(scheduled_at):
+            async with semaphore:
+                await self._send(client, scheduled_at)
+
+        next_arrival = time.perf_counter()
+        while next_arrival < stop_at:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send_limited(next_arrival)))
+            # Poisson arrivals
+            next_arrival += random.expovariate(self.rate)
+        await asyncio.gather(*tasks)
+
+    async def run(self) -> dict:
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=60) as client:
+            started = time.perf_counter()
+            stop_at = started + self.duration
+            if self.rate > 0:
+                await self._open_loop(client, stop_at)
+            else:
+                await asyncio.gather(*(self._closed_loop(client, stop_at) for _ in range(self.concurrency)))
+            elapsed = time.perf_counter() - started
+
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> dict:
+        ordered = sorted(self.latencies)
+        n_errors = sum(self.errors.values())
+        total = len(ordered) + n_errors
+        return {
+            "route": self.route,
+            "concurrency": self.concurrency,
+            "target_rate": self.rate,
+            "batch_size": self.batch_size,
+            "elapsed_s": round(elapsed, 3),
+            "requests": total,
+            "throughput_rps": round(len(ordered) / elapsed, 2),
+            "rows_per_s": round(len(ordered) * self.batch_size / elapsed, 2),
+            "p50_s": percentile(ordered, 0.50),
+            "p95_s": percentile(ordered, 0.95),
+            "p99_s": percentile(ordered, 0.99),
+            "max_s": ordered[-1] if ordered else None,
+            "error_rate": round(n_errors / total, 4) if total else 0.0,
+            "errors": self.errors,
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-url", help="Load-test an already running server instead of booting one.")
+    parser.add_argument("--mongo-url", help="Local mongod to use instead of the in-process mongomock stand-in.")
+    parser.add_argument("--route", default="/predict", help="Route receiving the CSV upload.")
+    parser.add_argument("--replay", nargs="*", default=[], help="Recorded CSV files to replay.")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per request.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight.")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Arrivals per second (Poisson). 0 sends back-to-back from each client.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load for.")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="Exit with status 1 if the error rate exceeds this fraction.")
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    if args.target_url:
+        base_url = args.target_url.rstrip("/")
+    else:
+        use_mongo_stand_in(args.mongo_url)
+        base_url = start_local_server()
+
+    payloads = load_payloads(args.replay, args.batch_size)
+    load_test = LoadTest(base_url=base_url, route=args.route, payloads=payloads,
+                         concurrency=args.concurrency, rate=args.rate,
+                         duration=args.duration, batch_size=args.batch_size)
+    report = asyncio.run(load_test.run())
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+"""
+Benchmarks for the ingestion, validation, transformation, training and serving paths.
+
+Run from the repository root so ``data_schema/schema.yaml`` and ``final_model/`` resolve:
+
+    python -m benchmarks.run_benchmarks --scales 10000,100000 --output bench.json
+    python -m benchmarks.run_benchmarks --scales 10000,100000 --compare bench.json --threshold 0.1
+
+With ``--compare`` the process exits with status 1 if any benchmark's median time
+regressed by more than the threshold against the baseline file.
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+import statistics
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from benchmarks.synthetic_data import generate_dataset
+
+
+DEFAULT_SCALES = "10000,100000,1000000"
+DEFAULT_BATCH_SIZES = "1,100,1000,10000"
+DEFAULT_MAX_TRAIN_ROWS = 50000
+ALL_BENCHMARKS = (
+    "mongo_export",
+    "drift_detection",
+    "preprocessor_fit_transform",
+    "smoteenn",
+    "processing_test_data",
+    "evaluate_models",
+    "classification_metrics",
+    "gradient_boosting",
+    "hist_gradient_boosting",
+    "model_load",
+    "predict",
+)
+
+
+def measure(fn, repeat: int) -> list:
+
+    """
+    Calls ``fn`` ``repeat`` times and returns the wall time of each call in seconds.
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(name: str, scale: int, timings: list, rows: int) -> dict:
+    median = statistics.median(timings)
+    return {
+        "name": name,
+        "scale": scale,
+        "repeat": len(timings),
+        "rows": rows,
+        "median_s": round(median, 6),
+        "min_s": round(min(timings), 6),
+        "max_s": round(max(timings), 6),
+        "rows_per_s": round(rows / median, 2) if median > 0 else None,
+    }
+
+
+def split_features(df: pd.DataFrame, schema: dict):
+
+    """
+    Applies the same feature preparation as ``DataTransformation.initiate_data_transformation``.
+    """
+
+    from machine_predictive_maintenance.constant.training_pipeline import TARGET_COLUMN
+    from machine_predictive_maintenance.components.data_transformation import DataTransformation
+
+    transformation = DataTransformation.__new__(DataTransformation)
+    transformation._schema_config = schema
+    return transformation.get_input_features(df), df[TARGET_COLUMN]
+
+
+class StageBenchmarks:
+
+    """
+    Benchmarks the training pipeline stages on one synthetic dataset.
+
+    Args:
+        scale (int): Number of rows to generate.
+        repeat (int): Timed repetitions per benchmark.
+        max_train_rows (int): Row cap for the model search benchmark.
+        work_dir (str): Scratch directory for reports written by the stages.
+    """
+
+    def __init__(self, scale: int, repeat: int, max_train_rows: int, work_dir: str):
+        from machine_predictive_maintenance.constant.training_pipeline import SCHEMA_FILE_PATH
+        from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file
+
+        self.scale = scale
+        self.repeat = repeat
+        self.max_train_rows = max_train_rows
+        self.work_dir = work_dir
+        self.schema = read_yaml_file(SCHEMA_FILE_PATH)
+
+        self.df = generate_dataset(scale)
+        self.train_df, self.test_df = train_test_split(self.df, test_size=0.2, random_state=42)
+        self.X_train_df, self.y_train = split_features(self.train_df, self.schema)
+        self.X_test_df, self.y_test = split_features(self.test_df, self.schema)
+        self._preprocessor = None
+
+    @property
+    def preprocessor(self):
+        if self._preprocessor is None:
+            self._preprocessor = self._new_preprocessor()
+            self._preprocessor.fit(self.X_train_df)
+        return self._preprocessor
+
+    def _new_preprocessor(self):
+        from machine_predictive_maintenance.components.data_transformation import DataTransformation
+
+        transformation = DataTransformation.__new__(DataTransformation)
+        transformation._schema_config = self.schema
+        return transformation.get_data_transformer_object()
+
+    def mongo_export(self) -> dict:
+        records = self.df.to_dict("records")
+        for index, record in enumerate(records):
+            record["_id"] = index
+
+        def export():
+            df = pd.DataFrame(list(records))
+            df = df.drop(columns=["_id"])
+            df.replace({"na": np.nan}, inplace=True)
+
+        return summarize("mongo_export", self.scale, measure(export, self.repeat), len(records))
+
+    def drift_detection(self) -> dict:
+        from machine_predictive_maintenance.components.data_validation import DataValidation
+        from machine_predictive_maintenance.entity.config_entity import TrainingPipelineConfig, DataValidationConfig
+
+        training_pipeline_config = TrainingPipelineConfig()
+        training_pipeline_config.artifact_dir = self.work_dir
+        data_validation = DataValidation(data_ingestion_artifact=None,
+                                         data_validation_config=DataValidationConfig(training_pipeline_config))
+
+        timings = measure(lambda: data_validation.detect_dataset_drift(self.train_df, self.test_df), self.repeat)
+        return summarize("drift_detection", self.scale, timings, len(self.df))
+
+    def preprocessor_fit_transform(self) -> dict:
+        def fit_transform():
+            preprocessor = self._new_preprocessor()
+            preprocessor.fit_transform(self.X_train_df)
+            preprocessor.transform(self.X_test_df)
+
+        return summarize("preprocessor_fit_transform", self.scale, measure(fit_transform, self.repeat), len(self.df))
+
+    def smoteenn(self) -> dict:
+        from imblearn.combine import SMOTEENN
+
+        train_arr = self.preprocessor.transform(self.X_train_df)
+        timings = measure(lambda: SMOTEENN(sampling_strategy="minority").fit_resample(train_arr, self.y_train),
+                          self.repeat)
+        return summarize("smoteenn", self.scale, timings, len(train_arr))
+
+    def processing_test_data(self) -> dict:
+        from machine_predictive_maintenance.constant.training_pipeline import SCHEMA_FILE_PATH
+        from machine_predictive_maintenance.utils.main_utils.utils import processing_test_data
+
+        data = self.test_df.drop(columns=["Target"])
+        timings = measure(lambda: processing_test_data(data=data, schema_file=SCHEMA_FILE_PATH,
+                                                       preprocessor=self.preprocessor), self.repeat)
+        return summarize("processing_test_data", self.scale, timings, len(data))
+
+    def evaluate_models(self) -> dict:
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.ensemble import RandomForestClassifier
+        from machine_predictive_maintenance.utils.main_utils.utils import evaluate_models
+
+        rows = min(len(self.X_train_df), self.max_train_rows)
+        X_train = self.preprocessor.transform(self.X_train_df.iloc[:rows])
+        y_train = self.y_train.iloc[:rows].to_numpy()
+        X_test = self.preprocessor.transform(self.X_test_df)
+        y_test = self.y_test.to_numpy()
+
+        def search():
+            models = {
+                "Random Forest": RandomForestClassifier(),
+                "Decision Tree": DecisionTreeClassifier(),
+                "Logistic Regression": LogisticRegression(),
+            }
+            params = {
+                "Random Forest": {"n_estimators": [8, 16]},
+                "Decision Tree": {"criterion": ["gini", "entropy"]},
+                "Logistic Regression": {},
+            }
+            evaluate_models(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
+                            models=models, param=params)
+
+        return summarize("evaluate_models", self.scale, measure(search, self.repeat), rows)
+
+    def classification_metrics(self) -> dict:
+
+        """
+        Scores eight candidate prediction vectors over the full dataset with the batched metrics engine.
+        """
+
+        from machine_predictive_maintenance.utils.ml_utils.metric.classification_metric import get_classification_scores
+
+        rng = np.random.default_rng(42)
+        y_true = self.df["Target"].to_numpy()
+        y_scores = {f"candidate_{i}": rng.random(len(y_true)) for i in range(8)}
+        y_preds = {name: (score > 0.5).astype(np.int64) for name, score in y_scores.items()}
+
+        timings = measure(lambda: get_classification_scores(y_true, y_preds, y_scores), self.repeat)
+        return summarize("classification_metrics", self.scale, timings, len(y_true) * len(y_preds))
+
+    def _boosting_arrays(self, dtype: str) -> tuple:
+        rows = min(len(self.X_train_df), self.max_train_rows)
+        X_train = self.preprocessor.transform(self.X_train_df.iloc[:rows]).astype(dtype)
+        X_test = self.preprocessor.transform(self.X_test_df).astype(dtype)
+        return X_train, self.y_train.iloc[:rows].to_numpy(), X_test, self.y_test.to_numpy()
+
+    def _fit_boosting(self, name: str, make_model, dtype: str) -> dict:
+        from sklearn.metrics import f1_score
+
+        X_train, y_train, X_test, y_test = self._boosting_arrays(dtype)
+        models = []
+        timings = measure(lambda: models.append(make_model().fit(X_train, y_train)), self.repeat)
+
+        result = summarize(name, self.scale, timings, len(X_train))
+        result["dtype"] = dtype
+        result["array_mb"] = round(X_train.nbytes / 2 ** 20, 3)
+        result["test_f1"] = round(f1_score(y_test, models[-1].predict(X_test)), 4)
+        return result
+
+    def gradient_boosting(self) -> dict:
+
+        """
+        The exact ``GradientBoostingClassifier`` candidate on float64 arrays, at one grid point.
+        """
+
+        from sklearn.ensemble import GradientBoostingClassifier
+
+        return self._fit_boosting("gradient_boosting",
+                                  lambda: GradientBoostingClassifier(n_estimators=128, learning_rate=0.1, subsample=0.85),
+                                  "float64")
+
+    def hist_gradient_boosting(self) -> dict:
+
+        """
+        The ``HistGradientBoostingClassifier`` candidate on the float32 arrays the pipeline now stores.
+        """
+
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        categorical_features = list(range(len(self.schema["ordinal_columns"])))
+        return self._fit_boosting("hist_gradient_boosting",
+                                  lambda: HistGradientBoostingClassifier(categorical_features=categorical_features,
+                                                                         early_stopping=True, max_iter=500,
+                                                                         n_iter_no_change=10, random_state=42),
+                                  "float32")
+
+
+def benchmark_model_load(repeat: int) -> dict:
+    from machine_predictive_maintenance.utils.main_utils.utils import load_object
+
+    def load():
+        load_object("final_model/preprocessor.pkl")
+        load_object("final_model/model.pkl")
+
+    return summarize("model_load", 0, measure(load, repeat), 1)
+
+
+def benchmark_predict(batch_sizes: list, repeat: int) -> list:
+
+    """
+    Measures ``/predict`` latency and throughput through an in-process ASGI client,
+    so no server or network is involved.
+    """
+
+    import httpx
+    from app import app
+
+    async def run() -> list:
+        results = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for batch_size in batch_sizes:
+                payload = generate_dataset(batch_size, seed=batch_size).drop(columns=["Target"]).to_csv(index=False)
+                files = {"file": ("batch.csv", payload, "text/csv")}
+
+                # warm up model loading and route resolution
+                response = await client.post("/predict", files=files)
+                response.raise_for_status()
+
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    response = await client.post("/predict", files=files)
+                    timings.append(time.perf_counter() - start)
+                    response.raise_for_status()
+
+                result = summarize("predict", batch_size, timings, batch_size)
+                ordered = sorted(timings)
+                result["p50_s"] = round(ordered[int(0.50 * (len(ordered) - 1))], 6)
+                result["p95_s"] = round(ordered[int(0.95 * (len(ordered) - 1))], 6)
+                results.append(result)
+        return results
+
+    return asyncio.run(run())
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> list:
+
+    """
+    Compares median times against a baseline results file.
+
+    Args:
+        current (dict): Results of this run.
+        baseline (dict): Results loaded from a previous run.
+        threshold (float): Allowed relative slowdown, e.g. 0.1 for 10%.
+
+    Returns:
+        list: Descriptions of the benchmarks that regressed.
+    """
+
+    baseline_by_key = {(r["name"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        base = baseline_by_key.get((result["name"], result["scale"]))
+        if base is None or not base["median_s"]:
+            continue
+        change = result["median_s"] / base["median_s"] - 1
+        line = (f"{result['name']:<28}{result['scale']:>10}  {base['median_s']:>10.4f}s -> "
+                f"{result['median_s']:>10.4f}s  {change:+.1%}")
+        print(line)
+        if change > threshold:
+            regressions.append(line)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Comma separated dataset sizes.")
+    parser.add_argument("--batch-sizes", default=DEFAULT_BATCH_SIZES, help="Comma separated /predict batch sizes.")
+    parser.add_argument("--benchmarks", default=",".join(ALL_BENCHMARKS), help="Comma separated benchmarks to run.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per benchmark.")
+    parser.add_argument("--max-train-rows", type=int, default=DEFAULT_MAX_TRAIN_ROWS,
+                        help="Row cap for the evaluate_models benchmark.")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown before failing.")
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.benchmarks.split(",") if name.strip()]
+    unknown = set(selected) - set(ALL_BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {sorted(unknown)}")
+
+    results = []
+    stage_benchmarks = [name for name in selected if hasattr(StageBenchmarks, name)]
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale in [int(s) for s in args.scales.split(",") if s]:
+            if not stage_benchmarks:
+                break
+            bench = StageBenchmarks(scale, args.repeat, args.max_train_rows, work_dir)
+            for name in stage_benchmarks:
+                result = getattr(bench, name)()
+                print(f"{name:<28}{scale:>10}  median {result['median_s']:.4f}s  {result['rows_per_s']} rows/s")
+                results.append(result)
+
+    if "model_load" in selected:
+        results.append(benchmark_model_load(args.repeat))
+        print(f"{'model_load':<28}{'':>10}  median {results[-1]['median_s']:.4f}s")
+
+    if "predict" in selected:
+        batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b]
+        for result in benchmark_predict(batch_sizes, max(args.repeat, 5)):
+            print(f"{'predict':<28}{result['scale']:>10}  p50 {result['p50_s']:.4f}s  "
+                  f"p95 {result['p95_s']:.4f}s  {result['rows_per_s']} rows/s")
+            results.append(result)
+
+    report = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare_results(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
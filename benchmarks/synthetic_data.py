@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+
+TYPE_VALUES = ["L", "M", "H"]
+TYPE_PROBABILITIES = [0.6, 0.3, 0.1]
+OVERSTRAIN_LIMITS = {"L": 11000, "M": 12000, "H": 13000}
+
+
+def generate_dataset(n_rows: int, seed: int = 42) -> pd.DataFrame:
+
+    """
+    Generates a synthetic dataset with the same columns, dtypes and value ranges as
+    ``Machine_Predictive_Data/predictive_maintenance.csv``.
+
+    Failures follow the rules of the original AI4I data (heat dissipation, power,
+    overstrain, tool wear and random failures), so the class balance is close to the
+    real ~3.4% failure rate and SMOTEENN and the classifiers see realistic work.
+
+    Args:
+        n_rows (int): Number of rows to generate.
+        seed (int, optional): Random seed. Defaults to 42.
+
+    Returns:
+        pd.DataFrame: The generated readings.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    machine_type = rng.choice(TYPE_VALUES, size=n_rows, p=TYPE_PROBABILITIES)
+    serial = rng.integers(10000, 60000, size=n_rows)
+    product_id = np.char.add(machine_type.astype(str), serial.astype(str))
+
+    air_temperature = np.round(rng.normal(300.0, 2.0, n_rows), 1)
+    process_temperature = np.round(air_temperature + 10.0 + rng.normal(0.0, 1.0, n_rows), 1)
+    rotational_speed = np.clip(np.round(rng.normal(1538.8, 179.3, n_rows)), 1168, 2886).astype(np.int64)
+    torque = np.round(np.clip(rng.normal(40.0, 10.0, n_rows), 3.8, 76.6), 1)
+    tool_wear = rng.integers(0, 254, size=n_rows)
+
+    power = torque * rotational_speed * 2 * np.pi / 60
+    overstrain_limit = np.select(
+        [machine_type == "L", machine_type == "M"],
+        [OVERSTRAIN_LIMITS["L"], OVERSTRAIN_LIMITS["M"]],
+        OVERSTRAIN_LIMITS["H"],
+    )
+
+    failure_rules = [
+        ("Heat Dissipation Failure", ((process_temperature - air_temperature) < 8.6) & (rotational_speed < 1380)),
+        ("Power Failure", (power < 3500) | (power > 9000)),
+        ("Overstrain Failure", tool_wear * torque > overstrain_limit),
+        ("Tool Wear Failure", (tool_wear >= 200) & (rng.random(n_rows) < 0.25)),
+        ("Random Failures", rng.random(n_rows) < 0.001),
+    ]
+    failure_type = np.select([rule for _, rule in failure_rules],
+                             [name for name, _ in failure_rules], "No Failure")
+
+    return pd.DataFrame({
+        "UDI": np.arange(1, n_rows + 1),
+        "Product ID": product_id,
+        "Type": machine_type,
+        "Air temperature [K]": air_temperature,
+        "Process temperature [K]": process_temperature,
+        "Rotational speed [rpm]": rotational_speed,
+        "Torque [Nm]": torque,
+        "Tool wear [min]": tool_wear,
+        "Target": (failure_type != "No Failure").astype(np.int64),
+        "Failure Type": failure_type,
+    })
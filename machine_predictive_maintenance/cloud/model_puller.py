@@ -0,0 +1,210 @@
+import os
+import sys
+import shutil
+import hashlib
+from datetime import datetime
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.cloud.s3_syncer import S3Sync
+from machine_predictive_maintenance.constant.training_pipeline import MODEL_PULLER_TIMESTAMP_FORMAT
+from machine_predictive_maintenance.entity.config_entity import ModelPullerConfig
+from machine_predictive_maintenance.entity.artifact_entity import ModelPullerArtifact
+
+
+COMPLETE_MARKER_FILE_NAME = ".complete"
+
+
+class S3ModelPuller:
+
+    """
+    Fetches the latest model version written by ``TrainingPipeline.sync_saved_model_dir_to_s3``
+    (``s3://<bucket>/final_model/<timestamp>/``) into a content-addressed local cache.
+
+    Each version is stored under ``<cache_dir>/<content_hash>`` where the hash is computed from
+    the remote object keys, ETags and sizes, so a version that is already cached is never
+    downloaded again and a restarted container only pays for a listing call.
+
+    Args:
+        model_puller_config (ModelPullerConfig): Bucket, cache and polling configuration.
+    """
+
+    def __init__(self, model_puller_config: ModelPullerConfig):
+
+        try:
+            self.model_puller_config = model_puller_config
+            self.s3_sync = S3Sync(endpoint_url=model_puller_config.endpoint_url)
+            self._local_signature = None
+            self._local_hash = None
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @staticmethod
+    def _parse_version(version: str):
+        try:
+            return datetime.strptime(version, MODEL_PULLER_TIMESTAMP_FORMAT)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def compute_content_hash(objects: list) -> str:
+
+        """
+        Computes a stable hash for a model version from its object listing.
+
+        Args:
+            objects (list): Dicts with ``Key`` (relative to the version folder), ``ETag`` and ``Size``.
+
+        Returns:
+            str: Hex digest identifying the version content.
+        """
+
+        digest = hashlib.sha256()
+        for obj in sorted(objects, key=lambda o: o["Key"]):
+            digest.update(f"{obj['Key']}|{obj.get('ETag', '')}|{obj.get('Size', '')}\n".encode())
+        return digest.hexdigest()[:16]
+
+    def get_latest_model_version(self):
+
+        """
+        Finds the most recent ``final_model/<timestamp>`` folder in the bucket.
+
+        Timestamps use ``%m_%d_%Y_%H_%M_%S`` which does not sort lexically, so
+        they are parsed before comparing.
+
+        Returns:
+            tuple: ``(version, objects)`` where objects are keyed relative to the version
+            folder, or ``(None, [])`` if the bucket holds no model.
+        """
+
+        try:
+            prefix = f"{self.model_puller_config.s3_prefix}/"
+            listing = self.s3_sync.list_objects(self.model_puller_config.bucket_name, prefix)
+
+            versions = {}
+            for obj in listing:
+                relative_key = obj["Key"][len(prefix):]
+                if "/" not in relative_key:
+                    continue
+                version, key = relative_key.split("/", 1)
+                if self._parse_version(version) is None or not key:
+                    continue
+                versions.setdefault(version, []).append(
+                    {"Key": key, "ETag": obj.get("ETag"), "Size": obj.get("Size")}
+                )
+
+            if not versions:
+                return None, []
+
+            latest_version = max(versions, key=self._parse_version)
+            return latest_version, versions[latest_version]
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def _build_artifact(self, version: str, model_dir: str, content_hash: str) -> ModelPullerArtifact:
+        return ModelPullerArtifact(
+            model_version=version,
+            model_dir=model_dir,
+            model_file_path=os.path.join(model_dir, self.model_puller_config.model_file_name),
+            preprocessor_file_path=os.path.join(model_dir, self.model_puller_config.preprocessor_file_name),
+            content_hash=content_hash,
+        )
+
+    def get_local_model(self) -> ModelPullerArtifact:
+
+        """
+        Describes the model baked into the image under ``final_model/``, used when the
+        bucket is unreachable or empty.
+
+        Returns:
+            ModelPullerArtifact: Artifact pointing at the local model files.
+        """
+
+        try:
+            model_dir = self.model_puller_config.local_model_dir
+            file_paths = [os.path.join(model_dir, file_name) for file_name in
+                          (self.model_puller_config.model_file_name, self.model_puller_config.preprocessor_file_name)]
+
+            # only re-hash when a file's size or modification time changed
+            signature = tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in file_paths)
+            if self._local_signature != signature:
+                digest = hashlib.sha256()
+                for file_path in file_paths:
+                    with open(file_path, "rb") as file_obj:
+                        for block in iter(lambda: file_obj.read(1 << 20), b""):
+                            digest.update(block)
+                self._local_signature = signature
+                self._local_hash = digest.hexdigest()[:16]
+
+            return self._build_artifact("local", model_dir, self._local_hash)
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def pull_latest_model(self) -> ModelPullerArtifact:
+
+        """
+        Ensures the latest model version from S3 is present in the local cache.
+
+        The download goes to a temporary folder that is renamed into place only once both
+        the model and the preprocessor are present, so a crashed pull never leaves a
+        half-written version behind.
+
+        Returns:
+            ModelPullerArtifact: The cached version, or the local ``final_model/`` if S3 has none
+            or the configured source is ``local``.
+        """
+
+        try:
+            if self.model_puller_config.source == "local":
+                return self.get_local_model()
+
+            version, objects = self.get_latest_model_version()
+            if version is None:
+                logging.info("No model version found in S3, using local final_model")
+                return self.get_local_model()
+
+            content_hash = self.compute_content_hash(objects)
+            cache_dir = self.model_puller_config.cache_dir
+            model_dir = os.path.join(cache_dir, content_hash)
+
+            if os.path.exists(os.path.join(model_dir, COMPLETE_MARKER_FILE_NAME)):
+                logging.info(f"Model version {version} already cached at {model_dir}")
+                return self._build_artifact(version, model_dir, content_hash)
+
+            tmp_dir = f"{model_dir}.tmp-{os.getpid()}"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir, exist_ok=True)
+
+            aws_bucket_url = (
+                f"s3://{self.model_puller_config.bucket_name}/{self.model_puller_config.s3_prefix}/{version}"
+            )
+            logging.info(f"Pulling model version {version} from {aws_bucket_url}")
+            status = self.s3_sync.sync_folder_from_s3(folder=tmp_dir, aws_bucket_url=aws_bucket_url)
+            if status != 0:
+                # a failed or partial sync may still have written both files
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise Exception(f"Pulling model version {version} failed, aws s3 sync exited with status {status}")
+
+            artifact = self._build_artifact(version, tmp_dir, content_hash)
+            for file_path in (artifact.model_file_path, artifact.preprocessor_file_path):
+                if not os.path.exists(file_path):
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    raise Exception(f"Model version {version} is missing {os.path.basename(file_path)}")
+
+            with open(os.path.join(tmp_dir, COMPLETE_MARKER_FILE_NAME), "w") as marker:
+                marker.write(version)
+
+            try:
+                os.replace(tmp_dir, model_dir)
+            except OSError:
+                # another worker finished the same version first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+            logging.info(f"Cached model version {version} at {model_dir}")
+            return self._build_artifact(version, model_dir, content_hash)
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
@@ -1,13 +1,28 @@
 
 import os
+import sys
+import json
+import subprocess
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
 
 
 class S3Sync:
 
     """
     A class to handle synchronization of folders to and from an S3 bucket.
+
+    Args:
+        endpoint_url (str, optional): Custom S3 endpoint, e.g. a local MinIO or localstack
+            server used in place of AWS. Defaults to the ``AWS_ENDPOINT_URL`` environment variable.
     """
 
+    def __init__(self, endpoint_url=None):
+        self.endpoint_url = endpoint_url or os.getenv("AWS_ENDPOINT_URL")
+
+    def _endpoint_option(self):
+        return f"--endpoint-url {self.endpoint_url} " if self.endpoint_url else ""
+
     def sync_folder_to_s3(self,folder,aws_bucket_url):
 
         """
@@ -18,7 +33,7 @@ class S3Sync:
             aws_bucket_url (str): The S3 bucket URL where the folder will be synced.
         """
 
-        command = f"aws s3 sync {folder} {aws_bucket_url} "
+        command = f"aws {self._endpoint_option()}s3 sync {folder} {aws_bucket_url} "
         os.system(command)
 
     def sync_folder_from_s3(self,folder,aws_bucket_url):
@@ -31,5 +46,33 @@ class S3Sync:
             aws_bucket_url (str): The S3 bucket URL from where the folder will be synced.
         """
         
-        command = f"aws s3 sync  {aws_bucket_url} {folder} "
-        os.system(command)
+        command = f"aws {self._endpoint_option()}s3 sync  {aws_bucket_url} {folder} "
+        return os.system(command)
+
+    def list_objects(self, bucket_name, prefix):
+
+        """
+        Lists the objects stored under a prefix of an S3 bucket.
+
+        Args:
+            bucket_name (str): Name of the S3 bucket.
+            prefix (str): Key prefix to list, e.g. ``final_model/``.
+
+        Returns:
+            list: One dict per object with its ``Key``, ``ETag`` and ``Size``.
+        """
+
+        try:
+            command = ["aws"]
+            if self.endpoint_url:
+                command += ["--endpoint-url", self.endpoint_url]
+            command += ["s3api", "list-objects-v2", "--bucket", bucket_name,
+                        "--prefix", prefix, "--output", "json"]
+
+            result = subprocess.run(command, capture_output=True, text=True, check=True)
+            if not result.stdout.strip():
+                return []
+            return json.loads(result.stdout).get("Contents", [])
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
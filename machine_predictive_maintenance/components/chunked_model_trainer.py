@@ -0,0 +1,289 @@
+import os
+import sys
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Perceptron, SGDClassifier
+from sklearn.preprocessing import MinMaxScaler
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.components.data_transformation import DataTransformation
+from machine_predictive_maintenance.constant.training_pipeline import (
+    MODEL_FILE_NAME,
+    PREPROCESSOR_OBJECT_FILE_NAME,
+    TARGET_COLUMN,
+)
+from machine_predictive_maintenance.entity.artifact_entity import DataIngestionArtifact, ModelTrainerArtifact
+from machine_predictive_maintenance.entity.config_entity import ChunkedTrainingConfig
+from machine_predictive_maintenance.profiling.profiler import profile_stage
+from machine_predictive_maintenance.tracking.mlflow_tracker import MlflowTracker
+from machine_predictive_maintenance.utils.main_utils.dtype_plan import DtypePlan
+from machine_predictive_maintenance.utils.main_utils.feature_engine import RollingFeatureEngine
+from machine_predictive_maintenance.utils.main_utils.schema_validator import SchemaValidator
+from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file, save_object
+from machine_predictive_maintenance.utils.ml_utils.metric.classification_metric import (
+    confusion_counts,
+    get_classification_score_from_counts,
+)
+
+
+class ChunkedModelTrainer:
+
+    """
+    Out-of-core replacement for the validation, transformation and training stages, for data
+    that does not fit in memory.
+
+    The ingested train and test files are only ever read ``chunk_size`` rows at a time:
+
+    1. One pass over the train file validates every chunk, fits the MinMax bounds with
+       ``partial_fit`` and counts the classes.
+    2. ``epochs`` passes train every incremental candidate with ``partial_fit`` on the same
+       transformed chunk, so each chunk is read and preprocessed once per epoch for all of them.
+    3. One pass over the test file scores all candidates and keeps the best F1.
+
+    SMOTEENN needs the whole train set, so the class imbalance is handled with class weights
+    computed from the counts of the first pass instead.
+
+    Args:
+        data_ingestion_artifact (DataIngestionArtifact): Paths of the ingested train and test files.
+        chunked_training_config (ChunkedTrainingConfig): Chunk size, epochs and output paths.
+        tracker (MlflowTracker, optional): The pipeline's MLflow run, if it is tracked.
+    """
+
+    def __init__(self, data_ingestion_artifact: DataIngestionArtifact, chunked_training_config: ChunkedTrainingConfig,
+                 tracker: MlflowTracker = None):
+
+        try:
+            self.data_ingestion_artifact = data_ingestion_artifact
+            self.chunked_training_config = chunked_training_config
+            self.tracker = tracker
+            self._schema_config = read_yaml_file(file_path=chunked_training_config.schema_file_path)
+            self._schema_validator = SchemaValidator(self._schema_config)
+            self._dtype_plan = DtypePlan(self._schema_config)
+            # only its feature derivation and preprocessor definition are used
+            self._data_transformation = DataTransformation(data_validation_artifact=None, data_transformation_config=None,
+                                                           schema_config=self._schema_config)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def read_chunks(self, file_path: str, quarantine_name: str = None):
+
+        """
+        Reads a split chunk by chunk and yields the input features and target of its valid rows.
+
+        One feature engine is shared by all chunks of the split, so rolling windows continue
+        across chunk boundaries.
+
+        Args:
+            file_path (str): Train or test CSV file.
+            quarantine_name (str, optional): If given, invalid rows are written to
+                ``<invalid_data_dir>/<quarantine_name>_<chunk>.csv``.
+
+        Yields:
+            tuple: ``(input_features, target)`` as a DataFrame and a numpy array.
+        """
+
+        try:
+            feature_engine = RollingFeatureEngine.from_schema(self._schema_config)
+            chunks = self._dtype_plan.read_csv(file_path, chunksize=self.chunked_training_config.chunk_size)
+            for chunk_number, chunk in enumerate(chunks):
+                validation = self._schema_validator.validate(chunk)
+                if quarantine_name and not validation.is_valid:
+                    self._schema_validator.quarantine(validation, os.path.join(
+                        self.chunked_training_config.invalid_data_dir, f"{quarantine_name}_{chunk_number}.csv"
+                    ))
+                valid_df = validation.valid_rows()
+                if len(valid_df) == 0:
+                    continue
+                input_features = self._data_transformation.get_input_features(valid_df, feature_engine=feature_engine)
+                yield input_features, valid_df[TARGET_COLUMN].to_numpy()
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def fit_preprocessor(self) -> tuple:
+
+        """
+        Fits the preprocessor over the whole train file, one chunk at a time.
+
+        Returns:
+            tuple: The fitted ColumnTransformer and the per-class row counts.
+        """
+
+        try:
+            scaling_features = self._schema_config['scaling_features']
+            scaler = MinMaxScaler()
+            class_counts = np.zeros(2, dtype=np.int64)
+            preprocessor = None
+
+            for input_features, target in self.read_chunks(self.data_ingestion_artifact.trained_file_path,
+                                                           quarantine_name="train"):
+                if preprocessor is None:
+                    # the ordinal categories come from the schema, so one chunk is enough to fit them
+                    preprocessor = self._data_transformation.get_data_transformer_object()
+                    preprocessor.fit(input_features)
+                scaler.partial_fit(input_features[scaling_features])
+                class_counts += np.bincount(target.astype(np.int64), minlength=2)
+
+            if preprocessor is None:
+                raise ValueError(f"No valid rows in {self.data_ingestion_artifact.trained_file_path}")
+
+            # ColumnTransformer has no partial_fit: swap in the scaler that saw every chunk
+            preprocessor.transformers_ = [
+                (name, scaler if name == "MinMaxScaling" else transformer, columns)
+                for name, transformer, columns in preprocessor.transformers_
+            ]
+            logging.info(f"Fitted preprocessor on {int(class_counts.sum())} rows, class counts {class_counts.tolist()}")
+            return preprocessor, class_counts
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def get_incremental_models(self, class_counts: np.ndarray) -> dict:
+
+        """
+        Creates the candidate models; all of them support ``partial_fit``.
+
+        Args:
+            class_counts (np.ndarray): Rows per class in the train file.
+
+        Returns:
+            dict: Untrained models by name.
+        """
+
+        # the "balanced" heuristic, which partial_fit cannot compute itself
+        class_weight = {
+            label: class_counts.sum() / (len(class_counts) * count)
+            for label, count in enumerate(class_counts) if count
+        }
+        random_state = self.chunked_training_config.random_state
+        return {
+            "SGD Logistic Regression": SGDClassifier(loss="log_loss", class_weight=class_weight, random_state=random_state),
+            "SGD Modified Huber": SGDClassifier(loss="modified_huber", class_weight=class_weight, random_state=random_state),
+            "Perceptron": Perceptron(class_weight=class_weight, random_state=random_state),
+        }
+
+    def train_models(self, models: dict, preprocessor) -> dict:
+
+        """
+        Trains every candidate for ``epochs`` passes over the train file.
+
+        Args:
+            models (dict): Candidates from ``get_incremental_models``.
+            preprocessor: The fitted preprocessor.
+
+        Returns:
+            dict: The same models, trained.
+        """
+
+        try:
+            classes = np.array([0, 1])
+            rng = np.random.default_rng(self.chunked_training_config.random_state)
+
+            for epoch in range(self.chunked_training_config.epochs):
+                with profile_stage(f"chunked_epoch/{epoch}") as stage:
+                    rows = 0
+                    for input_features, target in self.read_chunks(self.data_ingestion_artifact.trained_file_path):
+                        X = preprocessor.transform(input_features)
+                        # rows of a chunk are in UDI order; shuffle so SGD does not follow the machines' time order
+                        order = rng.permutation(len(X))
+                        X, y = X[order], target[order]
+                        for model in models.values():
+                            model.partial_fit(X, y, classes=classes)
+                        rows += len(X)
+                    stage.rows = rows
+                logging.info(f"Chunked training epoch {epoch + 1}/{self.chunked_training_config.epochs} done ({rows} rows)")
+
+            return models
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def evaluate_models(self, models: dict, preprocessor, file_path: str) -> dict:
+
+        """
+        Scores every model in a single chunked pass over a split.
+
+        Args:
+            models (dict): Trained models by name.
+            preprocessor: The fitted preprocessor.
+            file_path (str): Train or test CSV file.
+
+        Returns:
+            dict: ClassificationMetricArtifact by model name.
+        """
+
+        try:
+            names = list(models)
+            counts = np.zeros((len(names), 4), dtype=np.int64)
+
+            for input_features, target in self.read_chunks(file_path):
+                X = preprocessor.transform(input_features)
+                counts += confusion_counts(target, np.stack([models[name].predict(X) for name in names]))
+
+            return {name: get_classification_score_from_counts(counts[i]) for i, name in enumerate(names)}
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def initiate_chunked_model_trainer(self) -> ModelTrainerArtifact:
+
+        """
+        Fits the preprocessor, trains and evaluates the candidates and saves the best one.
+
+        Returns:
+            ModelTrainerArtifact: An artifact containing the path of the trained model and evaluation metrics.
+        """
+
+        try:
+            config = self.chunked_training_config
+            logging.info(f"Starting chunked training with {config.chunk_size} rows per chunk")
+
+            with profile_stage("chunked_preprocessor_fit"):
+                preprocessor, class_counts = self.fit_preprocessor()
+
+            models = self.train_models(self.get_incremental_models(class_counts), preprocessor)
+
+            with profile_stage("chunked_evaluation"):
+                test_metrics = self.evaluate_models(models, preprocessor, self.data_ingestion_artifact.test_file_path)
+            for name, metric in test_metrics.items():
+                logging.info(f"{name}: test f1 {metric.f1_score:.4f}")
+
+            best_model_name = max(test_metrics, key=lambda name: test_metrics[name].f1_score)
+            best_model = models[best_model_name]
+            logging.info(f"Best Model Name: {best_model_name}")
+
+            classification_test_metric = test_metrics[best_model_name]
+            if classification_test_metric.f1_score < config.expected_accuracy:
+                logging.info(f"Best test f1 {classification_test_metric.f1_score:.4f} is below the expected {config.expected_accuracy}")
+
+            classification_train_metric = self.evaluate_models(
+                {best_model_name: best_model}, preprocessor, self.data_ingestion_artifact.trained_file_path
+            )[best_model_name]
+
+            if self.tracker is not None:
+                self.tracker.log_params({"best_model": best_model_name, "chunk_size": config.chunk_size,
+                                         "epochs": config.epochs})
+                self.tracker.log_metrics({f"{name}/test_f1": metric.f1_score for name, metric in test_metrics.items()})
+                self.tracker.log_metrics({
+                    **{f"train_{key}": value for key, value in asdict(classification_train_metric).items()},
+                    **{f"test_{key}": value for key, value in asdict(classification_test_metric).items()},
+                })
+                self.tracker.log_model(best_model)
+
+            save_object(config.transformed_object_file_path, preprocessor)
+            save_object(config.trained_model_file_path, best_model)
+            if config.promote_to_final_model:
+                save_object(os.path.join(config.final_model_dir, PREPROCESSOR_OBJECT_FILE_NAME), preprocessor)
+                save_object(os.path.join(config.final_model_dir, MODEL_FILE_NAME), best_model)
+
+            model_trainer_artifact = ModelTrainerArtifact(trained_model_file_path=config.trained_model_file_path,
+                                                          train_metric_artifact=classification_train_metric,
+                                                          test_metric_artifact=classification_test_metric)
+            logging.info(f"Model trainer artifact: {model_trainer_artifact}")
+            return model_trainer_artifact
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
@@ -3,6 +3,9 @@ from machine_predictive_maintenance.logging.logger import logging
 
 from machine_predictive_maintenance.entity.config_entity import DataIngestionConfig
 from machine_predictive_maintenance.entity.artifact_entity import DataIngestionArtifact
+from machine_predictive_maintenance.profiling.profiler import profile_stage
+from machine_predictive_maintenance.utils.main_utils.dtype_plan import DtypePlan
+from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file, write_yaml_file
 
 import os
 import sys
@@ -31,6 +34,9 @@ class DataIngestion:
 
         try:
             self.data_ingestion_config=data_ingestion_config
+            schema_config = read_yaml_file(data_ingestion_config.schema_file_path)
+            self._dtype_plan = DtypePlan(schema_config)
+            self._schema_columns = [column for entry in schema_config["columns"] for column in entry]
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e, sys)
         
@@ -51,17 +57,114 @@ class DataIngestion:
             self.mongo_client = pymongo.MongoClient(MONGO_DB_URL)
             collection = self.mongo_client[database_name][collection_name]
 
-            df = pd.DataFrame(list(collection.find()))
+            with profile_stage("mongo_export") as stage:
+                if self.data_ingestion_config.sample_fraction is not None:
+                    df = pd.DataFrame(self.sample_collection(collection))
+                else:
+                    # a fixed order, so the seeded split assigns the same rows on every run
+                    df = pd.DataFrame(list(collection.find().sort("_id", 1)))
+                stage.rows = len(df)
 
             if "_id" in df.columns.to_list():
-                df = df.drop(columns=["_id"], axis=1)
+                df = df.drop(columns=["_id"])
 
             df.replace({"na":np.nan},inplace=True)
+            df = self._dtype_plan.apply(df)
+            self._dtype_plan.record_memory("feature_store", df)
             return df
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e, sys)
         
 
+    def sample_collection(self, collection) -> list:
+
+        """
+        Draws a stratified sample of the collection inside MongoDB.
+
+        The strata (``Target`` x ``Failure Type``) are counted with one ``$group``, then each
+        stratum is sampled with its own ``$match`` + ``$sample`` aggregation, so only the sampled
+        documents leave the server. Every stratum keeps ``sample_fraction`` of its rows, but at
+        least ``sample_min_stratum_rows`` (or all of them), so rare failure types survive. The
+        per-stratum counts are written to the sample manifest.
+
+        Args:
+            collection: The pymongo collection.
+
+        Returns:
+            list: The sampled documents.
+        """
+
+        try:
+            config = self.data_ingestion_config
+            group_id = {f"s{i}": f"${column}" for i, column in enumerate(config.sample_strata_columns)}
+            strata = list(collection.aggregate([{"$group": {"_id": group_id, "count": {"$sum": 1}}}],
+                                               allowDiskUse=True))
+
+            documents, manifest = [], []
+            for stratum in strata:
+                values = [stratum["_id"].get(f"s{i}") for i in range(len(config.sample_strata_columns))]
+                size = max(round(stratum["count"] * config.sample_fraction),
+                           min(config.sample_min_stratum_rows, stratum["count"]))
+                match = dict(zip(config.sample_strata_columns, values))
+                # $sample falls back to a random sort on large strata, which may exceed the
+                # 100 MB in-memory sort limit
+                documents.extend(collection.aggregate([{"$match": match}, {"$sample": {"size": size}}],
+                                                      allowDiskUse=True))
+                manifest.append({**match, "rows": stratum["count"], "sampled_rows": size})
+
+            write_yaml_file(config.sample_manifest_file_path, {
+                "sampled": True,
+                "sample_fraction": config.sample_fraction,
+                "rows": sum(stratum["count"] for stratum in strata),
+                "sampled_rows": len(documents),
+                "strata": manifest,
+            }, replace=True)
+            logging.info(f"Sampled {len(documents)} documents from {len(strata)} strata")
+            return documents
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
+    def export_collection_in_chunks(self, chunk_size: int):
+
+        """
+        Streams a MongoDB collection as DataFrames of at most ``chunk_size`` documents,
+        so the whole collection never has to fit in memory.
+
+        Args:
+            chunk_size (int): Documents per DataFrame, also used as the cursor batch size.
+
+        Yields:
+            pd.DataFrame: The next chunk of the collection, without ``_id``.
+        """
+
+        try:
+            database_name= self.data_ingestion_config.database_name
+            collection_name= self.data_ingestion_config.collection_name
+            self.mongo_client = pymongo.MongoClient(MONGO_DB_URL)
+            collection = self.mongo_client[database_name][collection_name]
+
+            cursor = collection.find({}, {"_id": 0}, batch_size=chunk_size)
+            documents = []
+            for document in cursor:
+                documents.append(document)
+                if len(documents) == chunk_size:
+                    yield self._chunk_frame(documents)
+                    documents = []
+            if documents:
+                yield self._chunk_frame(documents)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
+    def _chunk_frame(self, documents: list) -> pd.DataFrame:
+        # a frame's column order follows the keys of its first document; the chunks are appended
+        # under the header of the first one, so every chunk is put in schema order
+        df = pd.DataFrame(documents).reindex(columns=self._schema_columns)
+        return self._dtype_plan.apply(df.replace({"na": np.nan}))
+
+
     def export_data_into_feature_store(self,dataframe: pd.DataFrame):
 
         """
@@ -80,7 +183,8 @@ class DataIngestion:
             #creating folder
             dir_path = os.path.dirname(feature_store_file_path)
             os.makedirs(dir_path,exist_ok=True)
-            dataframe.to_csv(feature_store_file_path,index=False,header=True)
+            with profile_stage("feature_store_export", rows=len(dataframe)):
+                dataframe.to_csv(feature_store_file_path,index=False,header=True)
             return dataframe
             
         except Exception as e:
@@ -98,7 +202,8 @@ class DataIngestion:
         """
         try:
             train_set, test_set = train_test_split(
-                dataframe, test_size=self.data_ingestion_config.train_test_split_ratio
+                dataframe, test_size=self.data_ingestion_config.train_test_split_ratio,
+                random_state=self.data_ingestion_config.random_state
             )
             logging.info("Performed train test split on the dataframe")
 
@@ -146,10 +251,53 @@ class DataIngestion:
             self.split_data_as_train_test(dataframe)
 
             dataingestionartifact= DataIngestionArtifact(trained_file_path=self.data_ingestion_config.training_file_path,
-                                                         test_file_path=self.data_ingestion_config.testing_file_path)
+                                                         test_file_path=self.data_ingestion_config.testing_file_path,
+                                                         sampled=self.data_ingestion_config.sample_fraction is not None)
             return dataingestionartifact
 
             
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e,sys)
-        
\ No newline at end of file
+
+    def initiate_chunked_data_ingestion(self, chunk_size: int, random_state: int = None) -> DataIngestionArtifact:
+
+        """
+        Out-of-core variant of ``initiate_data_ingestion``: the collection is streamed chunk by
+        chunk into the feature store, and every row is assigned to the train or test file by a
+        seeded random draw instead of ``train_test_split`` over the full frame.
+
+        Args:
+            chunk_size (int): Documents held in memory at once.
+            random_state (int, optional): Seed of the train/test assignment.
+
+        Returns:
+            DataIngestionArtifact: An artifact containing paths for training and testing datasets.
+        """
+
+        try:
+            config = self.data_ingestion_config
+            for file_path in (config.feature_store_file_path, config.training_file_path, config.testing_file_path):
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+            rng = np.random.default_rng(random_state)
+            rows = 0
+            with profile_stage("chunked_mongo_export") as stage:
+                for chunk in self.export_collection_in_chunks(chunk_size):
+                    header = rows == 0
+                    chunk.to_csv(config.feature_store_file_path, mode="a", index=False, header=header)
+
+                    is_test = rng.random(len(chunk)) < config.train_test_split_ratio
+                    chunk.loc[~is_test].to_csv(config.training_file_path, mode="a", index=False, header=header)
+                    chunk.loc[is_test].to_csv(config.testing_file_path, mode="a", index=False, header=header)
+
+                    rows += len(chunk)
+                    logging.info(f"Exported {rows} rows to the feature store")
+                stage.rows = rows
+
+            return DataIngestionArtifact(trained_file_path=config.training_file_path,
+                                         test_file_path=config.testing_file_path)
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e,sys)
@@ -3,19 +3,21 @@ import numpy as np
 import pandas as pd
 from sklearn.preprocessing import OrdinalEncoder
 from sklearn.preprocessing import MinMaxScaler
-from imblearn.combine import SMOTEENN
 from sklearn.compose import ColumnTransformer
 
-from machine_predictive_maintenance.constant.training_pipeline import TARGET_COLUMN
+from machine_predictive_maintenance.constant.training_pipeline import TARGET_COLUMN, DATA_TRANSFORMATION_ARRAY_DTYPE
 
 from machine_predictive_maintenance.entity.artifact_entity import (
     DataValidationArtifact,
     DataTransformationArtifact
 )
-from machine_predictive_maintenance.constant.training_pipeline import SCHEMA_FILE_PATH
+from machine_predictive_maintenance.constant.training_pipeline import SCHEMA_FILE_PATH, PREPROCESSOR_OBJECT_FILE_NAME
 from machine_predictive_maintenance.entity.config_entity import DataTransformationConfig
 from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
 from machine_predictive_maintenance.logging.logger import logging
+from machine_predictive_maintenance.profiling.profiler import profile_stage
+from machine_predictive_maintenance.utils.main_utils.dtype_plan import DtypePlan
+from machine_predictive_maintenance.utils.main_utils.feature_engine import RollingFeatureEngine
 from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file, drop_columns, save_numpy_array_data, save_object
 
 class DataTransformation:
@@ -27,28 +29,31 @@ class DataTransformation:
     Args:
         data_validation_artifact (DataValidationArtifact): The artifact generated after data validation.
         data_transformation_config (DataTransformationConfig): Configuration for data transformation.
+        schema_config (dict, optional): The parsed schema, for callers without a transformation
+            config; read from the config's schema file otherwise.
 
     """
 
     def __init__(self,data_validation_artifact: DataValidationArtifact,
-                 data_transformation_config: DataTransformationConfig):
+                 data_transformation_config: DataTransformationConfig, schema_config: dict = None):
         
         try:
             self.data_validation_artifact: DataValidationArtifact = data_validation_artifact
             self.data_transformation_config: DataTransformationConfig = data_transformation_config
-            self._schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+            self._schema_config = schema_config or read_yaml_file(file_path=data_transformation_config.schema_file_path)
 
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e,sys)
         
     @staticmethod
-    def read_data(file_path) -> pd.DataFrame:
+    def read_data(file_path, schema_file_path: str = SCHEMA_FILE_PATH) -> pd.DataFrame:
 
         """
         Reads data from the specified file path.
 
         Args:
             file_path (str): Path to the file to be read.
+            schema_file_path (str, optional): Schema the dtypes are planned from.
 
         Returns:
             pd.DataFrame: Loaded data as a Pandas DataFrame.
@@ -56,7 +61,7 @@ class DataTransformation:
         """
 
         try:
-            return pd.read_csv(file_path)
+            return DtypePlan.from_yaml(schema_file_path).read_csv(file_path)
         
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e, sys)
@@ -102,6 +107,42 @@ class DataTransformation:
         
 
 
+    def get_input_features(self, df: pd.DataFrame, feature_engine: RollingFeatureEngine = None) -> pd.DataFrame:
+
+        """
+        Derives the model inputs from a raw split: Celsius temperatures, per-machine rolling
+        features when the schema enables them, and the schema's dropped columns.
+
+        Each split gets its own feature engine, so no machine history leaks from train into test.
+
+        Args:
+            df (pd.DataFrame): Raw split including the target column.
+            feature_engine (RollingFeatureEngine, optional): Engine to continue from, for a split
+                read in chunks. A fresh engine is used if omitted.
+
+        Returns:
+            pd.DataFrame: Input features ready for the preprocessor.
+
+        """
+
+        try:
+            input_feature_df = df.drop(columns=[TARGET_COLUMN])
+
+            input_feature_df['Air temperature [c]'] = input_feature_df['Air temperature [K]'] - 273.15
+            input_feature_df['Process temperature [c]'] = input_feature_df['Process temperature [K]'] - 273.15
+
+            if RollingFeatureEngine.is_enabled(self._schema_config):
+                with profile_stage("rolling_features", rows=len(input_feature_df)):
+                    if feature_engine is None:
+                        feature_engine = RollingFeatureEngine.from_schema(self._schema_config)
+                    input_feature_df = feature_engine.transform(input_feature_df)
+
+            return drop_columns(df=input_feature_df, cols=self._schema_config['drop_columns'])
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
     def initiate_data_transformation(self) -> DataTransformationArtifact:
         
         """
@@ -120,70 +161,77 @@ class DataTransformation:
             preprocessor = self.get_data_transformer_object()
 
 
-            train_df = DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path)
-            test_df = DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path)
-
-            input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN], axis=1)
-            target_feature_train_df = train_df[TARGET_COLUMN]
-
-            input_feature_train_df['Air temperature [c]'] = input_feature_train_df['Air temperature [K]'] - 273.15
-            input_feature_train_df['Process temperature [c]'] = input_feature_train_df['Process temperature [K]'] - 273.15
-
+            schema_file_path = self.data_transformation_config.schema_file_path
+            train_df = DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path, schema_file_path)
+            test_df = DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path, schema_file_path)
 
-            drop_cols = self._schema_config['drop_columns']
+            dtype_plan = DtypePlan(self._schema_config)
+            dtype_plan.record_memory("train", train_df)
+            dtype_plan.record_memory("test", test_df)
 
-            input_feature_train_df = drop_columns(df=input_feature_train_df, cols = drop_cols)
-
-            logging.info("Completed dropping the columns for Training dataset")
-            
+            input_feature_train_df = self.get_input_features(train_df)
+            target_feature_train_df = train_df[TARGET_COLUMN]
 
+            logging.info("Completed feature preparation for Training dataset")
 
-            input_feature_test_df = test_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_feature_test_df = self.get_input_features(test_df)
             target_feature_test_df = test_df[TARGET_COLUMN]
 
-            input_feature_test_df['Air temperature [c]'] = input_feature_test_df['Air temperature [K]'] - 273.15
-            input_feature_test_df['Process temperature [c]'] = input_feature_test_df['Process temperature [K]'] - 273.15
-
+            logging.info("Completed feature preparation for Testing dataset")
 
-            drop_cols = self._schema_config['drop_columns']
-
-            input_feature_test_df = drop_columns(df=input_feature_test_df, cols = drop_cols)
-
-            logging.info("Completed dropping the columns for Testing dataset")
-
-            
-            input_feature_train_arr = preprocessor.fit_transform(input_feature_train_df)
-            
             
-            input_feature_test_arr = preprocessor.transform(input_feature_test_df)
+            with profile_stage("preprocessor_fit_transform", rows=len(input_feature_train_df)):
+                input_feature_train_arr = preprocessor.fit_transform(input_feature_train_df).astype(
+                    DATA_TRANSFORMATION_ARRAY_DTYPE, copy=False
+                )
+                
+                input_feature_test_arr = preprocessor.transform(input_feature_test_df).astype(
+                    DATA_TRANSFORMATION_ARRAY_DTYPE, copy=False
+                )
 
             
-            smt =  SMOTEENN(sampling_strategy="minority")
+            # imblearn is only needed here, so it is not imported with the module
+            from imblearn.combine import SMOTEENN
 
-            input_feature_train_final, target_feature_train_final = smt.fit_resample(
-                input_feature_train_arr, target_feature_train_df
-            )
+            smt =  SMOTEENN(sampling_strategy="minority", random_state=self.data_transformation_config.random_state)
+
+            with profile_stage("smoteenn_train") as stage:
+                input_feature_train_final, target_feature_train_final = smt.fit_resample(
+                    input_feature_train_arr, target_feature_train_df
+                )
+                stage.rows = len(input_feature_train_final)
 
             logging.info("Applied SMOTEENN on training dataset")
 
-            input_feature_test_final, target_feature_test_final = smt.fit_resample(
-                input_feature_test_arr, target_feature_test_df
-            )
+            with profile_stage("smoteenn_test") as stage:
+                input_feature_test_final, target_feature_test_final = smt.fit_resample(
+                    input_feature_test_arr, target_feature_test_df
+                )
+                stage.rows = len(input_feature_test_final)
+
 
+            # SMOTE interpolates between neighbours; the ordinal codes come first in the
+            # preprocessor output and must stay whole categories for the boosting candidate
+            n_ordinal = len(self._schema_config['ordinal_columns'])
+            for arr in (input_feature_train_final, input_feature_test_final):
+                arr[:, :n_ordinal] = np.rint(arr[:, :n_ordinal])
 
             train_arr = np.c_[
-                input_feature_train_final, np.array(target_feature_train_final)
+                input_feature_train_final, np.asarray(target_feature_train_final, dtype=DATA_TRANSFORMATION_ARRAY_DTYPE)
             ]
 
             test_arr = np.c_[
-                input_feature_test_final, np.array(target_feature_test_final)
+                input_feature_test_final, np.asarray(target_feature_test_final, dtype=DATA_TRANSFORMATION_ARRAY_DTYPE)
             ]
 
-            save_numpy_array_data(self.data_transformation_config.transformed_train_file_path, array=train_arr, )
-            save_numpy_array_data(self.data_transformation_config.transformed_test_file_path,array=test_arr,)
+            save_numpy_array_data(self.data_transformation_config.transformed_train_file_path, array=train_arr,
+                                  dtype=DATA_TRANSFORMATION_ARRAY_DTYPE)
+            save_numpy_array_data(self.data_transformation_config.transformed_test_file_path, array=test_arr,
+                                  dtype=DATA_TRANSFORMATION_ARRAY_DTYPE)
             save_object( self.data_transformation_config.transformed_object_file_path, preprocessor,)
 
-            save_object( "final_model/preprocessor.pkl", preprocessor,)
+            if self.data_transformation_config.promote_to_final_model:
+                save_object( os.path.join(self.data_transformation_config.final_model_dir, PREPROCESSOR_OBJECT_FILE_NAME), preprocessor,)
 
 
             data_transformation_artifact=DataTransformationArtifact(
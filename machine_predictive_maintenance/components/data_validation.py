@@ -4,6 +4,9 @@ from machine_predictive_maintenance.exception.exception import MachinePredictive
 from machine_predictive_maintenance.logging.logger import logging
 from machine_predictive_maintenance.constant.training_pipeline import SCHEMA_FILE_PATH
 from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file, write_yaml_file
+from machine_predictive_maintenance.utils.main_utils.schema_validator import SchemaValidator
+from machine_predictive_maintenance.utils.main_utils.dtype_plan import DtypePlan
+from machine_predictive_maintenance.profiling.profiler import profile_stage
 from scipy.stats import ks_2samp
 import pandas as pd
 import sys, os
@@ -22,6 +25,7 @@ class DataValidation:
         data_ingestion_artifact (DataIngestionArtifact): Contains file paths for training and testing datasets.
         data_validation_config (DataValidationConfig): Configuration for data validation, including file paths for reports.
         _schema_config (dict): Schema configuration read from a YAML file, containing column specifications.
+        _schema_validator (SchemaValidator): Row-level validator compiled from the schema.
     """
 
     def __init__(self, data_ingestion_artifact:DataIngestionArtifact,
@@ -38,26 +42,29 @@ class DataValidation:
         try:
             self.data_ingestion_artifact= data_ingestion_artifact
             self.data_validation_config= data_validation_config
-            self._schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            self._schema_config = read_yaml_file(data_validation_config.schema_file_path)
+            self._schema_validator = SchemaValidator(self._schema_config)
+            self._dtype_plan = DtypePlan(self._schema_config)
 
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e, sys)
         
     @staticmethod
-    def read_data(file_path) -> pd.DataFrame:
+    def read_data(file_path, schema_file_path: str = SCHEMA_FILE_PATH) -> pd.DataFrame:
 
         """
         Reads data from a CSV file into a pandas DataFrame.
 
         Args:
             file_path (str): Path to the CSV file.
+            schema_file_path (str, optional): Schema the dtypes are planned from.
 
         Returns:
             pd.DataFrame: The loaded DataFrame.
         """
 
         try:
-            return pd.read_csv(file_path)
+            return DtypePlan.from_yaml(schema_file_path).read_csv(file_path)
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e, sys) 
 
@@ -75,7 +82,7 @@ class DataValidation:
         """
 
         try:
-            number_of_columns = len(self._schema_config)
+            number_of_columns = len(self._schema_config["columns"])
 
             logging.info(f"Required number of columns:{number_of_columns}")
             logging.info(f"Data frame has columns:{len(dataframe.columns)}")
@@ -144,22 +151,23 @@ class DataValidation:
             status = True
             report = {}
 
-            for column in base_df.columns:
-                d1 = base_df[column]
-                d2 = current_df[column]
+            with profile_stage("ks_2samp", rows=len(base_df) + len(current_df)):
+                for column in base_df.columns:
+                    d1 = base_df[column]
+                    d2 = current_df[column]
 
-                is_same_dist = ks_2samp(d1, d2)
-                if threshold <= is_same_dist.pvalue:
-                    is_found = False
+                    is_same_dist = ks_2samp(d1, d2)
+                    if threshold <= is_same_dist.pvalue:
+                        is_found = False
 
-                else: 
-                    is_found = True
-                    status = False
+                    else: 
+                        is_found = True
+                        status = False
 
-                report.update({column:{
-                    "p_value": float(is_same_dist.pvalue),
-                    "drift_status": is_found
-                }})
+                    report.update({column:{
+                        "p_value": float(is_same_dist.pvalue),
+                        "drift_status": is_found
+                    }})
             
             drift_report_file_path = self.data_validation_config.drift_report_file_path
 
@@ -168,18 +176,23 @@ class DataValidation:
             os.makedirs(dir_path, exist_ok=True)
 
             write_yaml_file(file_path=drift_report_file_path, content=report)
+            return status
 
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e, sys)
 
 
         
-    def initiate_data_validation(self)-> DataValidationArtifact:
+    def initiate_data_validation(self, detect_drift: bool = True)-> DataValidationArtifact:
 
         """
         Initiates the data validation process by validating column numbers, 
         column existence, and detecting dataset drift.
 
+        Args:
+            detect_drift (bool): Run the drift report here. The pipeline scheduler passes False
+                and runs ``initiate_drift_report`` as its own stage, next to transformation.
+
         Returns:
             DataValidationArtifact: An artifact containing validation results and file paths.
         """
@@ -192,8 +205,9 @@ class DataValidation:
             test_file_path = self.data_ingestion_artifact.test_file_path
 
             # read the data from the train and test 
-            train_dataframe = DataValidation.read_data(train_file_path)
-            test_dataframe = DataValidation.read_data(test_file_path)
+            schema_file_path = self.data_validation_config.schema_file_path
+            train_dataframe = DataValidation.read_data(train_file_path, schema_file_path)
+            test_dataframe = DataValidation.read_data(test_file_path, schema_file_path)
 
             # validate number of columns
             status = self.validate_number_of_columns(dataframe=train_dataframe)
@@ -217,9 +231,28 @@ class DataValidation:
             if not status:
                 validation_error_msg += f"columns are missing in test dataframe."
 
+
+            # quarantine rows with bad dtypes, categories or out of range values
+            train_validation = self._schema_validator.validate(train_dataframe)
+            test_validation = self._schema_validator.validate(test_dataframe)
+
+            invalid_train_file_path = self._schema_validator.quarantine(
+                train_validation, self.data_validation_config.invalid_train_file_path
+            )
+            invalid_test_file_path = self._schema_validator.quarantine(
+                test_validation, self.data_validation_config.invalid_test_file_path
+            )
+
+            if invalid_train_file_path or invalid_test_file_path:
+                logging.info(f"Invalid rows in train: {train_validation.invalid_count}, test: {test_validation.invalid_count}")
+
+            train_dataframe = train_validation.valid_rows()
+            test_dataframe = test_validation.valid_rows()
+            self._dtype_plan.record_memory("train", train_dataframe)
+            self._dtype_plan.record_memory("test", test_dataframe)
                                   
             ## lets check datadrift
-            status=self.detect_dataset_drift(base_df=train_dataframe,current_df=test_dataframe)
+            status=self.detect_dataset_drift(base_df=train_dataframe,current_df=test_dataframe) if detect_drift else None
             dir_path=os.path.dirname(self.data_validation_config.valid_train_file_path)
             os.makedirs(dir_path,exist_ok=True)
 
@@ -236,8 +269,8 @@ class DataValidation:
                 validation_status=status,
                 valid_train_file_path=self.data_validation_config.valid_train_file_path,
                 valid_test_file_path=self.data_validation_config.valid_test_file_path,
-                invalid_train_file_path=None,
-                invalid_test_file_path=None,
+                invalid_train_file_path=invalid_train_file_path,
+                invalid_test_file_path=invalid_test_file_path,
                 drift_report_file_path=self.data_validation_config.drift_report_file_path,
             )
 
@@ -245,3 +278,26 @@ class DataValidation:
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e,sys)
 
+    def initiate_drift_report(self, data_validation_artifact: DataValidationArtifact) -> bool:
+
+        """
+        Writes the drift report for the validated train and test files.
+
+        Args:
+            data_validation_artifact (DataValidationArtifact): Artifact of ``initiate_data_validation``.
+
+        Returns:
+            bool: True if no drift is detected, False otherwise.
+        """
+
+        try:
+            schema_file_path = self.data_validation_config.schema_file_path
+            train_dataframe = DataValidation.read_data(data_validation_artifact.valid_train_file_path, schema_file_path)
+            test_dataframe = DataValidation.read_data(data_validation_artifact.valid_test_file_path, schema_file_path)
+
+            status = self.detect_dataset_drift(base_df=train_dataframe, current_df=test_dataframe)
+            logging.info(f"Drift report written to {data_validation_artifact.drift_report_file_path}, no drift: {status}")
+            return status
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e,sys)
+
@@ -1,4 +1,5 @@
 import os, sys
+from dataclasses import asdict
 
 from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
 from machine_predictive_maintenance.logging.logger import logging
@@ -6,25 +7,29 @@ from machine_predictive_maintenance.logging.logger import logging
 from machine_predictive_maintenance.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact
 from machine_predictive_maintenance.entity.config_entity import ModelTrainerConfig
 
-from machine_predictive_maintenance.utils.main_utils.utils import save_object, load_object
+from machine_predictive_maintenance.constant.training_pipeline import MODEL_FILE_NAME
+from machine_predictive_maintenance.utils.main_utils.utils import save_object, load_object, read_yaml_file
 from machine_predictive_maintenance.utils.main_utils.utils import load_numpy_array_data, evaluate_models
 from machine_predictive_maintenance.utils.ml_utils.metric.classification_metric import get_classification_score
 from machine_predictive_maintenance.utils.ml_utils.model.estimator import MachinePredictiveModel
+from machine_predictive_maintenance.utils.ml_utils.model.fold_cache import FoldCache
+from machine_predictive_maintenance.utils.ml_utils.model.grid_search import TrialStore
+from machine_predictive_maintenance.tracking.mlflow_tracker import MlflowTracker
 
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import r2_score
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import (
     AdaBoostClassifier,
     GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
     RandomForestClassifier,
 )
-import mlflow
 
 
 class ModelTrainer:
-    def __init__(self, data_transformation_artifact: DataTransformationArtifact, model_trainer_config: ModelTrainerConfig):
+    def __init__(self, data_transformation_artifact: DataTransformationArtifact, model_trainer_config: ModelTrainerConfig,
+                 tracker: MlflowTracker = None):
 
         """
         Initialize the ModelTrainer class with the provided artifacts and configuration.
@@ -32,40 +37,57 @@ class ModelTrainer:
         Args:
             data_transformation_artifact (DataTransformationArtifact): The artifact containing transformed training and testing data paths.
             model_trainer_config (ModelTrainerConfig): The configuration object for the model trainer, including file paths and other settings.
+            tracker (MlflowTracker, optional): The pipeline's MLflow run. If omitted, the trainer opens and closes its own.
         """
 
         try:
             self.data_transformation_artifact = data_transformation_artifact
             self.model_trainer_config = model_trainer_config
+            self.tracker = tracker
 
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e, sys)
         
-    def track_mlflow(self, best_model, classification_metric, input_example):
+    def track_mlflow(self, best_model_name, best_model, classification_train_metric, classification_test_metric, input_example):
 
         """
-        Log model and metrics to MLflow.
+        Queue the best model's metrics and the model itself on the MLflow tracker.
+
+        Returns immediately; the model is serialized and uploaded once, in the tracker's thread.
 
         Args:
+            best_model_name: Name of the selected candidate.
             best_model: The trained model object.
-            classification_metric: The classification metrics (f1, precision, recall).
+            classification_train_metric: The classification metrics on the train set.
+            classification_test_metric: The classification metrics on the test set.
             input_example: An example input data sample for the model.
         """
 
         try:
-            with mlflow.start_run():
-                f1_score=classification_metric.f1_score
-                precision_score=classification_metric.precision_score
-                recall_score=classification_metric.recall_score
-
-                mlflow.log_metric("f1_score",f1_score)
-                mlflow.log_metric("precision",precision_score)
-                mlflow.log_metric("recall_score",recall_score)
-                mlflow.sklearn.log_model(best_model,"model", input_example=input_example)
+            metrics = {}
+            for prefix, classification_metric in (("train", classification_train_metric), ("test", classification_test_metric)):
+                for metric_name, value in asdict(classification_metric).items():
+                    metrics[f"{prefix}_{metric_name}"] = value
+
+            self.tracker.log_params({"best_model": best_model_name})
+            self.tracker.log_metrics(metrics)
+            self.tracker.log_model(best_model, input_example=input_example)
                 
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e, sys)
     
+    @staticmethod
+    def positive_scores(model, X):
+
+        """
+        Returns the positive-class scores used for PR-AUC and ROC-AUC, or None if the model has none.
+        """
+
+        if hasattr(model, "predict_proba"):
+            return model.predict_proba(X)[:, 1]
+        if hasattr(model, "decision_function"):
+            return model.decision_function(X)
+        return None
 
     def train_model(self, X_train, y_train, X_test, y_test ):
 
@@ -82,12 +104,19 @@ class ModelTrainer:
             ModelTrainerArtifact: An artifact containing details about the trained model and its metrics.
         """
 
+        # the ordinal-encoded columns lead the preprocessor output
+        categorical_features = list(range(len(read_yaml_file(self.model_trainer_config.schema_file_path)['ordinal_columns'])))
+
         models = {
                 "Random Forest": RandomForestClassifier(verbose=1),
                 "Decision Tree": DecisionTreeClassifier(),
                 "Gradient Boosting": GradientBoostingClassifier(verbose=1),
                 "Logistic Regression": LogisticRegression(verbose=1),
                 "AdaBoost": AdaBoostClassifier(),
+                "Hist Gradient Boosting": HistGradientBoostingClassifier(
+                    categorical_features=categorical_features, early_stopping=True,
+                    max_iter=500, n_iter_no_change=10, random_state=42,
+                ),
             }
         
         params={
@@ -114,12 +143,27 @@ class ModelTrainer:
             "AdaBoost":{
                 'learning_rate':[.1,.01,.001],
                 'n_estimators': [8,16,32,64,128,256]
+            },
+            # max_iter is bounded by early stopping, so only the tree shape is searched
+            "Hist Gradient Boosting":{
+                'learning_rate':[.1,.05],
+                'max_leaf_nodes':[15,31,63],
             }
             
         }
 
-        model_report: dict = evaluate_models(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
-                                             models=models, param=params)
+        # an experiment variant may train a subset of the candidates or search other grids
+        if self.model_trainer_config.model_names:
+            models = {name: models[name] for name in self.model_trainer_config.model_names}
+        params.update(self.model_trainer_config.param_grids or {})
+
+        with FoldCache(X_train, y_train, n_splits=self.model_trainer_config.cv_folds,
+                       cache_dir=self.model_trainer_config.fold_cache_dir) as fold_cache:
+            trial_store = TrialStore(self.model_trainer_config.trials_file_path, fingerprint=fold_cache.fingerprint)
+            model_report: dict = evaluate_models(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
+                                                 models=models, param=params, tracker=self.tracker,
+                                                 fold_cache=fold_cache, n_jobs=self.model_trainer_config.n_jobs,
+                                                 trial_store=trial_store)
         
         best_model_score = max(sorted(model_report.values()))
 
@@ -134,19 +178,17 @@ class ModelTrainer:
         best_model = models[best_model_name]
 
         y_train_pred = best_model.predict(X_train)
-        classification_train_metric = get_classification_score(y_true=y_train, y_pred=y_train_pred)
+        classification_train_metric = get_classification_score(y_true=y_train, y_pred=y_train_pred,
+                                                               y_score=self.positive_scores(best_model, X_train))
 
         input_example = X_train[:1]
-        print(input_example)
-        # Track the experiments with mlflow
-        self.track_mlflow(best_model, classification_train_metric, input_example)
-
 
         y_test_pred=best_model.predict(X_test)
-        classification_test_metric = get_classification_score(y_true=y_test, y_pred=y_test_pred)
+        classification_test_metric = get_classification_score(y_true=y_test, y_pred=y_test_pred,
+                                                              y_score=self.positive_scores(best_model, X_test))
 
-        # Track the experiments with mlflow
-        self.track_mlflow(best_model, classification_test_metric, input_example)
+        # Track the experiments with mlflow: one run, model logged once in the background
+        self.track_mlflow(best_model_name, best_model, classification_train_metric, classification_test_metric, input_example)
 
 
         preprocessor = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
@@ -157,9 +199,12 @@ class ModelTrainer:
 
         Machine_Predictive_Model = MachinePredictiveModel(model=best_model)
 
-        save_object(self.model_trainer_config.trained_model_file_path,obj=MachinePredictiveModel)
+        save_object(self.model_trainer_config.trained_model_file_path,obj=Machine_Predictive_Model)
 
-        save_object("final_model/model.pkl",best_model)
+        if self.model_trainer_config.promote_to_final_model:
+            save_object(os.path.join(self.model_trainer_config.final_model_dir, MODEL_FILE_NAME),best_model)
+        else:
+            logging.info("Trained on a sample, final_model/ is left unchanged")
 
         ## Model Trainer Artifact
         model_trainer_artifact=ModelTrainerArtifact(trained_model_file_path=self.model_trainer_config.trained_model_file_path,
@@ -195,7 +240,16 @@ class ModelTrainer:
                 test_arr[:, -1],
             )
 
-            model_trainer_artifact=self.train_model(X_train,y_train,X_test,y_test)
+            owns_tracker = self.tracker is None
+            if owns_tracker:
+                self.tracker = MlflowTracker()
+                self.tracker.start_run(run_name="model_trainer")
+
+            try:
+                model_trainer_artifact=self.train_model(X_train,y_train,X_test,y_test)
+            finally:
+                if owns_tracker:
+                    self.tracker.close()
             return model_trainer_artifact
             
 
@@ -1,7 +1,4 @@
 import os
-import sys
-import pandas as pd
-import numpy as np
 
 """
 defining common constant variable for training pipeline
@@ -9,6 +6,8 @@ defining common constant variable for training pipeline
 TARGET_COLUMN = "Target"
 PIPELINE_NAME: str = "Machine_Predictive_Maintenance"
 ARTIFACT_DIR: str = "Artifacts"
+# names the run directories Artifacts/<timestamp>
+RUN_TIMESTAMP_FORMAT: str = "%m_%d_%Y_%H_%M_%S"
 FILE_NAME: str = "predictive_maintenance.csv"
 
 TRAIN_FILE_NAME: str = "train.csv"
@@ -16,6 +15,14 @@ TEST_FILE_NAME: str = "test.csv"
 
 SCHEMA_FILE_PATH = os.path.join("data_schema", "schema.yaml")
 
+# "in_memory" trains on the full arrays, "chunked" streams the data in bounded batches,
+# "fast" runs the in-memory pipeline on a stratified sample that is never promoted
+TRAINING_MODE: str = "in_memory"
+
+# seeds the train/test split and SMOTEENN, so every run on the same data, and every
+# experiment variant, is scored on the same holdout
+RANDOM_STATE: int = 42
+
 SAVED_MODEL_DIR = os.path.join("saved_models")
 MODEL_FILE_NAME = "model.pkl"
 
@@ -50,6 +57,9 @@ DATA_TRANSFORMATION_TRAIN_FILE_PATH: str = "train.npy"
 
 DATA_TRANSFORMATION_TEST_FILE_PATH: str = "test.npy"
 
+# transformed arrays are stored and trained on in single precision, half the memory of float64
+DATA_TRANSFORMATION_ARRAY_DTYPE: str = "float32"
+
 """
 Model Trainer ralated constant start with MODE TRAINER VAR NAME
 """
@@ -71,5 +81,175 @@ MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
 MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD: float = 0.05
+MODEL_TRAINER_CV_FOLDS: int = 5
+MODEL_TRAINER_FOLD_CACHE_DIR: str = "fold_cache"
+# one line per finished grid search trial, so an interrupted search resumes instead of restarting
+MODEL_TRAINER_TRIALS_FILE_NAME: str = "grid_search_trials.jsonl"
+# grid search workers; they share the memory-mapped training matrix instead of copies
+MODEL_TRAINER_N_JOBS: int = -1
+
+TRAINING_BUCKET_NAME = "machinepredictive"
+
+"""
+Model Puller related constant start with MODEL_PULLER VAR NAME
+"""
+
+MODEL_PULLER_S3_PREFIX: str = "final_model"
+MODEL_PULLER_TIMESTAMP_FORMAT: str = "%m_%d_%Y_%H_%M_%S"
+MODEL_PULLER_CACHE_DIR: str = "model_cache"
+MODEL_PULLER_POLL_INTERVAL_SECONDS: int = 300
+MODEL_PULLER_LOCAL_MODEL_DIR: str = "final_model"
+PREPROCESSOR_OBJECT_FILE_NAME: str = "preprocessor.pkl"
+MODEL_PULLER_SOURCE: str = "s3"
+
+"""
+Pipeline profiling related constant start with PROFILING VAR NAME
+"""
+
+PROFILING_METRICS_FILE_NAME: str = "stage_metrics.yaml"
+PROFILING_MLFLOW_RUN_NAME: str = "pipeline_profile"
+PROFILING_MEMORY_REPORT_FILE_NAME: str = "memory_report.yaml"
+
+"""
+Serving metrics related constant start with METRICS VAR NAME
+"""
+
+METRICS_NAMESPACE: str = "machine_predictive"
+METRICS_LATENCY_BUCKETS: tuple = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_BATCH_SIZE_BUCKETS: tuple = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+"""
+Serving related constant start with SERVING VAR NAME
+"""
+
+SERVING_HOST: str = "0.0.0.0"
+SERVING_PORT: int = 8080
+SERVING_WORKERS: int = 1
+SERVING_RELOAD_CHECK_SECONDS: int = 30
+SERVING_WORKER_SHUTDOWN_TIMEOUT_SECONDS: int = 30
+# how often each prefork worker writes its metrics for /metrics to add up across workers
+SERVING_METRICS_SNAPSHOT_SECONDS: float = 5.0
+
+"""
+Prediction related constant start with PREDICTION VAR NAME
+"""
+
+PREDICTION_OUTPUT_DIR: str = "prediction_output"
+PREDICTION_INVALID_DIR: str = os.path.join(PREDICTION_OUTPUT_DIR, "invalid")
+PREDICTION_OPTIONAL_COLUMNS: tuple = (TARGET_COLUMN, "Failure Type")
+PREDICTION_HTML_PAGE_SIZE: int = 100
+PREDICTION_HTML_MAX_PAGE_SIZE: int = 1000
+PREDICTION_BATCH_CHUNK_SIZE: int = 50_000
+
+"""
+Streaming prediction related constant start with STREAMING VAR NAME
+"""
+
+STREAMING_PREDICTION_COLLECTION_NAME: str = "Machine_Predictive_Predictions"
+STREAMING_MAX_BATCH_SIZE: int = 5000
+STREAMING_MAX_BATCH_WAIT_MS: int = 50
+STREAMING_EVENT_QUEUE_SIZE: int = 100_000
+STREAMING_RESULT_QUEUE_SIZE: int = 64
+STREAMING_REPORT_INTERVAL_SECONDS: int = 10
+
+"""
+Rolling feature related constant start with FEATURE_ENGINE VAR NAME
+"""
+
+FEATURE_ENGINE_WINDOW_SIZE: int = 10
+FEATURE_ENGINE_MAX_MACHINES: int = 100_000
+
+"""
+Prediction cache related constant start with PREDICTION_CACHE VAR NAME
+"""
+
+PREDICTION_CACHE_ENABLED: bool = False
+PREDICTION_CACHE_MAX_ENTRIES: int = 100_000
+PREDICTION_CACHE_TTL_SECONDS: int = 300
+PREDICTION_CACHE_DECIMALS: int = 6
+
+"""
+Async Mongo related constant start with MONGO VAR NAME
+"""
+
+MONGO_PREDICTION_COLLECTION_NAME: str = STREAMING_PREDICTION_COLLECTION_NAME
+MONGO_MAX_POOL_SIZE: int = 50
+MONGO_MIN_POOL_SIZE: int = 0
+MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+MONGO_CONNECT_TIMEOUT_MS: int = 5000
+MONGO_SOCKET_TIMEOUT_MS: int = 10000
+MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 2000
+MONGO_MACHINE_HISTORY_LIMIT: int = 100
+
+"""
+Prediction sink related constant start with PREDICTION_SINK VAR NAME
+"""
+
+PREDICTION_SINK_ENABLED: bool = True
+PREDICTION_SINK_FLUSH_SIZE: int = 1000
+PREDICTION_SINK_FLUSH_INTERVAL_SECONDS: float = 1.0
+PREDICTION_SINK_MAX_BUFFERED_RECORDS: int = 100_000
+PREDICTION_SINK_MAX_RETRIES: int = 3
+PREDICTION_SINK_RETRY_BACKOFF_SECONDS: float = 0.5
+
+"""
+Chunked training related constant start with CHUNKED_TRAINING VAR NAME
+"""
+
+CHUNKED_TRAINING_DIR_NAME: str = "chunked_training"
+CHUNKED_TRAINING_INVALID_DIR: str = "invalid"
+CHUNKED_TRAINING_CHUNK_SIZE: int = 100_000
+CHUNKED_TRAINING_EPOCHS: int = 5
+CHUNKED_TRAINING_RANDOM_STATE: int = 42
+
+"""
+MLflow tracking related constant start with MLFLOW VAR NAME
+"""
+
+MLFLOW_TRACKING_ENABLED: bool = True
+# local file store used when MLFLOW_TRACKING_URI is not set
+MLFLOW_TRACKING_DIR: str = "mlruns"
+MLFLOW_EXPERIMENT_NAME: str = PIPELINE_NAME
+MLFLOW_BATCH_SIZE: int = 1000
+MLFLOW_FLUSH_INTERVAL_SECONDS: float = 5.0
+MLFLOW_CLOSE_TIMEOUT_SECONDS: float = 600.0
+
+"""
+Pipeline scheduler related constant start with PIPELINE_SCHEDULER VAR NAME
+"""
+
+# stages run at the same time once their inputs are ready; 1 runs the pipeline sequentially
+PIPELINE_SCHEDULER_MAX_WORKERS: int = 4
+
+"""
+Checkpoint related constant start with CHECKPOINT VAR NAME
+"""
+
+# completion markers and outputs of finished stages, inside Artifacts/<timestamp>/
+CHECKPOINT_DIR_NAME: str = "checkpoints"
+CHECKPOINT_RUN_FILE_NAME: str = "run.yaml"
+
+"""
+Experiment runner related constant start with EXPERIMENT VAR NAME
+"""
+
+EXPERIMENT_FILE_PATH: str = "experiments.yaml"
+# variant pipelines run at the same time, each in its own process
+EXPERIMENT_MAX_WORKERS: int = 2
+# each variant's model is written here, inside its own artifact directory
+EXPERIMENT_MODEL_DIR_NAME: str = "final_model"
+EXPERIMENT_REPORT_DIR: str = "experiments"
+EXPERIMENT_REPORT_FILE_NAME: str = "experiment_report.yaml"
+# the test metric the winning variant is chosen by
+EXPERIMENT_SELECTION_METRIC: str = "f1_score"
+
+"""
+Fast mode related constant start with FAST_MODE VAR NAME
+"""
 
-TRAINING_BUCKET_NAME = "machinepredictive"
\ No newline at end of file
+FAST_MODE_SAMPLE_FRACTION: float = 0.1
+# rare strata keep at least this many rows (or all of them) so every failure type is still trained on
+FAST_MODE_MIN_STRATUM_ROWS: int = 50
+FAST_MODE_STRATA_COLUMNS: list = [TARGET_COLUMN, "Failure Type"]
+FAST_MODE_ARTIFACT_SUFFIX: str = "_sampled"
+FAST_MODE_MANIFEST_FILE_NAME: str = "sample_manifest.yaml"
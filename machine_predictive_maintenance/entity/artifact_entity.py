@@ -4,9 +4,12 @@ from dataclasses import dataclass
 class DataIngestionArtifact:
     trained_file_path:str
     test_file_path:str
+    # True when the data is a stratified sample of the collection (fast mode)
+    sampled: bool = False
 
 @dataclass
 class DataValidationArtifact:
+    # None when the drift report runs as a separate pipeline stage
     validation_status: bool
     valid_train_file_path: str
     valid_test_file_path: str
@@ -25,9 +28,21 @@ class ClassificationMetricArtifact:
     f1_score: float
     precision_score: float
     recall_score: float
-    
+    balanced_accuracy_score: float = None
+    # ranking metrics need scores, so they are None for models evaluated on labels only
+    pr_auc_score: float = None
+    roc_auc_score: float = None
+
 @dataclass
 class ModelTrainerArtifact:
     trained_model_file_path: str
     train_metric_artifact: ClassificationMetricArtifact
-    test_metric_artifact: ClassificationMetricArtifact
\ No newline at end of file
+    test_metric_artifact: ClassificationMetricArtifact
+
+@dataclass
+class ModelPullerArtifact:
+    model_version: str
+    model_dir: str
+    model_file_path: str
+    preprocessor_file_path: str
+    content_hash: str
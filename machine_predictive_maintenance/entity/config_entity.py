@@ -1,16 +1,49 @@
 from datetime import datetime
+from pathlib import Path
 import os
 
 from machine_predictive_maintenance.constant import training_pipeline
 
 class TrainingPipelineConfig:
-    def __init__(self, timestamp=datetime.now()):
-        timestamp=timestamp.strftime("%m_%d_%Y_%H_%M_%S")
+    def __init__(self, timestamp: datetime=None, training_mode: str=None, sample_fraction: float=None,
+                 run_id: str=None, schema_file_path: str=None, param_grids: dict=None, model_names: list=None,
+                 isolated: bool=False):
+        # the default is taken per call: a default of datetime.now() would be fixed at import,
+        # so every pipeline created in a long-running process would share one directory
+        timestamp=(timestamp or datetime.now()).strftime(training_pipeline.RUN_TIMESTAMP_FORMAT)
+        # explicit values come from a resumed run's checkpoints and win over the environment
+        self.training_mode: str=training_mode or os.getenv("TRAINING_MODE", training_pipeline.TRAINING_MODE)
+        # fast mode trains on a stratified sample: its artifacts are kept apart and never promoted
+        self.sampled: bool=self.training_mode == "fast"
+        self.sample_fraction: float=(
+            sample_fraction or float(os.getenv("TRAINING_SAMPLE_FRACTION", training_pipeline.FAST_MODE_SAMPLE_FRACTION))
+            if self.sampled else None
+        )
         self.pipeline_name=training_pipeline.PIPELINE_NAME
         self.artifact_name=training_pipeline.ARTIFACT_DIR
-        self.artifact_dir=os.path.join(self.artifact_name,timestamp)
-        self.model_dir=os.path.join("final_model")
+        # experiment variants started together get the same timestamp and a run id each
+        self.run_id: str=run_id
+        self.artifact_dir=os.path.join(
+            self.artifact_name, timestamp + (f"_{run_id}" if run_id else "")
+            + (training_pipeline.FAST_MODE_ARTIFACT_SUFFIX if self.sampled else "")
+        )
+        # an isolated run keeps its model inside its artifact directory; only the experiment
+        # runner promotes it to final_model/
+        self.isolated: bool=isolated
+        self.model_dir=(
+            os.path.join(self.artifact_dir, training_pipeline.EXPERIMENT_MODEL_DIR_NAME) if isolated
+            else os.path.join("final_model")
+        )
+        self.sync_to_s3: bool=not (self.sampled or isolated)
+        self.schema_file_path: str=schema_file_path or training_pipeline.SCHEMA_FILE_PATH
+        # per-candidate grids replacing the model trainer's defaults, and the candidates to train
+        self.param_grids: dict=param_grids
+        self.model_names: list=model_names
         self.timestamp: str=timestamp
+        self.stage_metrics_file_path: str=os.path.join(self.artifact_dir,training_pipeline.PROFILING_METRICS_FILE_NAME)
+        self.memory_report_file_path: str=os.path.join(self.artifact_dir,training_pipeline.PROFILING_MEMORY_REPORT_FILE_NAME)
+        self.max_workers: int=int(os.getenv("PIPELINE_MAX_WORKERS", training_pipeline.PIPELINE_SCHEDULER_MAX_WORKERS))
+        self.checkpoint_dir: str=os.path.join(self.artifact_dir,training_pipeline.CHECKPOINT_DIR_NAME)
 
 
 class DataIngestionConfig:
@@ -30,8 +63,16 @@ class DataIngestionConfig:
         )
         
         self.train_test_split_ratio:float = training_pipeline.DATA_INGESTION_TRAIN_TEST_SPLIT_RATION
+        self.random_state: int = training_pipeline.RANDOM_STATE
         self.collection_name: str = training_pipeline.DATA_INGESTION_COLLECTION_NAME
         self.database_name: str = training_pipeline.DATA_INGESTION_DATABASE_NAME
+        self.sample_fraction: float = training_pipeline_config.sample_fraction
+        self.sample_min_stratum_rows: int = training_pipeline.FAST_MODE_MIN_STRATUM_ROWS
+        self.sample_strata_columns: list = training_pipeline.FAST_MODE_STRATA_COLUMNS
+        self.sample_manifest_file_path: str = os.path.join(
+            self.data_ingestion_dir, training_pipeline.FAST_MODE_MANIFEST_FILE_NAME
+        )
+        self.schema_file_path: str = training_pipeline_config.schema_file_path
         
 class DataValidationConfig:
     def __init__(self, training_pipeline_config:TrainingPipelineConfig):
@@ -40,13 +81,14 @@ class DataValidationConfig:
         self.invalid_data_dir:str = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_INVALID_DIR)
         self.valid_train_file_path:str = os.path.join(self.data_validation_dir, training_pipeline.TRAIN_FILE_NAME)
         self.valid_test_file_path:str = os.path.join(self.data_validation_dir, training_pipeline.TEST_FILE_NAME)
-        self.invalid_train_file_path:str = os.path.join(self.data_validation_dir, training_pipeline.TRAIN_FILE_NAME)
-        self.invalid_test_file_path:str = os.path.join(self.data_validation_dir, training_pipeline.TEST_FILE_NAME)
+        self.invalid_train_file_path:str = os.path.join(self.invalid_data_dir, training_pipeline.TRAIN_FILE_NAME)
+        self.invalid_test_file_path:str = os.path.join(self.invalid_data_dir, training_pipeline.TEST_FILE_NAME)
         self.drift_report_file_path:str = os.path.join(
             self.data_validation_dir,
             training_pipeline.DATA_VALIDATION_DRIFT_REPORT_DIR,
             training_pipeline.DATA_VALIDATION_DRIFT_REPORT_FILE_NAME,
         )
+        self.schema_file_path: str = training_pipeline_config.schema_file_path
 
 class DataTransformationConfig:
     def __init__(self, training_pipeline_config: TrainingPipelineConfig):
@@ -57,6 +99,10 @@ class DataTransformationConfig:
                                                             training_pipeline.TEST_FILE_NAME.replace("csv","npy"),)
         self.transformed_object_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
                                                             training_pipeline.PREPROCESSING_OBJECT_FILE_NAME,)
+        self.promote_to_final_model: bool = not training_pipeline_config.sampled
+        self.final_model_dir: str = training_pipeline_config.model_dir
+        self.schema_file_path: str = training_pipeline_config.schema_file_path
+        self.random_state: int = training_pipeline.RANDOM_STATE
         
         
 class ModelTrainerConfig:
@@ -69,4 +115,135 @@ class ModelTrainerConfig:
             training_pipeline.MODEL_FILE_NAME
         )
         self.expected_accuracy: float = training_pipeline.MODEL_TRAINER_EXPECTED_SCORE
-        self.overfitting_underfitting_threshold = training_pipeline.MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD
\ No newline at end of file
+        self.overfitting_underfitting_threshold = training_pipeline.MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD
+        self.fold_cache_dir: str = os.path.join(self.model_trainer_dir, training_pipeline.MODEL_TRAINER_FOLD_CACHE_DIR)
+        self.trials_file_path: str = os.path.join(self.model_trainer_dir, training_pipeline.MODEL_TRAINER_TRIALS_FILE_NAME)
+        self.cv_folds: int = training_pipeline.MODEL_TRAINER_CV_FOLDS
+        self.n_jobs: int = int(os.getenv("MODEL_TRAINER_N_JOBS", training_pipeline.MODEL_TRAINER_N_JOBS))
+        self.promote_to_final_model: bool = not training_pipeline_config.sampled
+        self.final_model_dir: str = training_pipeline_config.model_dir
+        self.schema_file_path: str = training_pipeline_config.schema_file_path
+        self.param_grids: dict = training_pipeline_config.param_grids
+        self.model_names: list = training_pipeline_config.model_names
+
+
+class ChunkedTrainingConfig:
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig):
+        self.chunked_training_dir: str = os.path.join(
+            training_pipeline_config.artifact_dir, training_pipeline.CHUNKED_TRAINING_DIR_NAME
+        )
+        self.invalid_data_dir: str = os.path.join(self.chunked_training_dir, training_pipeline.CHUNKED_TRAINING_INVALID_DIR)
+        self.transformed_object_file_path: str = os.path.join(
+            self.chunked_training_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
+            training_pipeline.PREPROCESSING_OBJECT_FILE_NAME,
+        )
+        self.trained_model_file_path: str = os.path.join(
+            self.chunked_training_dir, training_pipeline.MODEL_TRAINER_TRAINED_MODEL_DIR, training_pipeline.MODEL_FILE_NAME
+        )
+        # rows held in memory at once; peak memory scales with this, not with the dataset
+        self.chunk_size: int = int(os.getenv("TRAINING_CHUNK_SIZE", training_pipeline.CHUNKED_TRAINING_CHUNK_SIZE))
+        self.epochs: int = int(os.getenv("TRAINING_CHUNKED_EPOCHS", training_pipeline.CHUNKED_TRAINING_EPOCHS))
+        self.random_state: int = training_pipeline.CHUNKED_TRAINING_RANDOM_STATE
+        self.expected_accuracy: float = training_pipeline.MODEL_TRAINER_EXPECTED_SCORE
+        self.promote_to_final_model: bool = not training_pipeline_config.sampled
+        self.final_model_dir: str = training_pipeline_config.model_dir
+        self.schema_file_path: str = training_pipeline_config.schema_file_path
+
+
+class ModelPullerConfig:
+    def __init__(self):
+        # "s3" pulls the latest version from the bucket, "local" watches final_model/ only
+        self.source: str = os.getenv("MODEL_SOURCE", training_pipeline.MODEL_PULLER_SOURCE)
+        self.bucket_name: str = os.getenv("MODEL_BUCKET_NAME", training_pipeline.TRAINING_BUCKET_NAME)
+        self.s3_prefix: str = training_pipeline.MODEL_PULLER_S3_PREFIX
+        self.endpoint_url: str = os.getenv("AWS_ENDPOINT_URL")
+        self.cache_dir: str = os.getenv("MODEL_CACHE_DIR", training_pipeline.MODEL_PULLER_CACHE_DIR)
+        self.local_model_dir: str = training_pipeline.MODEL_PULLER_LOCAL_MODEL_DIR
+        self.poll_interval_seconds: int = int(
+            os.getenv("MODEL_POLL_INTERVAL_SECONDS", training_pipeline.MODEL_PULLER_POLL_INTERVAL_SECONDS)
+        )
+        self.model_file_name: str = training_pipeline.MODEL_FILE_NAME
+        self.preprocessor_file_name: str = training_pipeline.PREPROCESSOR_OBJECT_FILE_NAME
+
+
+class ServingConfig:
+    def __init__(self):
+        self.host: str = os.getenv("SERVING_HOST", training_pipeline.SERVING_HOST)
+        self.port: int = int(os.getenv("SERVING_PORT", training_pipeline.SERVING_PORT))
+        self.workers: int = int(os.getenv("SERVING_WORKERS", training_pipeline.SERVING_WORKERS))
+        self.reload_check_seconds: int = int(
+            os.getenv("SERVING_RELOAD_CHECK_SECONDS", training_pipeline.SERVING_RELOAD_CHECK_SECONDS)
+        )
+        self.worker_shutdown_timeout_seconds: int = training_pipeline.SERVING_WORKER_SHUTDOWN_TIMEOUT_SECONDS
+        self.metrics_snapshot_seconds: float = float(
+            os.getenv("SERVING_METRICS_SNAPSHOT_SECONDS", training_pipeline.SERVING_METRICS_SNAPSHOT_SECONDS)
+        )
+
+
+class StreamingConfig:
+    def __init__(self):
+        self.database_name: str = training_pipeline.DATA_INGESTION_DATABASE_NAME
+        self.source_collection_name: str = training_pipeline.DATA_INGESTION_COLLECTION_NAME
+        self.prediction_collection_name: str = training_pipeline.STREAMING_PREDICTION_COLLECTION_NAME
+        self.max_batch_size: int = int(os.getenv("STREAMING_MAX_BATCH_SIZE", training_pipeline.STREAMING_MAX_BATCH_SIZE))
+        self.max_batch_wait_ms: int = int(os.getenv("STREAMING_MAX_BATCH_WAIT_MS", training_pipeline.STREAMING_MAX_BATCH_WAIT_MS))
+        self.event_queue_size: int = training_pipeline.STREAMING_EVENT_QUEUE_SIZE
+        self.result_queue_size: int = training_pipeline.STREAMING_RESULT_QUEUE_SIZE
+        self.report_interval_seconds: int = training_pipeline.STREAMING_REPORT_INTERVAL_SECONDS
+
+
+class PredictionCacheConfig:
+    def __init__(self):
+        self.enabled: bool = os.getenv(
+            "PREDICTION_CACHE_ENABLED", str(training_pipeline.PREDICTION_CACHE_ENABLED)
+        ).lower() in ("1", "true", "yes")
+        self.max_entries: int = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", training_pipeline.PREDICTION_CACHE_MAX_ENTRIES))
+        self.ttl_seconds: float = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", training_pipeline.PREDICTION_CACHE_TTL_SECONDS))
+        # features are rounded to this many decimals before hashing, so float noise still hits
+        self.decimals: int = training_pipeline.PREDICTION_CACHE_DECIMALS
+
+
+class MongoConfig:
+    def __init__(self):
+        self.mongo_db_url: str = os.getenv("MONGO_DB_URL")
+        self.database_name: str = training_pipeline.DATA_INGESTION_DATABASE_NAME
+        self.collection_name: str = training_pipeline.DATA_INGESTION_COLLECTION_NAME
+        self.prediction_collection_name: str = training_pipeline.MONGO_PREDICTION_COLLECTION_NAME
+        self.max_pool_size: int = int(os.getenv("MONGO_MAX_POOL_SIZE", training_pipeline.MONGO_MAX_POOL_SIZE))
+        self.min_pool_size: int = int(os.getenv("MONGO_MIN_POOL_SIZE", training_pipeline.MONGO_MIN_POOL_SIZE))
+        self.server_selection_timeout_ms: int = int(
+            os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", training_pipeline.MONGO_SERVER_SELECTION_TIMEOUT_MS)
+        )
+        self.connect_timeout_ms: int = training_pipeline.MONGO_CONNECT_TIMEOUT_MS
+        self.socket_timeout_ms: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", training_pipeline.MONGO_SOCKET_TIMEOUT_MS))
+        self.wait_queue_timeout_ms: int = training_pipeline.MONGO_WAIT_QUEUE_TIMEOUT_MS
+        self.machine_history_limit: int = training_pipeline.MONGO_MACHINE_HISTORY_LIMIT
+
+
+class PredictionSinkConfig:
+    def __init__(self):
+        self.enabled: bool = os.getenv(
+            "PREDICTION_SINK_ENABLED", str(training_pipeline.PREDICTION_SINK_ENABLED)
+        ).lower() in ("1", "true", "yes")
+        self.flush_size: int = int(os.getenv("PREDICTION_SINK_FLUSH_SIZE", training_pipeline.PREDICTION_SINK_FLUSH_SIZE))
+        self.flush_interval_seconds: float = float(
+            os.getenv("PREDICTION_SINK_FLUSH_INTERVAL_SECONDS", training_pipeline.PREDICTION_SINK_FLUSH_INTERVAL_SECONDS)
+        )
+        # records beyond this are dropped (and counted) rather than growing memory while Mongo is down
+        self.max_buffered_records: int = int(
+            os.getenv("PREDICTION_SINK_MAX_BUFFERED_RECORDS", training_pipeline.PREDICTION_SINK_MAX_BUFFERED_RECORDS)
+        )
+        self.max_retries: int = training_pipeline.PREDICTION_SINK_MAX_RETRIES
+        self.retry_backoff_seconds: float = training_pipeline.PREDICTION_SINK_RETRY_BACKOFF_SECONDS
+
+
+class MlflowTrackingConfig:
+    def __init__(self):
+        self.enabled: bool = os.getenv(
+            "MLFLOW_TRACKING_ENABLED", str(training_pipeline.MLFLOW_TRACKING_ENABLED)
+        ).lower() in ("1", "true", "yes")
+        self.tracking_uri: str = os.getenv("MLFLOW_TRACKING_URI") or Path(training_pipeline.MLFLOW_TRACKING_DIR).absolute().as_uri()
+        self.experiment_name: str = os.getenv("MLFLOW_EXPERIMENT_NAME", training_pipeline.MLFLOW_EXPERIMENT_NAME)
+        self.batch_size: int = training_pipeline.MLFLOW_BATCH_SIZE
+        self.flush_interval_seconds: float = training_pipeline.MLFLOW_FLUSH_INTERVAL_SECONDS
+        self.close_timeout_seconds: float = training_pipeline.MLFLOW_CLOSE_TIMEOUT_SECONDS
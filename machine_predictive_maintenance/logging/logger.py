@@ -1,16 +1,191 @@
 import logging
+import logging.handlers
 import os
+import json
+import queue
+import atexit
+import itertools
 from datetime import datetime
 
+"""
+Logging is configured once at import time. Records are put on an in-memory queue by the
+calling thread and written to the log file as JSON lines by a background listener thread,
+so request handlers never wait on file I/O.
+
+Environment variables:
+    LOG_LEVEL: Root level, defaults to INFO, also when the value is not a level name.
+    LOG_MODULE_LEVELS: Per-module levels, e.g. ``utils=WARNING,data_validation=DEBUG``.
+        Keys match either the logger name or the module (file) name of the call site. The root
+        logger is opened to the lowest configured level and the filter applies LOG_LEVEL to
+        every other module, so a module can be set below LOG_LEVEL as well as above it.
+    LOG_SAMPLE_EVERY: Per-module sampling, off by default, e.g. ``utils=100`` keeps one in
+        every 100 records from each call site in utils.py. The first record of a call site is
+        always kept.
+"""
+
 LOG_FILE=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 
-logs_path=os.path.join(os.getcwd(),"logs",LOG_FILE)
+logs_path=os.path.join(os.getcwd(),"logs")
 os.makedirs(logs_path,exist_ok=True)
 
 LOG_FILE_PATH=os.path.join(logs_path,LOG_FILE)
 
+DEFAULT_SAMPLE_EVERY = ""
+LOG_QUEUE_MAX_SIZE = 100_000
+
+# attributes every LogRecord has; anything else was passed through ``extra=``
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _parse_mapping(value: str) -> dict:
+    mapping = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            key, setting = item.split("=", 1)
+            mapping[key.strip()] = setting.strip()
+    return mapping
+
+
+def _parse_level(name: str, default: int = None):
+    # getLevelName maps unknown names to a "Level X" string instead of failing
+    level = logging.getLevelName((name or "").strip().upper())
+    return level if isinstance(level, int) else default
+
+
+class JsonFormatter(logging.Formatter):
+
+    """
+    Formats a record as a single JSON object per line, including any ``extra`` fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "function": record.funcName,
+            "lineno": record.lineno,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class ModuleLevelFilter(logging.Filter):
+
+    """
+    Drops records below the level configured for their logger or module, or below the
+    default level for everything else.
+
+    Args:
+        module_levels (dict): Logger or module name to level name.
+        default_level (int): Level of modules without their own entry.
+    """
+
+    def __init__(self, module_levels: dict, default_level: int = logging.NOTSET):
+        super().__init__()
+        # entries with an unknown level are ignored, so the module keeps the default level
+        levels = {name: _parse_level(level) for name, level in module_levels.items()}
+        self.module_levels = {name: level for name, level in levels.items() if level is not None}
+        self.default_level = default_level
+
+    @property
+    def min_level(self) -> int:
+        return min([self.default_level, *self.module_levels.values()])
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        level = self.module_levels.get(record.module, self.module_levels.get(record.name, self.default_level))
+        return record.levelno >= level
+
+
+class SamplingFilter(logging.Filter):
+
+    """
+    Keeps one in every N records per call site for the configured modules.
+    Warnings and errors are never sampled out.
+
+    Args:
+        sample_every (dict): Module name to N.
+    """
+
+    def __init__(self, sample_every: dict):
+        super().__init__()
+        self.sample_every = {name: int(every) for name, every in sample_every.items() if int(every) > 1}
+        self._counters = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = self.sample_every.get(record.module)
+        if every is None or record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = itertools.count()
+        # itertools.count is advanced atomically under the GIL
+        return next(counter) % every == 0
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+
+    """
+    Queue handler that defers formatting to the listener thread and never blocks the caller.
+    Only the message arguments are merged eagerly, since they may be mutated after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+log_queue = queue.Queue(maxsize=LOG_QUEUE_MAX_SIZE)
+
+file_handler = logging.FileHandler(LOG_FILE_PATH)
+file_handler.setFormatter(JsonFormatter())
+
+queue_handler = NonBlockingQueueHandler(log_queue)
+module_level_filter = ModuleLevelFilter(_parse_mapping(os.getenv("LOG_MODULE_LEVELS")),
+                                        default_level=_parse_level(os.getenv("LOG_LEVEL"), default=logging.INFO))
+queue_handler.addFilter(module_level_filter)
+queue_handler.addFilter(SamplingFilter(_parse_mapping(os.getenv("LOG_SAMPLE_EVERY", DEFAULT_SAMPLE_EVERY))))
+
+listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+
+
+def _restart_listener_after_fork():
+    # the parent's queue may hold records or a held lock at fork time, so the child gets its own
+    child_queue = queue.Queue(maxsize=LOG_QUEUE_MAX_SIZE)
+    queue_handler.queue = child_queue
+    listener.queue = child_queue
+    listener._thread = None
+    listener.start()
+
+
 logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
\ No newline at end of file
+    handlers=[queue_handler],
+    # the logger must let through the lowest module level; the filter then applies LOG_LEVEL
+    level=module_level_filter.min_level,
+)
+
+listener.start()
+atexit.register(listener.stop)
+
+if hasattr(os, "register_at_fork"):
+    # the listener thread does not survive fork, so forked workers start their own
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
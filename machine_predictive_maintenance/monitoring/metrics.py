@@ -0,0 +1,347 @@
+import os
+import json
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from machine_predictive_maintenance.constant.training_pipeline import (
+    METRICS_NAMESPACE,
+    METRICS_LATENCY_BUCKETS,
+    METRICS_BATCH_SIZE_BUCKETS,
+)
+
+
+def _format_labels(label_names: tuple, label_values: tuple, extra: str = "") -> str:
+    pairs = [
+        '{0}="{1}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(label_names, label_values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+
+    """
+    A monotonically increasing value per label combination.
+
+    Values are plain dict entries. Updates come from the event loop and from worker threads
+    (model refreshes in ``asyncio.to_thread``, the prediction cache in executor threads, the
+    streaming scorer's threads), so each update takes the metric's lock; the read-modify-write
+    of an add is not atomic otherwise. Each uvicorn worker keeps its own values; under the
+    prefork server the registry adds them up across workers, see ``MetricsRegistry``.
+
+    Args:
+        name (str): Metric name without namespace.
+        documentation (str): Help text shown by ``/metrics``.
+        label_names (tuple): Names of the labels, in the order values are passed.
+    """
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()):
+        self.name = f"{METRICS_NAMESPACE}_{name}"
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def combine(value: float, other: float) -> float:
+        return value + other
+
+    def samples(self, values: dict = None):
+        for label_values, value in (values if values is not None else self.snapshot()).items():
+            yield self.name, _format_labels(self.label_names, label_values), value
+
+
+class Gauge(Counter):
+
+    """
+    A value per label combination that can go up and down.
+
+    Across prefork workers the values are summed, which suits per-worker quantities such as
+    cache entries, or with ``multiprocess_mode="max"`` the largest is kept, for values every
+    worker shares such as the load time of a model version. Gauges of exited workers are dropped.
+
+    Args:
+        multiprocess_mode (str): ``sum`` or ``max``.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = (), multiprocess_mode: str = "sum"):
+        super().__init__(name, documentation, label_names)
+        self.combine = max if multiprocess_mode == "max" else Counter.combine
+
+    def set(self, *label_values, value: float) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram:
+
+    """
+    Cumulative bucket counts, sum and count per label combination, updated under a lock
+    like ``Counter``.
+
+    Args:
+        name (str): Metric name without namespace.
+        documentation (str): Help text shown by ``/metrics``.
+        label_names (tuple): Names of the labels, in the order values are passed.
+        buckets (tuple): Sorted upper bounds; ``+Inf`` is added automatically.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = (),
+                 buckets: tuple = METRICS_LATENCY_BUCKETS):
+        self.name = f"{METRICS_NAMESPACE}_{name}"
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *label_values, value: float) -> None:
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                # per-bucket (non-cumulative) counts, then sum and count
+                state = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bucket] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+
+        """
+        Observes the wall time of the enclosed block in seconds.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(*label_values, value=time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            # copy the bucket lists too, so a render never sees a half-applied observation
+            return {label_values: [list(bucket_counts), total, count]
+                    for label_values, (bucket_counts, total, count) in self._values.items()}
+
+    @staticmethod
+    def combine(state: list, other: list) -> list:
+        return [[a + b for a, b in zip(state[0], other[0])], state[1] + other[1], state[2] + other[2]]
+
+    def samples(self, values: dict = None):
+        values = values if values is not None else self.snapshot()
+        for label_values, (bucket_counts, total, count) in values.items():
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if upper_bound == float("inf") else repr(float(upper_bound))
+                yield (f"{self.name}_bucket",
+                       _format_labels(self.label_names, label_values, f'le="{le}"'),
+                       cumulative)
+            yield f"{self.name}_sum", _format_labels(self.label_names, label_values), total
+            yield f"{self.name}_count", _format_labels(self.label_names, label_values), count
+
+
+class MetricsRegistry:
+
+    """
+    Holds the metrics of the serving app and renders them in the Prometheus text format.
+
+    Under the prefork server a scrape reaches one worker at random, so the workers share a
+    directory: each writes a snapshot of its values to ``<pid>.json`` every few seconds and
+    when it exits, and ``render`` adds up every snapshot in the directory. Snapshots of exited
+    workers are folded into ``dead.json`` without their gauges, so counters never go back.
+    Values of other workers are at most one snapshot interval old.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.multiprocess_dir = None
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def enable_multiprocess(self, directory: str) -> None:
+        self.multiprocess_dir = directory
+
+    def reset(self) -> None:
+
+        """
+        Clears every value, so a forked worker does not report what it inherited from its parent.
+        """
+
+        for metric in self.metrics:
+            with metric._lock:
+                metric._values.clear()
+
+    def _snapshot_file_path(self, pid: int) -> str:
+        return os.path.join(self.multiprocess_dir, f"{pid}.json")
+
+    def _write(self, file_path: str, snapshot: dict) -> None:
+        temporary_file_path = f"{file_path}.tmp"
+        with open(temporary_file_path, "w") as file:
+            json.dump({name: [[list(label_values), value] for label_values, value in values.items()]
+                       for name, values in snapshot.items()}, file)
+        # readers only ever see a complete snapshot
+        os.replace(temporary_file_path, file_path)
+
+    def _read(self, file_path: str) -> dict:
+        try:
+            with open(file_path) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            # the worker exited and its snapshot was folded into dead.json in between
+            return {}
+        return {name: {tuple(label_values): value for label_values, value in values}
+                for name, values in data.items()}
+
+    def _merge(self, merged: dict, snapshot: dict, include_gauges: bool = True) -> dict:
+        for metric in self.metrics:
+            if metric.metric_type == "gauge" and not include_gauges:
+                continue
+            values = merged.setdefault(metric.name, {})
+            for label_values, value in snapshot.get(metric.name, {}).items():
+                values[label_values] = value if label_values not in values else metric.combine(values[label_values], value)
+        return merged
+
+    def write_snapshot(self) -> None:
+
+        """
+        Writes this process's values to the shared directory, if there is one.
+        """
+
+        if self.multiprocess_dir is not None:
+            self._write(self._snapshot_file_path(os.getpid()),
+                        {metric.name: metric.snapshot() for metric in self.metrics})
+
+    def start_snapshot_thread(self, interval_seconds: float) -> None:
+
+        """
+        Writes a snapshot every ``interval_seconds`` from a daemon thread.
+        """
+
+        def write_periodically():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    self.write_snapshot()
+                except OSError:
+                    # the directory goes away when the server shuts down
+                    return
+
+        threading.Thread(target=write_periodically, name="metrics-snapshot", daemon=True).start()
+
+    def mark_process_dead(self, pid: int) -> None:
+
+        """
+        Folds an exited worker's counters and histograms into ``dead.json`` and removes its snapshot.
+        Called by the prefork parent, the only writer of ``dead.json``.
+        """
+
+        file_path = self._snapshot_file_path(pid)
+        if self.multiprocess_dir is None or not os.path.exists(file_path):
+            return
+        dead_file_path = os.path.join(self.multiprocess_dir, "dead.json")
+        merged = self._merge(self._read(dead_file_path), self._read(file_path), include_gauges=False)
+        self._write(dead_file_path, merged)
+        os.remove(file_path)
+
+    def collect(self) -> dict:
+
+        """
+        Returns the values of every metric by name: this process's own, or the sum over all
+        snapshots in the shared directory.
+        """
+
+        if self.multiprocess_dir is None:
+            return {metric.name: metric.snapshot() for metric in self.metrics}
+
+        self.write_snapshot()
+        merged = {}
+        for file_name in sorted(os.listdir(self.multiprocess_dir)):
+            if file_name.endswith(".json"):
+                self._merge(merged, self._read(os.path.join(self.multiprocess_dir, file_name)))
+        return merged
+
+    def render(self) -> str:
+
+        """
+        Renders every registered metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The ``/metrics`` response body.
+        """
+
+        values = self.collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for sample_name, labels, value in metric.samples(values.get(metric.name, {})):
+                lines.append(f"{sample_name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_COUNT = REGISTRY.register(Counter(
+    "http_requests_total", "Number of HTTP requests handled.", ("route", "method", "status", "model_version")))
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "End to end request latency.", ("route", "method", "model_version")))
+ROWS_SCORED = REGISTRY.register(Counter(
+    "rows_scored_total", "Number of rows passed through the model.", ("route", "model_version")))
+BATCH_SIZE = REGISTRY.register(Histogram(
+    "batch_rows", "Rows per prediction request.", ("route", "model_version"), buckets=METRICS_BATCH_SIZE_BUCKETS))
+CSV_PARSE_TIME = REGISTRY.register(Histogram(
+    "csv_parse_seconds", "Time spent parsing uploaded CSV files.", ("route", "model_version")))
+PREPROCESSING_TIME = REGISTRY.register(Histogram(
+    "preprocessing_seconds", "Time spent in processing_test_data.", ("route", "model_version")))
+MODEL_PREDICT_TIME = REGISTRY.register(Histogram(
+    "model_predict_seconds", "Time spent in model predict.", ("route", "model_version")))
+RESPONSE_RENDER_TIME = REGISTRY.register(Histogram(
+    "response_render_seconds", "Time spent writing and rendering the response.", ("route", "model_version")))
+MODEL_LOAD_TIME = REGISTRY.register(Gauge(
+    "model_load_seconds", "Time taken to pull and load the served model version.", ("model_version",),
+    multiprocess_mode="max"))
+MODEL_LOADS = REGISTRY.register(Counter(
+    "model_loads_total", "Number of model versions loaded.", ("model_version",)))
+STREAM_EVENTS = REGISTRY.register(Counter(
+    "stream_events_total", "Events handled by the streaming consumer.", ("status", "model_version")))
+STREAM_EVENT_LATENCY = REGISTRY.register(Histogram(
+    "stream_event_latency_seconds", "Time from an event being read to its prediction being written.", ()))
+STREAM_BATCH_SIZE = REGISTRY.register(Histogram(
+    "stream_batch_rows", "Events per scored micro-batch.", (), buckets=METRICS_BATCH_SIZE_BUCKETS))
+PREDICTION_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "prediction_cache_lookups_total", "Prediction cache lookups by result (hit or miss).", ("result", "model_version")))
+PREDICTION_CACHE_ENTRIES = REGISTRY.register(Gauge(
+    "prediction_cache_entries", "Rows currently held in the prediction cache.", ()))
+PREDICTION_SINK_RECORDS = REGISTRY.register(Counter(
+    "prediction_sink_records_total", "Prediction records by outcome (written, dropped or failed).", ("status",)))
+PREDICTION_SINK_BUFFERED = REGISTRY.register(Gauge(
+    "prediction_sink_buffered_records", "Prediction records waiting to be written to Mongo.", ()))
+PREDICTION_SINK_FLUSH_TIME = REGISTRY.register(Histogram(
+    "prediction_sink_flush_seconds", "Time spent in one bulk insert of buffered predictions.", ()))
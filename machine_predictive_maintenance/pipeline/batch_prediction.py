@@ -0,0 +1,158 @@
+import os
+import sys
+import uuid
+import asyncio
+import argparse
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.constant.training_pipeline import (
+    SCHEMA_FILE_PATH,
+    PREDICTION_OUTPUT_DIR,
+    PREDICTION_INVALID_DIR,
+    PREDICTION_OPTIONAL_COLUMNS,
+    PREDICTION_BATCH_CHUNK_SIZE,
+)
+from machine_predictive_maintenance.serving.async_mongo import AsyncMongoClient
+from machine_predictive_maintenance.serving.prediction_sink import BufferedPredictionSink, to_prediction_records
+from machine_predictive_maintenance.utils.main_utils.utils import processing_test_data, read_yaml_file
+from machine_predictive_maintenance.utils.main_utils.dtype_plan import DtypePlan
+from machine_predictive_maintenance.utils.main_utils.feature_engine import RollingFeatureEngine
+from machine_predictive_maintenance.utils.main_utils.schema_validator import SchemaValidator, VALIDATION_ERRORS_COLUMN
+from machine_predictive_maintenance.utils.ml_utils.model.model_store import ModelStore, LoadedModel
+
+load_dotenv()
+
+
+class BatchPredictionPipeline:
+
+    """
+    Scores a CSV file of sensor readings chunk by chunk, writing the predictions to a CSV file
+    and storing them in Mongo through the buffered prediction sink.
+
+    Scoring runs in a worker thread so the sink keeps flushing earlier chunks while the next
+    one is scored. The pipeline waits for the sink to drain rather than letting it drop
+    records when Mongo falls behind.
+
+    Args:
+        input_file_path (str): CSV file with one reading per row.
+        output_file_path (str, optional): Destination CSV; defaults to ``prediction_output/batch_<id>.csv``.
+        chunk_size (int, optional): Rows read and scored at a time.
+        model_store (ModelStore, optional): Source of the model; a new one is created if omitted.
+    """
+
+    def __init__(self, input_file_path: str, output_file_path: str = None,
+                 chunk_size: int = PREDICTION_BATCH_CHUNK_SIZE, model_store: ModelStore = None):
+
+        try:
+            self.batch_id = uuid.uuid4().hex
+            self.input_file_path = input_file_path
+            self.output_file_path = output_file_path or os.path.join(PREDICTION_OUTPUT_DIR, f"batch_{self.batch_id}.csv")
+            self.chunk_size = chunk_size
+            self.model_store = model_store or ModelStore()
+            self.schema_validator = SchemaValidator.from_yaml(SCHEMA_FILE_PATH)
+            self.dtype_plan = DtypePlan.from_yaml(SCHEMA_FILE_PATH)
+            # one engine for the whole file so rolling windows span chunk boundaries, as they
+            # do across the chunks of a split in training
+            self.feature_engine = RollingFeatureEngine.from_schema(read_yaml_file(SCHEMA_FILE_PATH))
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def predict_chunk(self, loaded_model: LoadedModel, df: pd.DataFrame, chunk_number: int) -> pd.DataFrame:
+
+        """
+        Validates and scores one chunk.
+
+        Args:
+            loaded_model (LoadedModel): The model snapshot.
+            df (pd.DataFrame): Raw readings.
+            chunk_number (int): Position of the chunk, used to name its quarantine file.
+
+        Returns:
+            pd.DataFrame: The chunk with ``predicted_column`` (and ``validation_errors`` for bad rows).
+        """
+
+        try:
+            validation = self.schema_validator.validate(df, optional_columns=PREDICTION_OPTIONAL_COLUMNS)
+            if not validation.is_valid:
+                self.schema_validator.quarantine(
+                    validation, os.path.join(PREDICTION_INVALID_DIR, f"batch_{self.batch_id}_{chunk_number}.csv")
+                )
+            valid_df = validation.valid_rows()
+
+            df['predicted_column'] = None
+            if len(valid_df) > 0:
+                processing_data = processing_test_data(data=valid_df, schema_file=SCHEMA_FILE_PATH,
+                                                       preprocessor=loaded_model.preprocessor,
+                                                       feature_engine=self.feature_engine)
+                df.loc[valid_df.index, 'predicted_column'] = loaded_model.model.predict(processing_data)
+
+            if not validation.is_valid:
+                df[VALIDATION_ERRORS_COLUMN] = validation.invalid_rows()[VALIDATION_ERRORS_COLUMN]
+            return df
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    async def _run(self) -> str:
+        mongo_client = AsyncMongoClient()
+        prediction_sink = BufferedPredictionSink(mongo_client)
+        prediction_sink.start()
+        try:
+            loaded_model = await asyncio.to_thread(self.model_store.get)
+            os.makedirs(os.path.dirname(self.output_file_path) or ".", exist_ok=True)
+            if os.path.exists(self.output_file_path):
+                os.remove(self.output_file_path)
+            max_buffered = prediction_sink.prediction_sink_config.max_buffered_records
+
+            rows = 0
+            chunks = self.dtype_plan.read_csv(self.input_file_path, chunksize=self.chunk_size)
+            for chunk_number, chunk in enumerate(chunks):
+                scored = await asyncio.to_thread(self.predict_chunk, loaded_model, chunk, chunk_number)
+                scored.to_csv(self.output_file_path, mode="a", header=chunk_number == 0, index=False)
+
+                if prediction_sink.enabled:
+                    records = await asyncio.to_thread(to_prediction_records, scored, batch_id=self.batch_id,
+                                                      model_version=loaded_model.version)
+                    # backpressure: wait for the sink to make room instead of dropping records
+                    while prediction_sink.buffered + len(records) > max_buffered and prediction_sink.buffered:
+                        await asyncio.sleep(0.05)
+                    prediction_sink.add(records)
+
+                rows += len(scored)
+                logging.info(f"Batch {self.batch_id}: scored {rows} rows")
+
+            return self.output_file_path
+
+        finally:
+            await prediction_sink.stop()
+            mongo_client.close()
+
+    def run(self) -> str:
+
+        """
+        Scores the whole input file.
+
+        Returns:
+            str: Path of the output CSV file.
+        """
+
+        try:
+            return asyncio.run(self._run())
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV file of sensor readings.")
+    parser.add_argument("input_file", help="CSV file with one reading per row.")
+    parser.add_argument("--output", help="Destination CSV file.")
+    parser.add_argument("--chunk-size", type=int, default=PREDICTION_BATCH_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    output_file_path = BatchPredictionPipeline(args.input_file, args.output, args.chunk_size).run()
+    print(output_file_path)
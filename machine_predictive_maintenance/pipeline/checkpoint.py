@@ -0,0 +1,124 @@
+import os
+import sys
+import dataclasses
+from datetime import datetime
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.constant.training_pipeline import CHECKPOINT_RUN_FILE_NAME
+from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file, write_yaml_file, save_object, load_object
+
+
+def _output_files(output) -> list:
+    # artifacts publish their files as *_file_path fields; absent optional files are None
+    if not dataclasses.is_dataclass(output):
+        return []
+    values = [getattr(output, field.name) for field in dataclasses.fields(output)]
+    return [value for value in values if isinstance(value, str) and os.path.isfile(value)]
+
+
+class RunCheckpoints:
+
+    """
+    Completion markers of the stages of one run, kept in ``Artifacts/<timestamp>/checkpoints/``.
+
+    When a stage finishes, its output is pickled to ``<stage>.pkl`` and then ``<stage>.yaml``
+    is written with the output's file manifest (path and size of every artifact file). The
+    marker is written last and renamed into place, so a stage interrupted half way never
+    looks complete. A checkpoint is only restored if all the files in its manifest are still
+    there with the recorded sizes.
+
+    Args:
+        checkpoint_dir (str): The run's checkpoint directory.
+    """
+
+    def __init__(self, checkpoint_dir: str):
+        self.checkpoint_dir = checkpoint_dir
+
+    def _marker_path(self, stage_name: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{stage_name}.yaml")
+
+    def _output_path(self, stage_name: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{stage_name}.pkl")
+
+    def save(self, stage_name: str, output, wall_time_s: float = None) -> None:
+
+        """
+        Records a finished stage.
+
+        Args:
+            stage_name (str): The stage.
+            output: What the stage returned; restored in place of running it again.
+            wall_time_s (float, optional): How long the stage took.
+        """
+
+        try:
+            save_object(self._output_path(stage_name), output)
+            marker = {
+                "stage": stage_name,
+                "completed_at": datetime.now().isoformat(timespec="seconds"),
+                "wall_time_s": wall_time_s,
+                "output_file": os.path.basename(self._output_path(stage_name)),
+                "files": {file_path: os.path.getsize(file_path) for file_path in _output_files(output)},
+            }
+            tmp_path = self._marker_path(stage_name) + ".tmp"
+            write_yaml_file(tmp_path, marker, replace=True)
+            os.replace(tmp_path, self._marker_path(stage_name))
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def load(self, stage_name: str) -> tuple:
+
+        """
+        Restores a finished stage's output if its checkpoint is complete and intact.
+
+        Args:
+            stage_name (str): The stage.
+
+        Returns:
+            tuple: ``(True, output)`` if restored, ``(False, None)`` if the stage has to run.
+        """
+
+        try:
+            marker_path = self._marker_path(stage_name)
+            if not os.path.exists(marker_path):
+                return False, None
+
+            marker = read_yaml_file(marker_path)
+            changed = [file_path for file_path, size in (marker.get("files") or {}).items()
+                       if not os.path.isfile(file_path) or os.path.getsize(file_path) != size]
+            if changed or not os.path.exists(self._output_path(stage_name)):
+                logging.info(f"Checkpoint of {stage_name} is stale, missing or changed files: {changed}")
+                return False, None
+
+            return True, load_object(self._output_path(stage_name))
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def invalidate(self, stage_name: str) -> None:
+
+        """
+        Removes a stage's marker, before it runs again or because an upstream stage does.
+        """
+
+        for path in (self._marker_path(stage_name), self._output_path(stage_name)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def completed_stages(self) -> list:
+        if not os.path.isdir(self.checkpoint_dir):
+            return []
+        return sorted(file_name[:-len(".yaml")] for file_name in os.listdir(self.checkpoint_dir)
+                      if file_name.endswith(".yaml") and file_name != CHECKPOINT_RUN_FILE_NAME)
+
+    def save_run(self, run: dict) -> None:
+
+        """
+        Writes the settings a resumed run must reuse, such as the training mode.
+        """
+
+        write_yaml_file(os.path.join(self.checkpoint_dir, CHECKPOINT_RUN_FILE_NAME), run, replace=True)
+
+    def load_run(self) -> dict:
+        return read_yaml_file(os.path.join(self.checkpoint_dir, CHECKPOINT_RUN_FILE_NAME))
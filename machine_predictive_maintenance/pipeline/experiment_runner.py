@@ -0,0 +1,271 @@
+import os
+import sys
+import uuid
+import shutil
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.constant.training_pipeline import (
+    ARTIFACT_DIR,
+    EXPERIMENT_FILE_PATH,
+    EXPERIMENT_MAX_WORKERS,
+    EXPERIMENT_REPORT_DIR,
+    EXPERIMENT_REPORT_FILE_NAME,
+    EXPERIMENT_SELECTION_METRIC,
+    MODEL_PULLER_LOCAL_MODEL_DIR,
+    RUN_TIMESTAMP_FORMAT,
+    SCHEMA_FILE_PATH,
+)
+from machine_predictive_maintenance.entity.config_entity import TrainingPipelineConfig
+from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file, write_yaml_file
+
+# the settings a variant may override; anything else in experiments.yaml is rejected
+VARIANT_KEYS = ("name", "training_mode", "sample_fraction", "schema_file_path", "param_grids", "model_names")
+
+
+def run_variant(variant: dict, timestamp: datetime, n_jobs: int) -> dict:
+
+    """
+    Runs one variant's training pipeline in its own run directory. Called in a worker process.
+
+    Args:
+        variant (dict): One entry of ``experiments.yaml``.
+        timestamp (datetime): Start of the experiment, shared by all its variants.
+        n_jobs (int): Grid search processes this variant may use.
+
+    Returns:
+        dict: The variant's run directories, test and train scores and whether its model may
+            be promoted; ``status`` is ``failed`` with the error if the pipeline raised.
+    """
+
+    # the pipeline modules are only imported in the workers, which run one variant each
+    from machine_predictive_maintenance.pipeline.training_pipeline import TrainingPipeline
+
+    # a worker's share of the cores, read by ModelTrainerConfig
+    os.environ["MODEL_TRAINER_N_JOBS"] = str(n_jobs)
+    config = TrainingPipelineConfig(
+        timestamp=timestamp,
+        training_mode=variant.get("training_mode"),
+        sample_fraction=variant.get("sample_fraction"),
+        run_id=f"{variant['name']}_{uuid.uuid4().hex[:8]}",
+        schema_file_path=variant.get("schema_file_path"),
+        param_grids=variant.get("param_grids"),
+        model_names=variant.get("model_names"),
+        isolated=True,
+    )
+    result = {
+        "name": variant["name"],
+        "run_id": config.run_id,
+        "artifact_dir": config.artifact_dir,
+        "model_dir": config.model_dir,
+        "training_mode": config.training_mode,
+        # serving reads data_schema/schema.yaml, so only models trained on it on the full data can be served
+        "promotable": not config.sampled
+                      and os.path.abspath(config.schema_file_path) == os.path.abspath(SCHEMA_FILE_PATH),
+    }
+    try:
+        model_trainer_artifact = TrainingPipeline(training_pipeline_config=config).run_pipeline()
+        result.update({
+            "status": "succeeded",
+            "test_score": float(getattr(model_trainer_artifact.test_metric_artifact, EXPERIMENT_SELECTION_METRIC)),
+            "train_score": float(getattr(model_trainer_artifact.train_metric_artifact, EXPERIMENT_SELECTION_METRIC)),
+        })
+    except Exception as e:
+        logging.info(f"Experiment variant {config.run_id} failed: {e}")
+        result.update({"status": "failed", "error": str(e)})
+    return result
+
+
+class ExperimentRunner:
+
+    """
+    Trains several pipeline variants at the same time and promotes the best one.
+
+    Variants come from ``experiments.yaml`` and override the training mode, sample fraction,
+    schema file, parameter grids or candidate models. Each runs the full pipeline in its own
+    process, with its own run id, artifact directory and model directory inside it, so no two
+    variants write to the same file and none of them touches ``final_model/`` or S3. When all
+    are done, the promotable variant with the best test score replaces ``final_model/`` and
+    is synced like a regular run.
+
+    Args:
+        experiments_file (str): The variants file.
+        max_workers (int): Variants trained at the same time.
+        sync_to_s3 (bool): Sync the winner's artifacts and model to S3 after promoting it.
+    """
+
+    def __init__(self, experiments_file: str = EXPERIMENT_FILE_PATH, max_workers: int = EXPERIMENT_MAX_WORKERS,
+                 sync_to_s3: bool = True):
+
+        try:
+            self.variants = read_yaml_file(experiments_file)["variants"]
+            names = [variant.get("name") for variant in self.variants]
+            if not all(names) or len(set(names)) != len(names):
+                raise ValueError(f"Every variant in {experiments_file} needs a unique name, got {names}")
+            for variant in self.variants:
+                unknown = set(variant) - set(VARIANT_KEYS)
+                if unknown:
+                    raise ValueError(f"Variant {variant['name']} has unknown settings {sorted(unknown)}")
+            self.max_workers = max(1, min(max_workers, len(self.variants)))
+            self.sync_to_s3 = sync_to_s3
+            self.timestamp = datetime.now()
+            self.report_file_path = os.path.join(ARTIFACT_DIR, EXPERIMENT_REPORT_DIR,
+                                                 self.timestamp.strftime(RUN_TIMESTAMP_FORMAT),
+                                                 EXPERIMENT_REPORT_FILE_NAME)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def run_variants(self) -> list:
+
+        """
+        Runs every variant in a pool of worker processes.
+
+        Returns:
+            list: The variants' results, in the order of the experiments file.
+        """
+
+        try:
+            n_jobs = max(1, (os.cpu_count() or 1) // self.max_workers)
+            logging.info(f"Running {len(self.variants)} experiment variants, {self.max_workers} at a time "
+                         f"with {n_jobs} grid search processes each")
+
+            # spawned workers start clean: no copied MLflow client, profiler or logging thread state
+            context = multiprocessing.get_context("spawn")
+            results = {}
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as pool:
+                futures = {pool.submit(run_variant, variant, self.timestamp, n_jobs): variant["name"]
+                           for variant in self.variants}
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[futures[future]] = result
+                    logging.info(f"Variant {result['run_id']} {result['status']}, "
+                                 f"test {EXPERIMENT_SELECTION_METRIC} {result.get('test_score')}")
+            return [results[variant["name"]] for variant in self.variants]
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @staticmethod
+    def select_winner(results: list) -> dict:
+
+        """
+        Picks the promotable variant with the best test score; ties go to the earlier variant.
+
+        Promotable variants all train on the full collection with the default schema, and the
+        split and SMOTEENN are seeded with ``RANDOM_STATE``, so their test scores come from the
+        same holdout and are comparable.
+
+        Args:
+            results (list): Results of ``run_variants``.
+
+        Returns:
+            dict: The winning result, or None if no promotable variant succeeded.
+        """
+
+        candidates = [result for result in results if result["status"] == "succeeded" and result["promotable"]]
+        return max(candidates, key=lambda result: result["test_score"], default=None)
+
+    @staticmethod
+    def promote(model_dir: str, final_model_dir: str = MODEL_PULLER_LOCAL_MODEL_DIR) -> None:
+
+        """
+        Replaces the final model directory with a variant's model directory.
+
+        The files are first copied next to the target, then two renames swap the directories,
+        so a reader sees either the old model and preprocessor or the new pair, never one of each.
+        If the second rename fails the old directory is put back.
+
+        Args:
+            model_dir (str): The winning variant's model directory.
+            final_model_dir (str): The directory the app and batch prediction load.
+        """
+
+        try:
+            suffix = uuid.uuid4().hex[:8]
+            staged_dir = f"{final_model_dir}.tmp-{suffix}"
+            previous_dir = f"{final_model_dir}.old-{suffix}"
+
+            shutil.copytree(model_dir, staged_dir)
+            if os.path.exists(final_model_dir):
+                os.rename(final_model_dir, previous_dir)
+            try:
+                os.rename(staged_dir, final_model_dir)
+            except Exception:
+                if os.path.exists(previous_dir):
+                    os.rename(previous_dir, final_model_dir)
+                shutil.rmtree(staged_dir, ignore_errors=True)
+                raise
+            shutil.rmtree(previous_dir, ignore_errors=True)
+            logging.info(f"Promoted {model_dir} to {final_model_dir}")
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def sync_winner(self, winner: dict) -> None:
+
+        """
+        Syncs the winner's artifact directory and the promoted model to S3, where a regular
+        run would put them.
+        """
+
+        try:
+            from machine_predictive_maintenance.pipeline.training_pipeline import TrainingPipeline
+
+            training_pipeline = TrainingPipeline.resume(winner["artifact_dir"])
+            training_pipeline.sync_artifact_dir_to_s3()
+            training_pipeline.training_pipeline_config.model_dir = MODEL_PULLER_LOCAL_MODEL_DIR
+            training_pipeline.sync_saved_model_dir_to_s3()
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def run(self) -> dict:
+
+        """
+        Runs all variants, promotes the winner and writes the experiment report.
+
+        Returns:
+            dict: The report, with every variant's result and the winner.
+        """
+
+        try:
+            results = self.run_variants()
+            winner = self.select_winner(results)
+
+            if winner is None:
+                logging.info("No promotable variant succeeded, final_model/ is left unchanged")
+            else:
+                logging.info(f"Winner {winner['run_id']} with test {EXPERIMENT_SELECTION_METRIC} {winner['test_score']:.4f}")
+                self.promote(winner["model_dir"])
+                if self.sync_to_s3:
+                    self.sync_winner(winner)
+
+            report = {
+                "timestamp": self.timestamp.strftime(RUN_TIMESTAMP_FORMAT),
+                "selection_metric": EXPERIMENT_SELECTION_METRIC,
+                "winner": winner["run_id"] if winner else None,
+                "variants": results,
+            }
+            write_yaml_file(self.report_file_path, report, replace=True)
+            logging.info(f"Experiment report saved to {self.report_file_path}")
+            return report
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train experiment variants concurrently and promote the best one.")
+    parser.add_argument("--experiments", default=EXPERIMENT_FILE_PATH, help="The variants file.")
+    parser.add_argument("--max-workers", type=int, default=EXPERIMENT_MAX_WORKERS,
+                        help="Variants trained at the same time.")
+    parser.add_argument("--no-sync", action="store_true", help="Do not sync the winner to S3.")
+    args = parser.parse_args()
+
+    experiment_runner = ExperimentRunner(args.experiments, max_workers=args.max_workers, sync_to_s3=not args.no_sync)
+    print(experiment_runner.run())
@@ -0,0 +1,250 @@
+import sys
+import time
+import contextvars
+from dataclasses import dataclass
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.constant.training_pipeline import PIPELINE_SCHEDULER_MAX_WORKERS
+from machine_predictive_maintenance.profiling.profiler import profile_stage
+
+
+@dataclass
+class Stage:
+
+    """
+    One node of the pipeline DAG.
+
+    Attributes:
+        name (str): Stage name, also used as its profiler stage.
+        fn (Callable): Called with one keyword argument per entry of ``inputs``.
+        inputs (tuple): Outputs of other stages this stage consumes.
+        output (str): Name under which the return value is published, if any.
+        after (tuple): Stages that must finish first although no output is passed, e.g.
+            everything that writes into the artifact directory before it is synced.
+        checkpoint (bool): Record completion so a resumed run skips the stage; off for
+            cheap bookkeeping stages that should always run.
+    """
+
+    name: str
+    fn: Callable
+    inputs: tuple = ()
+    output: str = None
+    after: tuple = ()
+    checkpoint: bool = True
+
+
+class StageScheduler:
+
+    """
+    Runs a DAG of stages on a thread pool, starting every stage as soon as the stages it
+    depends on have finished.
+
+    Dependencies come from the declared inputs and ``after`` lists, so independent stages
+    (drift reporting and transformation, the two S3 syncs) overlap and the run takes about
+    as long as its critical path. Stages run in threads: the heavy steps release the GIL
+    in numpy/sklearn or wait on I/O, and grid search fans out to its own worker processes.
+
+    When a stage fails no new stage is started; the running ones finish and the first
+    error is raised.
+
+    With checkpoints, every finished stage is recorded, and a stage whose checkpoint is intact
+    is restored instead of run as long as nothing upstream of it runs again. A stage that does
+    run first drops its own checkpoint and those of everything downstream.
+
+    Args:
+        stages (list): The stages, in any order.
+        max_workers (int): Stages run at the same time; 1 runs them one by one.
+        checkpoints (RunCheckpoints, optional): Completion markers of the run.
+    """
+
+    def __init__(self, stages: list, max_workers: int = PIPELINE_SCHEDULER_MAX_WORKERS, checkpoints=None):
+
+        try:
+            self.stages = {stage.name: stage for stage in stages}
+            if len(self.stages) != len(stages):
+                raise ValueError("Stage names must be unique")
+            self.max_workers = max(1, max_workers)
+            self.checkpoints = checkpoints
+
+            producers = {}
+            for stage in stages:
+                if stage.output is not None:
+                    if stage.output in producers:
+                        raise ValueError(f"Output {stage.output} is produced by {producers[stage.output]} and {stage.name}")
+                    producers[stage.output] = stage.name
+
+            self.dependencies = {}
+            for stage in stages:
+                missing = [name for name in stage.inputs if name not in producers]
+                missing += [name for name in stage.after if name not in self.stages]
+                if missing:
+                    raise ValueError(f"Stage {stage.name} depends on unknown outputs or stages {missing}")
+                self.dependencies[stage.name] = {producers[name] for name in stage.inputs} | set(stage.after)
+
+            self.order = self._topological_order()
+            self.dependents = {name: {other for other in self.stages if name in self.dependencies[other]}
+                               for name in self.stages}
+            self.timings = {}
+            self.restored = []
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def _topological_order(self) -> list:
+        order, done = [], set()
+        while len(order) < len(self.stages):
+            ready = [name for name in self.stages if name not in done and self.dependencies[name] <= done]
+            if not ready:
+                raise ValueError(f"Stage dependencies form a cycle among {sorted(set(self.stages) - done)}")
+            order.extend(ready)
+            done.update(ready)
+        return order
+
+    def _downstream(self, name: str) -> set:
+        stages, pending = set(), [name]
+        while pending:
+            for dependent in self.dependents[pending.pop()]:
+                if dependent not in stages:
+                    stages.add(dependent)
+                    pending.append(dependent)
+        return stages
+
+    def _run_stage(self, stage: Stage, kwargs: dict, run_start: float):
+        start = time.perf_counter()
+        try:
+            with profile_stage(stage.name):
+                result = stage.fn(**kwargs)
+            if self.checkpoints is not None and stage.checkpoint:
+                self.checkpoints.save(stage.name, result, wall_time_s=round(time.perf_counter() - start, 4))
+            return result
+        finally:
+            end = time.perf_counter()
+            self.timings[stage.name] = {
+                "start_s": round(start - run_start, 4),
+                "end_s": round(end - run_start, 4),
+                "wall_time_s": round(end - start, 4),
+            }
+
+    def _restore(self, name: str, rerun: set) -> tuple:
+        stage = self.stages[name]
+        if self.checkpoints is None or not stage.checkpoint or self.dependencies[name] & rerun:
+            return False, None
+        return self.checkpoints.load(name)
+
+    def run(self) -> dict:
+
+        """
+        Runs every stage once its dependencies are done.
+
+        Returns:
+            dict: The published outputs by name.
+        """
+
+        try:
+            outputs, done, submitted, running = {}, set(), set(), {}
+            # stages that run in this attempt, and everything downstream of them
+            rerun = set()
+            error = None
+            run_start = time.perf_counter()
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline-stage") as pool:
+                while True:
+                    restored_any = False
+                    if error is None:
+                        for name in self.order:
+                            if name in submitted or not self.dependencies[name] <= done:
+                                continue
+                            stage = self.stages[name]
+                            submitted.add(name)
+
+                            restored, result = self._restore(name, rerun)
+                            if restored:
+                                logging.info(f"Restored stage {name} from its checkpoint")
+                                self.restored.append(name)
+                                done.add(name)
+                                if stage.output is not None:
+                                    outputs[stage.output] = result
+                                restored_any = True
+                                continue
+
+                            if stage.checkpoint:
+                                stale = {name} | self._downstream(name)
+                                rerun.update(stale)
+                                if self.checkpoints is not None:
+                                    for stale_name in stale:
+                                        self.checkpoints.invalidate(stale_name)
+
+                            kwargs = {input_name: outputs[input_name] for input_name in stage.inputs}
+                            # each stage runs in a copy of the caller's context, which carries the active profiler
+                            context = contextvars.copy_context()
+                            running[pool.submit(context.run, self._run_stage, stage, kwargs, run_start)] = stage
+                            logging.info(f"Started stage {name}")
+                    if restored_any:
+                        # restored outputs may make further stages ready
+                        continue
+                    if not running:
+                        break
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        stage = running.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            logging.info(f"Stage {stage.name} failed: {e}")
+                            error = error or e
+                            continue
+                        done.add(stage.name)
+                        if stage.output is not None:
+                            outputs[stage.output] = result
+
+            if error is not None:
+                raise error
+
+            summary = self.summary()
+            logging.info(
+                f"Pipeline took {summary['wall_time_s']}s for {summary['stage_time_sum_s']}s of stages; "
+                f"critical path {summary['critical_path_s']}s through {' -> '.join(self.critical_path()[1])}"
+            )
+            return outputs
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def critical_path(self) -> tuple:
+
+        """
+        Finds the chain of dependent stages with the largest total wall time.
+
+        Returns:
+            tuple: The chain's wall time in seconds and its stage names, in run order.
+        """
+
+        finish, previous = {}, {}
+        for name in self.order:
+            wall_time = self.timings.get(name, {}).get("wall_time_s", 0.0)
+            parent = max(self.dependencies[name], key=lambda dependency: finish[dependency], default=None)
+            finish[name] = wall_time + (finish[parent] if parent is not None else 0.0)
+            previous[name] = parent
+
+        name = max(finish, key=finish.get, default=None)
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return (round(finish[path[0]], 4) if path else 0.0), path[::-1]
+
+    def summary(self) -> dict:
+
+        """
+        Returns the run's wall time next to the sum of stage times and the critical path length.
+        """
+
+        return {
+            "wall_time_s": max((timing["end_s"] for timing in self.timings.values()), default=0.0),
+            "stage_time_sum_s": round(sum(timing["wall_time_s"] for timing in self.timings.values()), 4),
+            "critical_path_s": self.critical_path()[0],
+        }
@@ -1,5 +1,8 @@
 import os
 import sys
+import argparse
+from datetime import datetime
+from functools import partial
 
 from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
 from machine_predictive_maintenance.logging.logger import logging
@@ -8,10 +11,19 @@ from machine_predictive_maintenance.components.data_ingestion import DataIngesti
 from machine_predictive_maintenance.components.data_validation import DataValidation
 from machine_predictive_maintenance.components.data_transformation import DataTransformation
 from machine_predictive_maintenance.components.model_trainer import ModelTrainer
+from machine_predictive_maintenance.components.chunked_model_trainer import ChunkedModelTrainer
 
-from machine_predictive_maintenance.constant.training_pipeline import TRAINING_BUCKET_NAME
+from machine_predictive_maintenance.constant.training_pipeline import (
+    TRAINING_BUCKET_NAME,
+    CHECKPOINT_DIR_NAME,
+    RUN_TIMESTAMP_FORMAT,
+)
 
 from machine_predictive_maintenance.cloud.s3_syncer import S3Sync
+from machine_predictive_maintenance.pipeline.checkpoint import RunCheckpoints
+from machine_predictive_maintenance.pipeline.stage_scheduler import Stage, StageScheduler
+from machine_predictive_maintenance.profiling.profiler import PipelineProfiler, set_active_profiler
+from machine_predictive_maintenance.tracking.mlflow_tracker import MlflowTracker
 
 from machine_predictive_maintenance.entity.config_entity import (
     TrainingPipelineConfig,
@@ -19,6 +31,7 @@ from machine_predictive_maintenance.entity.config_entity import (
     DataValidationConfig,
     DataTransformationConfig,
     ModelTrainerConfig,
+    ChunkedTrainingConfig,
 )
 
 from machine_predictive_maintenance.entity.artifact_entity import (
@@ -36,23 +49,71 @@ class TrainingPipeline:
 
     Attributes:
         training_pipeline_config (TrainingPipelineConfig): Configuration for the training pipeline.
+        chunked_training_config (ChunkedTrainingConfig): Chunk size and epochs used when ``TRAINING_MODE=chunked``.
         s3_sync (S3Sync): Utility for syncing data with S3.
+        profiler (PipelineProfiler): Collects per-stage timing and memory for the run.
+        tracker (MlflowTracker): Logs the whole run to a single MLflow run in the background.
+        checkpoints (RunCheckpoints): Completion markers of the stages, used to resume the run.
     """
 
-    def __init__(self):
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig = None):
 
         """
         Initializes the training pipeline and its configurations.
+
+        Args:
+            training_pipeline_config (TrainingPipelineConfig, optional): The run to execute; a
+                new run directory is used if omitted.
         """
         
-        self.training_pipeline_config = TrainingPipelineConfig()
+        self.training_pipeline_config = training_pipeline_config or TrainingPipelineConfig()
+        self.chunked_training_config = ChunkedTrainingConfig(training_pipeline_config=self.training_pipeline_config)
         self.s3_sync = S3Sync()
+        self.profiler = PipelineProfiler()
+        self.tracker = MlflowTracker()
+        self.checkpoints = RunCheckpoints(self.training_pipeline_config.checkpoint_dir)
+
+    @classmethod
+    def resume(cls, run_dir: str) -> "TrainingPipeline":
+
+        """
+        Reopens an earlier run so ``run_pipeline`` continues it from its first incomplete stage.
+
+        Args:
+            run_dir (str): The run's directory, ``Artifacts/<timestamp>``.
+
+        Returns:
+            TrainingPipeline: A pipeline writing into the same run directory.
+        """
 
-    def data_ingestion(self):
+        try:
+            run = RunCheckpoints(os.path.join(run_dir, CHECKPOINT_DIR_NAME)).load_run()
+            config = TrainingPipelineConfig(timestamp=datetime.strptime(run["timestamp"], RUN_TIMESTAMP_FORMAT),
+                                            training_mode=run["training_mode"],
+                                            sample_fraction=run.get("sample_fraction"),
+                                            run_id=run.get("run_id"),
+                                            schema_file_path=run.get("schema_file_path"),
+                                            param_grids=run.get("param_grids"),
+                                            model_names=run.get("model_names"),
+                                            isolated=run.get("isolated", False))
+            if os.path.abspath(config.artifact_dir) != os.path.abspath(run_dir):
+                raise ValueError(f"{run_dir} does not match its recorded run directory {config.artifact_dir}")
+
+            logging.info(f"Resuming run {config.artifact_dir}")
+            return cls(training_pipeline_config=config)
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def data_ingestion(self, chunked: bool = False):
 
         """
         Handles the data ingestion process.
 
+        Args:
+            chunked (bool): Stream the collection in chunks of ``TRAINING_CHUNK_SIZE`` rows
+                instead of loading it at once.
+
         Returns:
             DataIngestionArtifact: Contains metadata about the ingested data.
         """
@@ -63,7 +124,13 @@ class TrainingPipeline:
             logging.info("Start data Ingestion")
 
             data_ingestion = DataIngestion(data_ingestion_config=self.data_ingestion_config)
-            data_ingestion_artifact = data_ingestion.initiate_data_ingestion()
+            if chunked:
+                data_ingestion_artifact = data_ingestion.initiate_chunked_data_ingestion(
+                    chunk_size=self.chunked_training_config.chunk_size,
+                    random_state=self.chunked_training_config.random_state,
+                )
+            else:
+                data_ingestion_artifact = data_ingestion.initiate_data_ingestion()
 
             logging.info(f"Data Ingestion completed and artifact: {data_ingestion_artifact}")
 
@@ -90,12 +157,34 @@ class TrainingPipeline:
             
             logging.info("Initiate the data Validation")
             
-            data_validation_artifact=data_validation.initiate_data_validation()
+            # drift reporting is the separate drift_report stage, so it does not hold up transformation
+            data_validation_artifact=data_validation.initiate_data_validation(detect_drift=False)
 
             return data_validation_artifact
         
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e,sys)
+
+    def drift_report(self, data_validation_artifact: DataValidationArtifact) -> bool:
+
+        """
+        Handles the drift report between the validated train and test data.
+
+        Args:
+            data_validation_artifact (DataValidationArtifact): Artifact from data validation.
+
+        Returns:
+            bool: True if no drift is detected, False otherwise.
+        """
+
+        try:
+            data_validation_config=DataValidationConfig(training_pipeline_config=self.training_pipeline_config)
+            data_validation=DataValidation(data_ingestion_artifact=None,data_validation_config=data_validation_config)
+
+            return data_validation.initiate_drift_report(data_validation_artifact)
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e,sys)
         
 
     def data_transformation(self,data_validation_artifact:DataValidationArtifact):
@@ -143,6 +232,7 @@ class TrainingPipeline:
             model_trainer = ModelTrainer(
                 data_transformation_artifact=data_transformation_artifact,
                 model_trainer_config=self.model_trainer_config,
+                tracker=self.tracker,
             )
 
             model_trainer_artifact = model_trainer.initiate_model_trainer()
@@ -152,6 +242,32 @@ class TrainingPipeline:
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e, sys)
         
+    def chunked_model_trainer(self, data_ingestion_artifact: DataIngestionArtifact) -> ModelTrainerArtifact:
+
+        """
+        Handles validation, transformation and training in bounded-memory chunks.
+
+        Args:
+            data_ingestion_artifact (DataIngestionArtifact): Artifact from chunked data ingestion.
+
+        Returns:
+            ModelTrainerArtifact: Contains metadata about the trained model.
+        """
+
+        try:
+            chunked_model_trainer = ChunkedModelTrainer(
+                data_ingestion_artifact=data_ingestion_artifact,
+                chunked_training_config=self.chunked_training_config,
+                tracker=self.tracker,
+            )
+
+            logging.info("Initiate the chunked model training")
+
+            return chunked_model_trainer.initiate_chunked_model_trainer()
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
     def sync_artifact_dir_to_s3(self):
 
         """
@@ -180,24 +296,121 @@ class TrainingPipeline:
             raise MachinePredictiveMaintenanceException(e,sys)
         
 
+    def save_stage_metrics(self):
+
+        """
+        Writes the per-stage timing and memory metrics, and the frame memory report, into the
+        run's artifact directory.
+        """
+
+        try:
+            self.profiler.save(self.training_pipeline_config.stage_metrics_file_path)
+            self.profiler.save_memory_report(self.training_pipeline_config.memory_report_file_path)
+            logging.info(f"Stage metrics saved to {self.training_pipeline_config.stage_metrics_file_path}")
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e,sys)
+
+    def build_stages(self) -> list:
+
+        """
+        Declares the pipeline as a DAG of stages for the configured training mode.
+
+        Returns:
+            list: The stages, each with the outputs it consumes and publishes.
+        """
+
+        config = self.training_pipeline_config
+        if config.training_mode == "chunked":
+            stages = [
+                Stage("data_ingestion", partial(self.data_ingestion, chunked=True), output="data_ingestion_artifact"),
+                Stage("chunked_model_trainer", self.chunked_model_trainer,
+                      inputs=("data_ingestion_artifact",), output="model_trainer_artifact"),
+            ]
+            # everything that writes into the artifact directory, the model trainer last
+            artifact_writers = ("chunked_model_trainer",)
+        else:
+            stages = [
+                Stage("data_ingestion", self.data_ingestion, output="data_ingestion_artifact"),
+                Stage("data_validation", self.data_validation,
+                      inputs=("data_ingestion_artifact",), output="data_validation_artifact"),
+                Stage("drift_report", self.drift_report,
+                      inputs=("data_validation_artifact",), output="drift_status"),
+                Stage("data_transformation", self.data_transformation,
+                      inputs=("data_validation_artifact",), output="data_transformation_artifact"),
+                Stage("model_trainer", self.model_trainer,
+                      inputs=("data_transformation_artifact",), output="model_trainer_artifact"),
+            ]
+            artifact_writers = ("drift_report", "model_trainer")
+
+        stages.append(Stage("save_stage_metrics", self.save_stage_metrics, after=artifact_writers, checkpoint=False))
+
+        if config.sync_to_s3:
+            # the two syncs touch different folders and run side by side
+            stages.append(Stage("sync_artifact_dir_to_s3", self.sync_artifact_dir_to_s3,
+                                after=artifact_writers + ("save_stage_metrics",)))
+            stages.append(Stage("sync_saved_model_dir_to_s3", self.sync_saved_model_dir_to_s3,
+                                after=artifact_writers[-1:]))
+        return stages
+
     def run_pipeline(self):
 
         """
-        Executes the entire training pipeline.
+        Executes the entire training pipeline, running independent stages concurrently.
 
         Returns:
             ModelTrainerArtifact: Contains metadata about the trained model.
         """
         
         try:
-            data_ingestion_artifact=self.data_ingestion()
-            data_validation_artifact=self.data_validation(data_ingestion_artifact=data_ingestion_artifact)
-            data_transformation_artifact=self.data_transformation(data_validation_artifact=data_validation_artifact)
-            model_trainer_artifact=self.model_trainer(data_transformation_artifact=data_transformation_artifact)
-            
-            self.sync_artifact_dir_to_s3()
-            self.sync_saved_model_dir_to_s3()
+            set_active_profiler(self.profiler)
+            config = self.training_pipeline_config
+            run_tags = {"training_mode": config.training_mode, "sampled": config.sampled}
+            if config.sampled:
+                run_tags["sample_fraction"] = config.sample_fraction
+            if config.run_id:
+                run_tags["run_id"] = config.run_id
+            self.tracker.start_run(run_name=os.path.basename(config.artifact_dir), tags=run_tags)
+
+            if config.sampled:
+                # a model trained on a sample must never become the served version
+                logging.info(f"Fast mode run on a {config.sample_fraction:.0%} sample, not syncing to S3")
+            if config.isolated:
+                logging.info(f"Experiment run {config.run_id}, model kept in {config.model_dir}, not syncing to S3")
+
+            # what a resumed run needs to rebuild the same configuration
+            self.checkpoints.save_run({"timestamp": config.timestamp, "training_mode": config.training_mode,
+                                       "sample_fraction": config.sample_fraction, "run_id": config.run_id,
+                                       "schema_file_path": config.schema_file_path,
+                                       "param_grids": config.param_grids, "model_names": config.model_names,
+                                       "isolated": config.isolated})
+
+            scheduler = StageScheduler(self.build_stages(), max_workers=config.max_workers, checkpoints=self.checkpoints)
+            outputs = scheduler.run()
+            if scheduler.restored:
+                self.tracker.set_tags({"resumed": True, "restored_stages": ",".join(scheduler.restored)})
+            model_trainer_artifact = outputs["model_trainer_artifact"]
+            if outputs.get("drift_status") is not None:
+                self.tracker.set_tags({"drift_detected": not outputs["drift_status"]})
+
+            # stage_metrics.yaml was written by the save_stage_metrics stage, before the artifact sync
+            self.profiler.log_to_mlflow(self.training_pipeline_config.stage_metrics_file_path, tracker=self.tracker)
+            self.tracker.log_metrics({f"pipeline/{key}": value for key, value in scheduler.summary().items()})
+            self.tracker.log_artifact(self.training_pipeline_config.memory_report_file_path)
             
             return model_trainer_artifact
         except Exception as e:
             raise MachinePredictiveMaintenanceException(e,sys)
+        finally:
+            set_active_profiler(None)
+            # waits for the queued metrics and the model upload to reach the tracking store
+            self.tracker.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the training pipeline.")
+    parser.add_argument("--resume", metavar="RUN_DIR",
+                        help="Continue the run in Artifacts/<timestamp> from its first incomplete stage.")
+    args = parser.parse_args()
+
+    training_pipeline = TrainingPipeline.resume(args.resume) if args.resume else TrainingPipeline()
+    print(training_pipeline.run_pipeline())
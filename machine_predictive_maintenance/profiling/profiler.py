@@ -0,0 +1,369 @@
+import os
+import sys
+import time
+import yaml
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+from machine_predictive_maintenance.constant.training_pipeline import PROFILING_MLFLOW_RUN_NAME
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb():
+
+    """
+    Returns the peak resident set size of this process in MB, or None if unavailable.
+    """
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 2)
+
+
+def process_usage() -> tuple:
+
+    """
+    Returns the CPU time of this whole process (all its threads) in seconds and its peak RSS
+    in MB, each None if unavailable. Worker processes report this back with their results.
+    """
+
+    if resource is None:
+        return None, None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime, _peak_rss_mb()
+
+
+def _current_rss_mb():
+
+    """
+    Returns the current resident set size of this process in MB, or None if unavailable.
+    """
+
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 2)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StageRecord:
+
+    """
+    Measurements for one profiled stage.
+
+    Attributes:
+        name (str): Slash-separated stage path, e.g. ``model_trainer/grid_search/Random Forest``.
+        rows (int): Number of rows processed by the stage, if set by the caller.
+        worker_cpu_time_s (float): CPU time of worker processes spent on the stage's tasks,
+            included in ``cpu_time_s``.
+        worker_peak_rss_mb (float): Largest peak RSS reported by those workers.
+    """
+
+    def __init__(self, name: str, rows: int = None):
+        self.name = name
+        self.rows = rows
+        self.wall_time_s = None
+        self.cpu_time_s = None
+        self.rss_start_mb = None
+        self.rss_end_mb = None
+        self.peak_rss_mb = None
+        self.peak_rss_growth_mb = None
+        self.worker_cpu_time_s = 0.0
+        self.worker_peak_rss_mb = None
+
+    def add_worker_usage(self, cpu_time_s: float = None, peak_rss_mb: float = None) -> None:
+        if cpu_time_s is not None:
+            self.worker_cpu_time_s += cpu_time_s
+        if peak_rss_mb is not None:
+            self.worker_peak_rss_mb = max(self.worker_peak_rss_mb or 0, peak_rss_mb)
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_time_s": self.wall_time_s,
+            "cpu_time_s": self.cpu_time_s,
+            "rss_start_mb": self.rss_start_mb,
+            "rss_end_mb": self.rss_end_mb,
+            "peak_rss_mb": self.peak_rss_mb,
+            "peak_rss_growth_mb": self.peak_rss_growth_mb,
+            "worker_peak_rss_mb": self.worker_peak_rss_mb,
+            "rows": self.rows,
+        }
+
+
+class PipelineProfiler:
+
+    """
+    Records wall time, CPU time, memory and row counts for pipeline stages.
+
+    Stages nest: a stage opened while another is running is recorded under the parent's
+    path, so sub-steps such as each grid search show up beneath ``model_trainer``. Each
+    thread has its own stack, so stages the scheduler runs concurrently do not nest into
+    each other. CPU time is that of the stage's own thread, so concurrent stages do not count
+    each other's work, plus the CPU time worker processes report for the stage's tasks through
+    ``add_worker_usage`` (the grid search's loky workers). Peak RSS is process-wide and
+    includes the overlap; the workers' own peak is kept separately as ``worker_peak_rss_mb``.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.frames = []
+        self._local = threading.local()
+
+    @property
+    def _stack(self) -> list:
+        # the records of the stages open in this thread, innermost last
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _path(self, name: str) -> str:
+        return f"{self._stack[-1].name}/{name}" if self._stack else name
+
+    def add_worker_usage(self, cpu_time_s: float = None, peak_rss_mb: float = None) -> None:
+
+        """
+        Adds the usage reported by a worker process to the innermost stage open in this thread.
+
+        Args:
+            cpu_time_s (float, optional): CPU time the worker spent on the task.
+            peak_rss_mb (float, optional): The worker's peak RSS.
+        """
+
+        if self._stack:
+            self._stack[-1].add_worker_usage(cpu_time_s, peak_rss_mb)
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+
+        """
+        Profiles the enclosed block.
+
+        Args:
+            name (str): Stage name, appended to the path of any enclosing stage.
+            rows (int, optional): Row count, can also be set later on the yielded record.
+
+        Yields:
+            StageRecord: The record being filled in.
+        """
+
+        record = StageRecord(self._path(name), rows=rows)
+        self._stack.append(record)
+        self.records.append(record)
+
+        record.rss_start_mb = _current_rss_mb()
+        peak_before = _peak_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield record
+        finally:
+            record.wall_time_s = round(time.perf_counter() - wall_start, 4)
+            record.cpu_time_s = round(time.thread_time() - cpu_start + record.worker_cpu_time_s, 4)
+            record.rss_end_mb = _current_rss_mb()
+            record.peak_rss_mb = _peak_rss_mb()
+            if peak_before is not None:
+                record.peak_rss_growth_mb = round(record.peak_rss_mb - peak_before, 2)
+            self._stack.pop()
+            if self._stack:
+                # the enclosing stage's CPU time includes its sub-stages' workers as well
+                self._stack[-1].add_worker_usage(record.worker_cpu_time_s, record.worker_peak_rss_mb)
+
+            logging.info(
+                f"Stage {record.name} took {record.wall_time_s}s wall, {record.cpu_time_s}s cpu, "
+                f"peak rss {record.peak_rss_mb} MB, rows {record.rows}"
+            )
+
+    def to_dict(self) -> dict:
+
+        """
+        Returns the measurements by stage path. Stages run more than once under the same path,
+        such as feature preparation for each split or chunk, are merged: times and rows are
+        summed, ``calls`` counts the runs, peaks are the largest of the runs, and memory spans
+        the first start to the last end.
+        """
+
+        stages = {}
+        for record in self.records:
+            entry = record.to_dict()
+            merged = stages.get(record.name)
+            if merged is None:
+                stages[record.name] = {**entry, "calls": 1}
+                continue
+            for key in ("wall_time_s", "cpu_time_s", "rows"):
+                if entry[key] is not None:
+                    merged[key] = round((merged[key] or 0) + entry[key], 4)
+            # peaks do not add up: keep the largest
+            for key in ("peak_rss_mb", "peak_rss_growth_mb", "worker_peak_rss_mb"):
+                if entry[key] is not None:
+                    merged[key] = entry[key] if merged[key] is None else max(merged[key], entry[key])
+            merged["rss_end_mb"] = entry["rss_end_mb"]
+            merged["calls"] += 1
+        return stages
+
+    def record_frame(self, name: str, rows: int, memory_mb: float, default_memory_mb: float) -> dict:
+
+        """
+        Records the in-memory size of a DataFrame read or built during the current stage.
+
+        Args:
+            name (str): Frame name, appended to the path of the enclosing stage.
+            rows (int): Number of rows.
+            memory_mb (float): Deep memory usage with the dtypes actually used.
+            default_memory_mb (float): Deep memory usage with pandas' default dtypes.
+
+        Returns:
+            dict: The recorded entry.
+        """
+
+        entry = {
+            "name": self._path(name),
+            "rows": rows,
+            "memory_mb": round(memory_mb, 3),
+            "default_memory_mb": round(default_memory_mb, 3),
+            "saved_pct": round(100 * (1 - memory_mb / default_memory_mb), 1) if default_memory_mb else None,
+        }
+        self.frames.append(entry)
+        return entry
+
+    def save_memory_report(self, file_path: str) -> None:
+
+        """
+        Writes the recorded frame sizes to a YAML file.
+
+        Args:
+            file_path (str): Destination path, usually under ``Artifacts/<timestamp>/``.
+        """
+
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as file:
+                yaml.dump({entry["name"]: {key: value for key, value in entry.items() if key != "name"}
+                           for entry in self.frames}, file, sort_keys=False)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def save(self, file_path: str) -> None:
+
+        """
+        Writes the collected stage metrics to a YAML file.
+
+        Args:
+            file_path (str): Destination path, usually under ``Artifacts/<timestamp>/``.
+        """
+
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as file:
+                yaml.dump(self.to_dict(), file, sort_keys=False)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def log_to_mlflow(self, metrics_file_path: str = None, tracker=None) -> None:
+
+        """
+        Logs every stage measurement as an MLflow metric, in the pipeline's run if a tracker
+        is given and in a dedicated run otherwise.
+
+        Args:
+            metrics_file_path (str, optional): Metrics file to attach as a run artifact.
+            tracker (MlflowTracker, optional): Background tracker of the pipeline's run.
+        """
+
+        try:
+            if tracker is not None:
+                tracker.log_metrics({
+                    f"{name}/{metric_name}": value
+                    for name, stage in self.to_dict().items() for metric_name, value in stage.items()
+                    if value is not None
+                })
+                tracker.log_metrics({
+                    f"frame_memory/{entry['name']}/{key}": entry[key]
+                    for entry in self.frames for key in ("memory_mb", "default_memory_mb", "saved_pct")
+                    if entry[key] is not None
+                })
+                if metrics_file_path is not None:
+                    tracker.log_artifact(metrics_file_path)
+                return
+
+            import mlflow
+
+            with mlflow.start_run(run_name=PROFILING_MLFLOW_RUN_NAME):
+                for name, stage in self.to_dict().items():
+                    for metric_name, value in stage.items():
+                        if value is not None:
+                            mlflow.log_metric(f"{name}/{metric_name}", value)
+                if metrics_file_path is not None:
+                    mlflow.log_artifact(metrics_file_path)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
+# scoped to the calling context, so pipelines run side by side (e.g. two /train requests
+# in asyncio.to_thread) each profile into their own run
+_active_profiler: contextvars.ContextVar = contextvars.ContextVar("active_profiler", default=None)
+
+
+def set_active_profiler(profiler: PipelineProfiler) -> None:
+
+    """
+    Makes a profiler the target of ``profile_stage`` calls in the current context.
+
+    Threads only see it if they run in a copy of this context, as ``asyncio.to_thread``
+    and the stage scheduler do.
+
+    Args:
+        profiler (PipelineProfiler): The profiler for the current run, or None to disable.
+    """
+
+    _active_profiler.set(profiler)
+
+
+@contextmanager
+def profile_stage(name: str, rows: int = None):
+
+    """
+    Profiles the enclosed block with the active profiler, if any.
+
+    Components call this unconditionally; outside a profiled pipeline run it only
+    yields a detached record and costs nothing measurable.
+
+    Args:
+        name (str): Stage name.
+        rows (int, optional): Row count processed by the stage.
+
+    Yields:
+        StageRecord: The record being filled in.
+    """
+
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield StageRecord(name, rows=rows)
+        return
+
+    with profiler.stage(name, rows=rows) as record:
+        yield record
+
+
+def get_active_profiler() -> PipelineProfiler:
+    return _active_profiler.get()
+
+
+def add_worker_usage(cpu_time_s: float = None, peak_rss_mb: float = None) -> None:
+
+    """
+    Adds a worker process's usage to the current stage of the active profiler, if any.
+    """
+
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler.add_worker_usage(cpu_time_s, peak_rss_mb)
@@ -0,0 +1,113 @@
+import sys
+
+import certifi
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.entity.config_entity import MongoConfig
+
+
+class AsyncMongoClient:
+
+    """
+    asyncio-native access to the project database for the serving app, built on ``motor``.
+
+    One pooled client is shared by all requests of a worker. Every call is bounded by the
+    configured server-selection, socket and pool wait timeouts, so a slow or unreachable
+    database surfaces as an error instead of a request that hangs. The client must be
+    created inside the running event loop, after any fork, which is why ``app.py`` opens it
+    from its startup hook.
+
+    Args:
+        mongo_config (MongoConfig): Connection string, pool sizes and timeouts.
+    """
+
+    def __init__(self, mongo_config: MongoConfig = None):
+
+        try:
+            self.mongo_config = mongo_config or MongoConfig()
+            self.client = None
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def connect(self) -> None:
+        try:
+            # looked up at call time so a stand-in client can be patched in for local runs
+            import motor.motor_asyncio
+
+            config = self.mongo_config
+            self.client = motor.motor_asyncio.AsyncIOMotorClient(
+                config.mongo_db_url,
+                tlsCAFile=certifi.where(),
+                maxPoolSize=config.max_pool_size,
+                minPoolSize=config.min_pool_size,
+                serverSelectionTimeoutMS=config.server_selection_timeout_ms,
+                connectTimeoutMS=config.connect_timeout_ms,
+                socketTimeoutMS=config.socket_timeout_ms,
+                waitQueueTimeoutMS=config.wait_queue_timeout_ms,
+            )
+            logging.info(f"Opened async Mongo client (pool {config.min_pool_size}-{config.max_pool_size})")
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    @property
+    def database(self):
+        if self.client is None:
+            self.connect()
+        return self.client[self.mongo_config.database_name]
+
+    async def ping(self) -> bool:
+        try:
+            await self.database.command("ping")
+            return True
+        except Exception as e:
+            logging.info(f"Mongo ping failed: {e}")
+            return False
+
+    async def insert_predictions(self, records: list) -> int:
+
+        """
+        Stores prediction records with one unordered bulk insert.
+
+        Args:
+            records (list): Prediction documents.
+
+        Returns:
+            int: Number of documents inserted.
+        """
+
+        try:
+            if not records:
+                return 0
+            collection = self.database[self.mongo_config.prediction_collection_name]
+            result = await collection.insert_many(records, ordered=False)
+            return len(result.inserted_ids)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    async def find_machine_history(self, product_id: str, limit: int = None) -> list:
+
+        """
+        Returns the most recent sensor readings of one machine, newest first.
+
+        Args:
+            product_id (str): The machine's ``Product ID``.
+            limit (int, optional): Maximum readings; defaults to ``machine_history_limit``.
+
+        Returns:
+            list: Reading documents without ``_id``.
+        """
+
+        try:
+            limit = limit or self.mongo_config.machine_history_limit
+            collection = self.database[self.mongo_config.collection_name]
+            cursor = collection.find({"Product ID": product_id}, {"_id": 0}).sort("UDI", -1).limit(limit)
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
@@ -0,0 +1,193 @@
+import sys
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.entity.config_entity import PredictionSinkConfig
+from machine_predictive_maintenance.monitoring.metrics import (
+    PREDICTION_SINK_RECORDS,
+    PREDICTION_SINK_BUFFERED,
+    PREDICTION_SINK_FLUSH_TIME,
+)
+from machine_predictive_maintenance.serving.async_mongo import AsyncMongoClient
+
+
+def to_prediction_records(df: pd.DataFrame, **fields) -> list:
+
+    """
+    Converts a prediction frame into BSON-ready documents.
+
+    NaN becomes None and numpy scalars become Python scalars, since the driver can encode
+    neither. ``fields`` (e.g. request id and model version) are added to every document.
+
+    Args:
+        df (pd.DataFrame): Inputs and predictions, one row per document.
+
+    Returns:
+        list: One dict per row.
+    """
+
+    try:
+        records = df.astype(object).where(df.notna(), None).to_dict("records")
+        predicted_at = datetime.now(timezone.utc)
+        for record in records:
+            for key, value in record.items():
+                if isinstance(value, np.float32):
+                    # float32 readings: store the value as read (298.1), not its float64 expansion
+                    record[key] = float(str(value))
+                elif isinstance(value, np.generic):
+                    record[key] = value.item()
+            record.update(fields)
+            record["predicted_at"] = predicted_at
+        return records
+    except Exception as e:
+        raise MachinePredictiveMaintenanceException(e, sys)
+
+
+def _is_transient(error: Exception) -> bool:
+    from pymongo.errors import ConnectionFailure
+
+    # AsyncMongoClient wraps driver errors; look at the original one
+    return isinstance(getattr(error, "error_message", error), ConnectionFailure)
+
+
+class BufferedPredictionSink:
+
+    """
+    Collects prediction records in memory and writes them to Mongo in bulk from a background task.
+
+    ``add`` only appends to a bounded buffer, so a request never waits on the database. A
+    background task flushes up to ``flush_size`` records per unordered ``insert_many`` whenever
+    the buffer reaches ``flush_size`` or ``flush_interval_seconds`` has passed. Writes that fail
+    with a connection error are retried with exponential backoff; once the buffer is full, new
+    records are dropped and counted instead of growing memory while Mongo is unavailable.
+    ``stop`` flushes whatever is left.
+
+    Args:
+        mongo_client (AsyncMongoClient): Client writing to the predictions collection.
+        prediction_sink_config (PredictionSinkConfig): Flush thresholds, buffer bound and retry policy.
+    """
+
+    def __init__(self, mongo_client: AsyncMongoClient, prediction_sink_config: PredictionSinkConfig = None):
+
+        try:
+            self.mongo_client = mongo_client
+            self.prediction_sink_config = prediction_sink_config or PredictionSinkConfig()
+            self._buffer = deque()
+            self._flush_requested = None
+            self._task = None
+            self._stopping = False
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @property
+    def enabled(self) -> bool:
+        return self.prediction_sink_config.enabled and self.mongo_client.mongo_config.mongo_db_url is not None
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def add(self, records: list) -> int:
+
+        """
+        Queues records for writing without waiting.
+
+        Args:
+            records (list): Prediction documents.
+
+        Returns:
+            int: Number of records accepted; the rest were dropped because the buffer is full.
+        """
+
+        if not self.enabled or not records:
+            return 0
+
+        room = self.prediction_sink_config.max_buffered_records - len(self._buffer)
+        accepted = records[:max(room, 0)]
+        self._buffer.extend(accepted)
+
+        dropped = len(records) - len(accepted)
+        if dropped:
+            PREDICTION_SINK_RECORDS.inc("dropped", amount=dropped)
+        PREDICTION_SINK_BUFFERED.set(value=len(self._buffer))
+
+        if self._flush_requested is not None and len(self._buffer) >= self.prediction_sink_config.flush_size:
+            self._flush_requested.set()
+        return len(accepted)
+
+    def _take_batch(self) -> list:
+        size = min(self.prediction_sink_config.flush_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(size)]
+
+    async def _write_batch(self, batch: list) -> None:
+        config = self.prediction_sink_config
+        for attempt in range(config.max_retries + 1):
+            try:
+                with PREDICTION_SINK_FLUSH_TIME.time():
+                    written = await self.mongo_client.insert_predictions(batch)
+                PREDICTION_SINK_RECORDS.inc("written", amount=written)
+                return
+            except Exception as e:
+                if not _is_transient(e) or attempt == config.max_retries:
+                    logging.info(f"Dropping {len(batch)} prediction records after {attempt + 1} attempts: {e}")
+                    PREDICTION_SINK_RECORDS.inc("failed", amount=len(batch))
+                    return
+                await asyncio.sleep(config.retry_backoff_seconds * 2 ** attempt)
+
+    async def flush(self) -> None:
+
+        """
+        Writes everything currently buffered.
+        """
+
+        while self._buffer:
+            await self._write_batch(self._take_batch())
+        PREDICTION_SINK_BUFFERED.set(value=len(self._buffer))
+
+    async def _run(self) -> None:
+        interval = self.prediction_sink_config.flush_interval_seconds
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.info(f"Prediction sink flush failed: {e}")
+
+    def start(self) -> None:
+
+        """
+        Starts the background flush task on the running event loop.
+        """
+
+        if not self.enabled:
+            logging.info("Prediction sink disabled, predictions will not be stored in Mongo")
+            return
+        self._stopping = False
+        self._flush_requested = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+
+        """
+        Stops the background task and writes the remaining records.
+        """
+
+        if self._task is None:
+            return
+        self._stopping = True
+        self._flush_requested.set()
+        await self._task
+        self._task = None
+        await self.flush()
+        logging.info("Prediction sink flushed and stopped")
@@ -0,0 +1,220 @@
+import os
+import gc
+import sys
+import time
+import shutil
+import signal
+import socket
+import tempfile
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging, listener
+
+from machine_predictive_maintenance.entity.config_entity import ServingConfig
+from machine_predictive_maintenance.monitoring.metrics import REGISTRY
+from machine_predictive_maintenance.utils.ml_utils.model.model_store import ModelStore
+
+
+class PreforkServer:
+
+    """
+    Serves the app from several forked uvicorn workers that share one copy of the model.
+
+    The parent process loads the preprocessor and model, freezes the garbage collector so the
+    loaded objects are moved out of the tracked generations, and only then forks. ``gc.freeze``
+    only keeps the cyclic collector from touching those objects. Reference counting still
+    writes to the header of every Python object a worker uses, so the pages holding the
+    model's Python objects are copied in each worker as they are accessed. The large numpy
+    buffers behind them, such as the fitted tree arrays, are separate allocations that are only
+    read, so they stay shared copy-on-write across the workers.
+
+    When the model store reports a new version, the parent loads it, forks a fresh generation
+    of workers on the same listening socket, and then sends SIGTERM to the old generation,
+    which uvicorn handles by finishing in-flight requests before exiting.
+
+    A scrape of ``/metrics`` lands on any one worker, so the workers write their metrics to a
+    shared temporary directory and each renders the sum over all of them.
+
+    Args:
+        app: The ASGI application.
+        model_store (ModelStore): The store the app serves from.
+        serving_config (ServingConfig): Host, port, worker count and reload interval.
+    """
+
+    def __init__(self, app, model_store: ModelStore, serving_config: ServingConfig):
+
+        try:
+            self.app = app
+            self.model_store = model_store
+            self.serving_config = serving_config
+            self.workers = {}
+            self.generation = 0
+            self._stopping = False
+            self._socket = None
+            self._metrics_dir = None
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def _bind_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.serving_config.host, self.serving_config.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _run_worker(self) -> None:
+
+        """
+        Body of a forked worker: serves requests on the shared socket until told to stop.
+        """
+
+        import uvicorn
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+        # the parent's values, such as the model load, are already in its own snapshot
+        REGISTRY.reset()
+        REGISTRY.start_snapshot_thread(self.serving_config.metrics_snapshot_seconds)
+
+        config = uvicorn.Config(self.app, log_level="warning",
+                                timeout_graceful_shutdown=self.serving_config.worker_shutdown_timeout_seconds)
+        server = uvicorn.Server(config)
+        server.run(sockets=[self._socket])
+
+    def _spawn_worker(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                exit_code = 1
+            finally:
+                # os._exit skips atexit, so write the last metrics and drain the queued log records explicitly
+                try:
+                    REGISTRY.write_snapshot()
+                except Exception:
+                    pass
+                listener.stop()
+                os._exit(exit_code)
+
+        self.workers[pid] = self.generation
+        return pid
+
+    def _spawn_generation(self) -> None:
+
+        """
+        Forks a full set of workers for the currently loaded model.
+        """
+
+        self.generation += 1
+        # the model loads counted in this process, before the workers clear their copies
+        REGISTRY.write_snapshot()
+        # move everything loaded so far into the permanent generation so the cyclic GC in the
+        # children does not touch the model's objects
+        gc.collect()
+        gc.freeze()
+
+        for _ in range(self.serving_config.workers):
+            self._spawn_worker()
+
+        logging.info(f"Started {self.serving_config.workers} workers for model version "
+                     f"{self.model_store.current.version} (generation {self.generation})")
+
+    def _retire_old_generations(self) -> None:
+        for pid, generation in list(self.workers.items()):
+            if generation < self.generation:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    self.workers.pop(pid, None)
+
+    def _reap_workers(self) -> None:
+
+        """
+        Collects exited workers and replaces any of the current generation that died.
+        """
+
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+
+            generation = self.workers.pop(pid, None)
+            REGISTRY.mark_process_dead(pid)
+            if generation == self.generation and not self._stopping:
+                logging.info(f"Worker {pid} exited with status {status}, restarting")
+                self._spawn_worker()
+
+    def _check_for_new_model(self) -> None:
+        try:
+            if self.model_store.refresh():
+                # only now let the parent's copy of the replaced model be collected; until a
+                # new model loads, the current one stays frozen for workers forked on restart
+                gc.unfreeze()
+                self._spawn_generation()
+                self._retire_old_generations()
+        except Exception as e:
+            logging.info(f"Model reload failed, keeping current workers: {e}")
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _shutdown(self) -> None:
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.time() + self.serving_config.worker_shutdown_timeout_seconds
+        while self.workers and time.time() < deadline:
+            self._reap_workers()
+            time.sleep(0.1)
+
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self._socket.close()
+        shutil.rmtree(self._metrics_dir, ignore_errors=True)
+
+    def run(self) -> None:
+
+        """
+        Loads the model, forks the workers and supervises them until SIGTERM or SIGINT.
+        """
+
+        try:
+            self.model_store.get()
+            # workers must not poll on their own: reloads are coordinated by this process
+            self.model_store.model_puller_config.poll_interval_seconds = 0
+
+            self._socket = self._bind_socket()
+            self._metrics_dir = tempfile.mkdtemp(prefix="metrics-")
+            REGISTRY.enable_multiprocess(self._metrics_dir)
+            signal.signal(signal.SIGTERM, self._handle_stop)
+            signal.signal(signal.SIGINT, self._handle_stop)
+
+            self._spawn_generation()
+            logging.info(f"Serving on {self.serving_config.host}:{self.serving_config.port}")
+
+            next_check = time.time() + self.serving_config.reload_check_seconds
+            while not self._stopping:
+                time.sleep(0.5)
+                self._reap_workers()
+                if self.serving_config.reload_check_seconds > 0 and time.time() >= next_check:
+                    self._check_for_new_model()
+                    next_check = time.time() + self.serving_config.reload_check_seconds
+
+            self._shutdown()
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
@@ -0,0 +1,149 @@
+import io
+import os
+import sys
+
+import pandas as pd
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+
+RESPONSE_MEDIA_TYPES = {
+    "html": "text/html",
+    "json": "application/json",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+_ACCEPT_TO_FORMAT = {
+    "text/html": "html",
+    "application/xhtml+xml": "html",
+    "application/json": "json",
+    "text/csv": "csv",
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+    "*/*": "html",
+    "text/*": "html",
+    "application/*": "json",
+}
+
+
+def negotiate_format(accept_header: str, requested_format: str = None) -> str:
+
+    """
+    Picks the response format for a request.
+
+    An explicit ``format`` query parameter wins; otherwise the ``Accept`` header is read in
+    order of its quality values. Browsers and clients that send no preference get HTML, as
+    before content negotiation was added.
+
+    Args:
+        accept_header (str): The request's ``Accept`` header, may be empty.
+        requested_format (str, optional): Value of the ``format`` query parameter.
+
+    Returns:
+        str: One of ``html``, ``json``, ``csv`` or ``arrow``, or None if nothing acceptable is offered.
+    """
+
+    if requested_format:
+        requested_format = requested_format.lower()
+        return requested_format if requested_format in RESPONSE_MEDIA_TYPES else None
+
+    if not accept_header:
+        return "html"
+
+    candidates = []
+    for position, part in enumerate(accept_header.split(",")):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(candidates):
+        if media_type in _ACCEPT_TO_FORMAT:
+            return _ACCEPT_TO_FORMAT[media_type]
+    return None
+
+
+def render_table(df: pd.DataFrame, response_format: str) -> bytes:
+
+    """
+    Serializes a prediction frame as JSON records, CSV or an Arrow IPC stream.
+
+    Args:
+        df (pd.DataFrame): The predictions.
+        response_format (str): ``json``, ``csv`` or ``arrow``.
+
+    Returns:
+        bytes: The response body.
+    """
+
+    try:
+        if response_format == "json":
+            return df.to_json(orient="records").encode()
+
+        if response_format == "csv":
+            return df.to_csv(index=False).encode()
+
+        if response_format == "arrow":
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            sink = io.BytesIO()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue()
+
+        raise ValueError(f"Unsupported response format: {response_format}")
+
+    except Exception as e:
+        raise MachinePredictiveMaintenanceException(e, sys)
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def page_bounds(page: int, page_size: int, max_page_size: int) -> tuple:
+
+    """
+    Clamps pagination parameters.
+
+    Returns:
+        tuple: ``(page, page_size, start_row)`` with page starting at 1.
+    """
+
+    page = max(int(page), 1)
+    page_size = min(max(int(page_size), 1), max_page_size)
+    return page, page_size, (page - 1) * page_size
+
+
+def write_prediction_output(df: pd.DataFrame, file_path: str) -> None:
+
+    """
+    Persists one request's predictions; run as a background task after the response is sent.
+
+    The file is written under a temporary name and renamed, so a reader never sees it half written.
+
+    Args:
+        df (pd.DataFrame): The predictions.
+        file_path (str): Destination CSV file.
+    """
+
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_file_path = f"{file_path}.tmp"
+        df.to_csv(tmp_file_path, index=False)
+        os.replace(tmp_file_path, file_path)
+    except Exception as e:
+        logging.info(f"Could not write prediction output {file_path}: {e}")
@@ -0,0 +1,351 @@
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.constant.training_pipeline import SCHEMA_FILE_PATH, PREDICTION_OPTIONAL_COLUMNS
+from machine_predictive_maintenance.entity.config_entity import StreamingConfig
+from machine_predictive_maintenance.monitoring.metrics import STREAM_EVENTS, STREAM_EVENT_LATENCY, STREAM_BATCH_SIZE
+from machine_predictive_maintenance.streaming.sinks import MongoSink, FileSink
+from machine_predictive_maintenance.streaming.sources import MongoChangeStreamSource, FileSource, SocketSource
+from machine_predictive_maintenance.utils.main_utils.utils import processing_test_data, read_yaml_file
+from machine_predictive_maintenance.utils.main_utils.feature_engine import RollingFeatureEngine
+from machine_predictive_maintenance.utils.main_utils.schema_validator import SchemaValidator, VALIDATION_ERRORS_COLUMN
+from machine_predictive_maintenance.utils.ml_utils.model.model_store import ModelStore
+from machine_predictive_maintenance.utils.ml_utils.model.prediction_cache import PredictionCache
+
+load_dotenv()
+
+MONGO_DB_URL = os.getenv("MONGO_DB_URL")
+
+# marks the end of a finite source on the event and result queues
+_END_OF_STREAM = object()
+
+
+class StreamingScorer:
+
+    """
+    Long-running consumer that scores sensor events as they arrive.
+
+    Three threads are connected by bounded queues:
+
+    * the reader pulls events from the source into the event queue,
+    * the scorer drains the event queue into micro-batches of up to ``max_batch_size`` events
+      (or whatever arrived within ``max_batch_wait_ms``), validates them against the schema and
+      runs the saved preprocessor and model once per batch,
+    * the writer hands each scored batch to the sink.
+
+    When the sink or the model falls behind, the bounded queues fill up and the reader blocks,
+    so the source is throttled instead of memory growing without limit. End-to-end latency is
+    measured per event from the moment it was read to the moment its prediction was written.
+
+    Per-machine history for the rolling features lives in one bounded engine for the whole
+    stream, so a machine's windows span batches as they span a training split, and is
+    cleared when a new model version is swapped in.
+
+    Args:
+        source: Iterable of event dicts with a ``stop()`` method.
+        sink: Object with ``write(records)`` and ``close()``.
+        model_store (ModelStore): Provides the model; refreshed between batches on the poll interval.
+        streaming_config (StreamingConfig): Batch sizes, queue bounds and reporting interval.
+    """
+
+    def __init__(self, source, sink, model_store: ModelStore, streaming_config: StreamingConfig):
+
+        try:
+            self.source = source
+            self.sink = sink
+            self.model_store = model_store
+            self.streaming_config = streaming_config
+            self.schema_validator = SchemaValidator.from_yaml(SCHEMA_FILE_PATH)
+            self.feature_engine = RollingFeatureEngine.from_schema(read_yaml_file(SCHEMA_FILE_PATH))
+            self.prediction_cache = PredictionCache()
+
+            self.event_queue = queue.Queue(maxsize=streaming_config.event_queue_size)
+            self.result_queue = queue.Queue(maxsize=streaming_config.result_queue_size)
+            self._stop = threading.Event()
+            self._errors = []
+
+            self.events_written = 0
+            self._latencies = deque(maxlen=100_000)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.source.stop()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        # blocking put that still notices a stop request
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_thread(self, target) -> None:
+        try:
+            target()
+        except Exception as e:
+            logging.info(f"Streaming thread {threading.current_thread().name} failed: {e}")
+            self._errors.append(e)
+            self.stop()
+
+    def _read_events(self) -> None:
+        for event in self.source:
+            if not self._put(self.event_queue, (time.perf_counter(), event)):
+                return
+        self._put(self.event_queue, _END_OF_STREAM)
+
+    def _next_batch(self):
+
+        """
+        Collects the next micro-batch from the event queue.
+
+        Returns:
+            tuple: ``(received_at, events, finished)`` where finished is True once the
+            source is exhausted.
+        """
+
+        max_batch_size = self.streaming_config.max_batch_size
+        max_wait = self.streaming_config.max_batch_wait_ms / 1000
+        received_at, events = [], []
+
+        while not events:
+            if self._stop.is_set():
+                return received_at, events, True
+            try:
+                item = self.event_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is _END_OF_STREAM:
+                return received_at, events, True
+            received_at.append(item[0])
+            events.append(item[1])
+
+        deadline = time.perf_counter() + max_wait
+        while len(events) < max_batch_size:
+            # take whatever is already queued without waiting, then wait out the deadline
+            try:
+                item = self.event_queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.event_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is _END_OF_STREAM:
+                return received_at, events, True
+            received_at.append(item[0])
+            events.append(item[1])
+
+        return received_at, events, False
+
+    def score_batch(self, events: list) -> list:
+
+        """
+        Validates and scores one micro-batch.
+
+        Args:
+            events (list): Event dicts in arrival order.
+
+        Returns:
+            list: The events with ``prediction`` and ``model_version`` added; events that
+            failed validation get a null prediction and a ``validation_errors`` field.
+        """
+
+        try:
+            loaded_model = self.model_store.get()
+            self.feature_engine.reset_for(loaded_model.version)
+            dataframe = pd.DataFrame.from_records(events)
+
+            validation = self.schema_validator.validate(dataframe, optional_columns=PREDICTION_OPTIONAL_COLUMNS)
+            valid_df = validation.valid_rows()
+
+            predictions = [None] * len(events)
+            if len(valid_df) > 0:
+                processing_data = processing_test_data(
+                    data=valid_df, schema_file=SCHEMA_FILE_PATH, preprocessor=loaded_model.preprocessor,
+                    feature_engine=self.feature_engine,
+                )
+                y_pred = np.asarray(self.prediction_cache.predict(loaded_model, processing_data)).tolist()
+                for position, value in zip(np.flatnonzero(~validation.row_error_mask), y_pred):
+                    predictions[position] = value
+
+            records = []
+            for event, prediction in zip(events, predictions):
+                record = dict(event)
+                record["prediction"] = prediction
+                record["model_version"] = loaded_model.version
+                records.append(record)
+
+            if not validation.is_valid:
+                errors = validation.invalid_rows()[VALIDATION_ERRORS_COLUMN]
+                for position, message in zip(np.flatnonzero(validation.row_error_mask), errors.tolist()):
+                    records[position][VALIDATION_ERRORS_COLUMN] = message
+
+            STREAM_EVENTS.inc("scored", loaded_model.version, amount=len(valid_df))
+            if validation.invalid_count:
+                STREAM_EVENTS.inc("invalid", loaded_model.version, amount=validation.invalid_count)
+            STREAM_BATCH_SIZE.observe(value=len(events))
+            return records
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def _score_events(self) -> None:
+        poll_interval = self.model_store.model_puller_config.poll_interval_seconds
+        next_refresh = time.time() + poll_interval
+
+        while True:
+            received_at, events, finished = self._next_batch()
+            if events:
+                if not self._put(self.result_queue, (received_at, self.score_batch(events))):
+                    return
+            if finished:
+                self._put(self.result_queue, _END_OF_STREAM)
+                return
+
+            if poll_interval > 0 and time.time() >= next_refresh:
+                self.model_store.refresh()
+                next_refresh = time.time() + poll_interval
+
+    def _write_results(self) -> None:
+        next_report = time.perf_counter() + self.streaming_config.report_interval_seconds
+        events_since_report = 0
+
+        while True:
+            try:
+                item = self.result_queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            if item is _END_OF_STREAM:
+                return
+
+            received_at, records = item
+            self.sink.write(records)
+
+            written_at = time.perf_counter()
+            latencies = (written_at - np.asarray(received_at)).tolist()
+            self._latencies.extend(latencies)
+            for latency in latencies:
+                STREAM_EVENT_LATENCY.observe(value=latency)
+
+            self.events_written += len(records)
+            events_since_report += len(records)
+
+            if written_at >= next_report:
+                interval = self.streaming_config.report_interval_seconds
+                self.report(events_per_second=events_since_report / (interval + written_at - next_report))
+                events_since_report = 0
+                next_report = written_at + interval
+
+    def latency_percentiles(self) -> dict:
+
+        """
+        Returns p50, p95 and p99 end-to-end latency in milliseconds over recent events.
+        """
+
+        if not self._latencies:
+            return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+        p50, p95, p99 = np.percentile(np.fromiter(self._latencies, dtype=np.float64), [50, 95, 99]) * 1000
+        return {"p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2)}
+
+    def report(self, events_per_second: float) -> None:
+        percentiles = self.latency_percentiles()
+        logging.info(
+            f"Streaming: {events_per_second:.0f} events/s, {self.events_written} written, "
+            f"latency p50 {percentiles['p50_ms']} ms p95 {percentiles['p95_ms']} ms p99 {percentiles['p99_ms']} ms, "
+            f"queued {self.event_queue.qsize()} events / {self.result_queue.qsize()} batches"
+        )
+
+    def run(self) -> None:
+
+        """
+        Starts the consumer and blocks until the source is exhausted or ``stop()`` is called.
+        """
+
+        try:
+            self.model_store.get()
+            start = time.perf_counter()
+
+            threads = [
+                threading.Thread(target=self._run_thread, args=(target,), name=name, daemon=True)
+                for name, target in (("stream-reader", self._read_events),
+                                     ("stream-scorer", self._score_events),
+                                     ("stream-writer", self._write_results))
+            ]
+            for thread in threads:
+                thread.start()
+
+            try:
+                # the writer finishes last, once everything read has been written
+                while threads[-1].is_alive():
+                    threads[-1].join(timeout=0.5)
+            except KeyboardInterrupt:
+                self.stop()
+                threads[-1].join()
+
+            self.stop()
+            self.sink.close()
+            self.report(events_per_second=self.events_written / max(time.perf_counter() - start, 1e-9))
+
+            if self._errors:
+                raise self._errors[0]
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
+def build_source(args, streaming_config: StreamingConfig):
+    if args.source == "mongo":
+        return MongoChangeStreamSource(MONGO_DB_URL, streaming_config.database_name,
+                                       streaming_config.source_collection_name)
+    if args.source == "file":
+        return FileSource(args.path, follow=args.follow)
+    return SocketSource(host=args.host, port=args.port)
+
+
+def build_sink(args, streaming_config: StreamingConfig):
+    if args.sink == "mongo":
+        return MongoSink(MONGO_DB_URL, streaming_config.database_name,
+                         streaming_config.prediction_collection_name)
+    return FileSink(args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a continuous stream of sensor readings.")
+    parser.add_argument("--source", choices=("mongo", "file", "socket"), default="mongo")
+    parser.add_argument("--path", help="CSV or JSON lines file for --source file.")
+    parser.add_argument("--follow", action="store_true", help="Keep reading as lines are appended to --path.")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address for --source socket.")
+    parser.add_argument("--port", type=int, default=9009, help="Port for --source socket.")
+    parser.add_argument("--sink", choices=("mongo", "file"), default="mongo")
+    parser.add_argument("--output", default=os.path.join("prediction_output", "stream_predictions.jsonl"),
+                        help="JSON lines file for --sink file.")
+    args = parser.parse_args()
+
+    streaming_config = StreamingConfig()
+    scorer = StreamingScorer(
+        source=build_source(args, streaming_config),
+        sink=build_sink(args, streaming_config),
+        model_store=ModelStore(),
+        streaming_config=streaming_config,
+    )
+    scorer.run()
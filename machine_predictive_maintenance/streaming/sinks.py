@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+
+import certifi
+import pymongo
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+
+
+class MongoSink:
+
+    """
+    Writes scored events to a MongoDB collection with unordered bulk inserts.
+
+    Args:
+        mongo_db_url (str): Connection string.
+        database_name (str): Target database.
+        collection_name (str): Target collection.
+    """
+
+    def __init__(self, mongo_db_url: str, database_name: str, collection_name: str):
+
+        try:
+            self.mongo_client = pymongo.MongoClient(mongo_db_url, tlsCAFile=certifi.where())
+            self.collection = self.mongo_client[database_name][collection_name]
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def write(self, records: list) -> None:
+        try:
+            if records:
+                self.collection.insert_many(records, ordered=False)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def close(self) -> None:
+        self.mongo_client.close()
+
+
+class FileSink:
+
+    """
+    Appends scored events to a JSON lines file.
+
+    Args:
+        file_path (str): Output file.
+    """
+
+    def __init__(self, file_path: str):
+
+        try:
+            dir_path = os.path.dirname(file_path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            self.file_obj = open(file_path, "a", encoding="utf-8")
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def write(self, records: list) -> None:
+        try:
+            self.file_obj.write("".join(json.dumps(record, default=str) + "\n" for record in records))
+            self.file_obj.flush()
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def close(self) -> None:
+        self.file_obj.close()
@@ -0,0 +1,145 @@
+import sys
+import csv
+import json
+import time
+import socket
+import threading
+
+import certifi
+import pymongo
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+
+class MongoChangeStreamSource:
+
+    """
+    Yields every document inserted into a collection, via a MongoDB change stream.
+
+    The change stream resume token is kept so a restarted iteration continues after the last
+    event it delivered. Change streams need a replica set or Atlas cluster.
+
+    Args:
+        mongo_db_url (str): Connection string.
+        database_name (str): Database holding the sensor collection.
+        collection_name (str): Collection to watch.
+    """
+
+    def __init__(self, mongo_db_url: str, database_name: str, collection_name: str):
+
+        try:
+            self.mongo_db_url = mongo_db_url
+            self.database_name = database_name
+            self.collection_name = collection_name
+            self.resume_token = None
+            self._stop = threading.Event()
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def __iter__(self):
+        try:
+            client = pymongo.MongoClient(self.mongo_db_url, tlsCAFile=certifi.where())
+            collection = client[self.database_name][self.collection_name]
+            pipeline = [{"$match": {"operationType": "insert"}}]
+
+            with collection.watch(pipeline, resume_after=self.resume_token, max_await_time_ms=500) as stream:
+                logging.info(f"Watching {self.database_name}.{self.collection_name} for inserts")
+                while not self._stop.is_set() and stream.alive:
+                    change = stream.try_next()
+                    if change is None:
+                        continue
+                    self.resume_token = stream.resume_token
+                    document = change["fullDocument"]
+                    document.pop("_id", None)
+                    yield document
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
+class FileSource:
+
+    """
+    Yields readings from a JSON lines or CSV file, optionally following it like ``tail -f``.
+
+    Args:
+        file_path (str): File to read; ``.csv`` files are read with a header row,
+            anything else as one JSON object per line.
+        follow (bool, optional): Keep waiting for appended lines instead of stopping at EOF.
+    """
+
+    def __init__(self, file_path: str, follow: bool = False):
+        self.file_path = file_path
+        self.follow = follow
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _lines(self, file_obj):
+        while not self._stop.is_set():
+            line = file_obj.readline()
+            if line:
+                yield line
+            elif self.follow:
+                time.sleep(0.05)
+            else:
+                return
+
+    def __iter__(self):
+        try:
+            with open(self.file_path, newline="", encoding="utf-8-sig") as file_obj:
+                if self.file_path.endswith(".csv"):
+                    header = next(csv.reader([file_obj.readline()]))
+                    for row in csv.reader(self._lines(file_obj)):
+                        if row:
+                            yield dict(zip(header, row))
+                else:
+                    for line in self._lines(file_obj):
+                        line = line.strip()
+                        if line:
+                            yield json.loads(line)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
+class SocketSource:
+
+    """
+    Listens on a TCP port and yields one JSON object per line from any connected sender.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9009):
+        self.host = host
+        self.port = port
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def __iter__(self):
+        try:
+            with socket.create_server((self.host, self.port)) as server:
+                server.settimeout(0.5)
+                logging.info(f"Listening for sensor events on {self.host}:{self.port}")
+                while not self._stop.is_set():
+                    try:
+                        connection, _ = server.accept()
+                    except socket.timeout:
+                        continue
+                    with connection, connection.makefile("r", encoding="utf-8") as reader:
+                        for line in reader:
+                            if self._stop.is_set():
+                                break
+                            line = line.strip()
+                            if line:
+                                yield json.loads(line)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
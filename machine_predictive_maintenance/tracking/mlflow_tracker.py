@@ -0,0 +1,189 @@
+import os
+import sys
+import time
+import queue
+import tempfile
+import threading
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.entity.config_entity import MlflowTrackingConfig
+
+# MLflow accepts at most this many params or tags per log_batch call
+_MAX_PARAMS_PER_BATCH = 100
+_STOP = object()
+
+
+class MlflowTracker:
+
+    """
+    Logs one MLflow run from a background thread, so training never waits on the tracking backend.
+
+    The ``log_*`` methods only put an item on a queue and return. The worker thread collects
+    params, metrics and tags and writes them with ``log_batch`` once ``batch_size`` of them are
+    pending or ``flush_interval_seconds`` have passed. Models and files are uploaded in the same
+    thread, after the pending batch. Everything goes to one run created by ``start_run``, through
+    an ``MlflowClient`` bound to that run id, so no global active run is involved.
+
+    A tracking failure is logged and counted in ``errors``; it never fails the training run.
+
+    Args:
+        mlflow_tracking_config (MlflowTrackingConfig): Tracking URI, experiment and batching policy.
+    """
+
+    def __init__(self, mlflow_tracking_config: MlflowTrackingConfig = None):
+
+        try:
+            self.mlflow_tracking_config = mlflow_tracking_config or MlflowTrackingConfig()
+            self.run_id = None
+            self.errors = 0
+            self._queue = queue.Queue()
+            self._thread = None
+            self._client = None
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def start_run(self, run_name: str = None, tags: dict = None) -> None:
+
+        """
+        Starts the background thread, which creates the run before anything else is logged.
+
+        Args:
+            run_name (str, optional): Name of the MLflow run.
+            tags (dict, optional): Tags set when the run is created.
+        """
+
+        if self.active or not self.mlflow_tracking_config.enabled:
+            return
+        self._queue.put(("start", (run_name, {key: str(value) for key, value in (tags or {}).items()})))
+        self._thread = threading.Thread(target=self._run, name="mlflow-tracker", daemon=True)
+        self._thread.start()
+
+    def _put(self, kind: str, payload) -> None:
+        if self.active:
+            self._queue.put((kind, payload))
+
+    def log_params(self, params: dict) -> None:
+        self._put("params", {key: str(value) for key, value in params.items()})
+
+    def log_metrics(self, metrics: dict, step: int = 0) -> None:
+        timestamp = int(time.time() * 1000)
+        self._put("metrics", [(key, float(value), timestamp, step) for key, value in metrics.items() if value is not None])
+
+    def set_tags(self, tags: dict) -> None:
+        self._put("tags", {key: str(value) for key, value in tags.items()})
+
+    def log_model(self, model, input_example=None) -> None:
+        self._put("model", (model, input_example))
+
+    def log_artifact(self, file_path: str) -> None:
+        self._put("artifact", file_path)
+
+    def close(self, status: str = "FINISHED") -> None:
+
+        """
+        Writes everything still queued, ends the run and stops the thread.
+
+        Args:
+            status (str): Final run status, e.g. ``FINISHED`` or ``FAILED``.
+        """
+
+        if not self.active:
+            return
+        self._queue.put((_STOP, status))
+        self._thread.join(timeout=self.mlflow_tracking_config.close_timeout_seconds)
+        if self._thread.is_alive():
+            logging.info("MLflow tracker did not finish in time; the rest of the run is not logged")
+        self._thread = None
+
+    def _run(self) -> None:
+        from mlflow.entities import Metric, Param, RunTag
+
+        config = self.mlflow_tracking_config
+        metrics, params, tags = [], {}, {}
+
+        def flush():
+            if not (metrics or params or tags):
+                return
+            param_items = [Param(key, value) for key, value in params.items()]
+            tag_items = [RunTag(key, value) for key, value in tags.items()]
+            metric_items = [Metric(*metric) for metric in metrics]
+            metrics.clear()
+            params.clear()
+            tags.clear()
+
+            self._call(lambda: [
+                self._client.log_batch(self.run_id, params=param_items[i:i + _MAX_PARAMS_PER_BATCH])
+                for i in range(0, len(param_items), _MAX_PARAMS_PER_BATCH)
+            ])
+            self._call(lambda: [
+                self._client.log_batch(self.run_id, tags=tag_items[i:i + _MAX_PARAMS_PER_BATCH])
+                for i in range(0, len(tag_items), _MAX_PARAMS_PER_BATCH)
+            ])
+            self._call(lambda: [
+                self._client.log_batch(self.run_id, metrics=metric_items[i:i + config.batch_size])
+                for i in range(0, len(metric_items), config.batch_size)
+            ])
+
+        while True:
+            try:
+                kind, payload = self._queue.get(timeout=config.flush_interval_seconds)
+            except queue.Empty:
+                flush()
+                continue
+
+            if kind == "start":
+                if not self._call(lambda: self._create_run(*payload)):
+                    return
+            elif kind == "params":
+                params.update(payload)
+            elif kind == "tags":
+                tags.update(payload)
+            elif kind == "metrics":
+                metrics.extend(payload)
+            elif kind == "model":
+                flush()
+                self._call(lambda: self._upload_model(*payload))
+            elif kind == "artifact":
+                flush()
+                self._call(lambda: self._client.log_artifact(self.run_id, payload))
+            elif kind is _STOP:
+                flush()
+                self._call(lambda: self._client.set_terminated(self.run_id, status=payload))
+                return
+
+            if len(metrics) + len(params) + len(tags) >= config.batch_size:
+                flush()
+
+    def _call(self, fn) -> bool:
+        try:
+            fn()
+            return True
+        except Exception as e:
+            self.errors += 1
+            logging.info(f"MLflow tracking call failed: {e}")
+            return False
+
+    def _create_run(self, run_name: str, tags: dict) -> None:
+        from mlflow.tracking import MlflowClient
+
+        config = self.mlflow_tracking_config
+        self._client = MlflowClient(tracking_uri=config.tracking_uri)
+        experiment = self._client.get_experiment_by_name(config.experiment_name)
+        experiment_id = experiment.experiment_id if experiment else self._client.create_experiment(config.experiment_name)
+        self.run_id = self._client.create_run(experiment_id, run_name=run_name, tags=tags).info.run_id
+        logging.info(f"Tracking MLflow run {self.run_id} at {config.tracking_uri}")
+
+    def _upload_model(self, model, input_example) -> None:
+        import mlflow.sklearn
+
+        # saved locally and uploaded with the run's client, since log_model needs a global active run
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, "model")
+            mlflow.sklearn.save_model(model, model_path, input_example=input_example)
+            self._client.log_artifacts(self.run_id, model_path, artifact_path="model")
@@ -0,0 +1,169 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+from machine_predictive_maintenance.profiling.profiler import get_active_profiler
+from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file
+
+_INTEGER_DTYPES = ("int8", "int16", "int32", "int64")
+# decimal digits a float32 is guaranteed to round-trip
+_FLOAT32_DIGITS = np.finfo(np.float32).precision
+_POINTER_BYTES = 8
+
+
+class DtypePlan:
+
+    """
+    Compact in-memory dtypes compiled once from ``data_schema/schema.yaml``.
+
+    - ``category`` columns are read as pandas categoricals.
+    - Integer columns with ``numeric_bounds`` use the smallest integer type holding those bounds;
+      unbounded ones (``UDI``) stay ``int64``.
+    - Float columns listed in ``float_decimals`` use ``float32`` when their bounds and decimals
+      fit in the digits a float32 round-trips, so writing them back to CSV gives the same text.
+
+    Only the categorical dtypes are passed to ``read_csv``. Numeric columns are downcast after
+    the read and only when the cast is safe, so malformed values still reach the schema
+    validator and its quarantine instead of failing the read.
+
+    Args:
+        schema_config (dict): The parsed schema file.
+    """
+
+    def __init__(self, schema_config: dict):
+
+        try:
+            bounds = schema_config.get("numeric_bounds", {})
+            decimals = schema_config.get("float_decimals", {})
+            self.dtypes = {}
+
+            for entry in schema_config["columns"]:
+                for column, dtype in entry.items():
+                    if dtype == "category":
+                        self.dtypes[column] = "category"
+                    elif dtype.startswith("int"):
+                        self.dtypes[column] = self._integer_dtype(bounds.get(column))
+                    elif dtype.startswith("float"):
+                        self.dtypes[column] = self._float_dtype(bounds.get(column), decimals.get(column))
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @classmethod
+    def from_yaml(cls, file_path: str) -> "DtypePlan":
+        return cls(read_yaml_file(file_path))
+
+    @staticmethod
+    def _integer_dtype(bounds) -> str:
+        if bounds is None:
+            return "int64"
+        lower, upper = bounds
+        return next(dtype for dtype in _INTEGER_DTYPES
+                    if np.iinfo(dtype).min <= lower and upper <= np.iinfo(dtype).max)
+
+    @staticmethod
+    def _float_dtype(bounds, decimals) -> str:
+        if bounds is None or decimals is None:
+            return "float64"
+        integer_digits = len(str(int(max(abs(bounds[0]), abs(bounds[1])))))
+        return "float32" if integer_digits + decimals <= _FLOAT32_DIGITS else "float64"
+
+    @property
+    def read_csv_dtypes(self) -> dict:
+        return {column: dtype for column, dtype in self.dtypes.items() if dtype == "category"}
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+
+        """
+        Casts the columns of a frame to the planned dtypes where that loses nothing.
+
+        Integer columns are downcast only if they are already integers and every value fits;
+        float columns only if they are already floats. Columns that need coercion are left
+        to the schema validator.
+
+        Args:
+            df (pd.DataFrame): The frame to cast.
+
+        Returns:
+            pd.DataFrame: The frame with compact dtypes; the input is not modified.
+        """
+
+        try:
+            casts = {}
+            for column, dtype in self.dtypes.items():
+                if column not in df.columns or df[column].dtype == dtype:
+                    continue
+                values = df[column]
+                if dtype == "category":
+                    casts[column] = dtype
+                elif dtype.startswith("int") and pd.api.types.is_integer_dtype(values):
+                    info = np.iinfo(dtype)
+                    if len(values) == 0 or (info.min <= values.min() and values.max() <= info.max):
+                        casts[column] = dtype
+                elif dtype.startswith("float") and pd.api.types.is_float_dtype(values):
+                    casts[column] = dtype
+            return df.astype(casts) if casts else df
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def read_csv(self, file_path, **kwargs):
+
+        """
+        Reads a CSV file with the planned dtypes.
+
+        Args:
+            file_path: Path or file object.
+            **kwargs: Passed to ``pd.read_csv``; with ``chunksize`` every chunk is cast.
+
+        Returns:
+            pd.DataFrame: The frame, or an iterator of frames when ``chunksize`` is given.
+        """
+
+        try:
+            reader = pd.read_csv(file_path, dtype=self.read_csv_dtypes, **kwargs)
+            if kwargs.get("chunksize") is not None:
+                return (self.apply(chunk) for chunk in reader)
+            return self.apply(reader)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @staticmethod
+    def default_memory_usage(df: pd.DataFrame) -> int:
+
+        """
+        Estimates the bytes the frame would take with pandas' default dtypes: 8 bytes per
+        numeric value and a pointer plus a Python string per categorical value.
+        """
+
+        total = int(df.index.memory_usage(deep=True))
+        for column in df.columns:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                counts = values.value_counts(sort=False)
+                string_bytes = sum(sys.getsizeof(value) * int(count) for value, count in counts.items())
+                total += _POINTER_BYTES * len(values) + string_bytes
+            elif pd.api.types.is_numeric_dtype(values):
+                total += 8 * len(values)
+            else:
+                total += int(values.memory_usage(index=False, deep=True))
+        return total
+
+    def record_memory(self, name: str, df: pd.DataFrame) -> None:
+
+        """
+        Adds the frame's size, and its size with default dtypes, to the active profiler's memory report.
+
+        Args:
+            name (str): Frame name, e.g. ``train``.
+            df (pd.DataFrame): The frame as held in memory.
+        """
+
+        profiler = get_active_profiler()
+        if profiler is None:
+            return
+        memory_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+        default_memory_mb = self.default_memory_usage(df) / (1024 * 1024)
+        entry = profiler.record_frame(name, rows=len(df), memory_mb=memory_mb, default_memory_mb=default_memory_mb)
+        logging.info(f"Frame {entry['name']}: {entry['memory_mb']} MB, {entry['default_memory_mb']} MB with default dtypes")
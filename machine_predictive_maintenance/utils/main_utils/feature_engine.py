@@ -0,0 +1,198 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.constant.training_pipeline import (
+    FEATURE_ENGINE_WINDOW_SIZE,
+    FEATURE_ENGINE_MAX_MACHINES,
+)
+
+TEMPERATURE_DIFFERENCE_COLUMN = "Temperature difference [K]"
+FEATURE_SUFFIXES = ("mean", "delta", "rate")
+
+
+class _MachineWindow:
+
+    """
+    Ring buffer of the last ``window_size`` readings of one machine, with running sums so
+    the rolling mean never rescans the buffer.
+    """
+
+    __slots__ = ("buffer", "position", "count", "sums", "last")
+
+    def __init__(self, window_size: int, n_signals: int):
+        self.buffer = [[0.0] * n_signals for _ in range(window_size)]
+        self.position = 0
+        self.count = 0
+        self.sums = [0.0] * n_signals
+        self.last = None
+
+
+class RollingFeatureEngine:
+
+    """
+    Incremental per-machine rolling features, shared by training and serving so a reading
+    gets the same features offline and online.
+
+    For every signal listed under ``rolling_features.signals`` in the schema, plus the
+    process/air temperature difference, each reading gets:
+
+    * ``<signal> mean``: mean over the machine's last ``window_size`` readings,
+    * ``<signal> delta``: change since the machine's previous reading,
+    * ``<signal> rate``: average change per reading across the window.
+
+    Each update costs O(number of signals) regardless of history length: the oldest reading
+    is subtracted from the running sum as it is overwritten in the ring buffer. At most
+    ``max_machines`` machines are tracked; the least recently seen one is dropped first.
+
+    The features are only derived when ``rolling_features.enabled`` is set in the schema.
+    Serving keeps one engine for the life of the process and calls ``reset_for`` with the
+    served model version, so history from before a hot swap is not fed to the new model.
+
+    Args:
+        id_column (str): Column identifying the machine.
+        signals (list): Sensor columns to roll.
+        order_column (str, optional): Column giving reading order within a batch.
+        window_size (int, optional): Readings kept per machine.
+        max_machines (int, optional): Machines tracked before the oldest is evicted.
+    """
+
+    def __init__(self, id_column: str, signals: list, order_column: str = None,
+                 window_size: int = FEATURE_ENGINE_WINDOW_SIZE, max_machines: int = FEATURE_ENGINE_MAX_MACHINES):
+
+        try:
+            self.id_column = id_column
+            self.order_column = order_column
+            self.signals = list(signals) + [TEMPERATURE_DIFFERENCE_COLUMN]
+            self.window_size = window_size
+            self.max_machines = max_machines
+            self._machines = OrderedDict()
+            self._lock = threading.Lock()
+            self._model_version = None
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @staticmethod
+    def is_enabled(schema_config: dict) -> bool:
+        return bool(schema_config.get("rolling_features", {}).get("enabled", False))
+
+    @classmethod
+    def from_schema(cls, schema_config: dict, **kwargs) -> "RollingFeatureEngine":
+        rolling_config = schema_config["rolling_features"]
+        return cls(id_column=rolling_config["id_column"], signals=rolling_config["signals"],
+                   order_column=rolling_config.get("order_column"), **kwargs)
+
+    @property
+    def feature_names(self) -> list:
+        return [TEMPERATURE_DIFFERENCE_COLUMN] + [
+            f"{signal} {suffix}" for signal in self.signals for suffix in FEATURE_SUFFIXES
+        ]
+
+    @property
+    def tracked_machines(self) -> int:
+        return len(self._machines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._machines.clear()
+
+    def reset_for(self, model_version: str) -> None:
+
+        """
+        Clears the machine history if the served model changed since the last call.
+
+        Args:
+            model_version (str): Version of the model the next readings are scored with.
+        """
+
+        with self._lock:
+            if model_version != self._model_version:
+                self._machines.clear()
+                self._model_version = model_version
+
+    def update(self, machine_id, values: list) -> list:
+
+        """
+        Adds one reading for a machine and returns its rolling features.
+
+        Args:
+            machine_id: The machine's identifier.
+            values (list): One value per entry of ``signals``, in order.
+
+        Returns:
+            list: ``mean, delta, rate`` for each signal, in ``signals`` order.
+        """
+
+        window = self._machines.get(machine_id)
+        if window is None:
+            window = self._machines[machine_id] = _MachineWindow(self.window_size, len(values))
+            if len(self._machines) > self.max_machines:
+                self._machines.popitem(last=False)
+        else:
+            self._machines.move_to_end(machine_id)
+
+        # once the window is full the slot being overwritten holds the oldest reading
+        full = window.count == self.window_size
+        slot = window.buffer[window.position]
+        sums = window.sums
+        for index, value in enumerate(values):
+            if full:
+                sums[index] -= slot[index]
+            sums[index] += value
+        slot[:] = values
+
+        window.position = (window.position + 1) % self.window_size
+        if not full:
+            window.count += 1
+        count = window.count
+        first = window.buffer[window.position] if count == self.window_size else window.buffer[0]
+        previous = window.last
+        window.last = list(values)
+
+        features = []
+        for index, value in enumerate(values):
+            features.append(sums[index] / count)
+            features.append(value - previous[index] if previous is not None else 0.0)
+            features.append((value - first[index]) / (count - 1) if count > 1 else 0.0)
+        return features
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+
+        """
+        Adds the rolling feature columns to a batch, updating machine state reading by reading.
+
+        Readings are applied in ``order_column`` order when that column is present, and the
+        result keeps the batch's original row order.
+
+        Args:
+            data (pd.DataFrame): Readings with the id column and the signal columns.
+
+        Returns:
+            pd.DataFrame: A copy of the batch with ``feature_names`` columns added.
+        """
+
+        try:
+            df = data.copy()
+            df[TEMPERATURE_DIFFERENCE_COLUMN] = df["Process temperature [K]"] - df["Air temperature [K]"]
+
+            machine_ids = df[self.id_column].to_numpy()
+            values = df[self.signals].to_numpy(dtype=np.float64).tolist()
+            if self.order_column in df.columns:
+                order = np.argsort(df[self.order_column].to_numpy(), kind="stable")
+            else:
+                order = range(len(df))
+
+            features = np.empty((len(df), len(self.signals) * len(FEATURE_SUFFIXES)), dtype=np.float64)
+            with self._lock:
+                for row in order:
+                    features[row] = self.update(machine_ids[row], values[row])
+
+            feature_df = pd.DataFrame(features, index=df.index, columns=self.feature_names[1:])
+            return pd.concat([df, feature_df], axis=1)
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
@@ -0,0 +1,203 @@
+import os
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file
+
+VALIDATION_ERRORS_COLUMN = "validation_errors"
+
+
+@dataclass
+class SchemaValidationResult:
+    """
+    Outcome of validating one batch.
+
+    Attributes:
+        data: The batch with numeric columns coerced to numbers.
+        row_error_mask: True for every row that failed at least one check.
+        error_flags: One boolean column per failed check, named ``<column>:<check>``.
+        missing_columns: Expected columns absent from the batch; all rows are invalid if any.
+        integer_columns: Columns declared as integers, restored to int64 in ``valid_rows`` unless
+            already held in a (compact) integer dtype.
+    """
+    data: pd.DataFrame
+    row_error_mask: np.ndarray
+    error_flags: pd.DataFrame
+    missing_columns: list = field(default_factory=list)
+    integer_columns: list = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.missing_columns and not self.row_error_mask.any()
+
+    @property
+    def invalid_count(self) -> int:
+        return int(self.row_error_mask.sum())
+
+    def valid_rows(self) -> pd.DataFrame:
+        valid = self.data.loc[~self.row_error_mask]
+        # integer columns come back as float after coercion; compact integer dtypes are kept
+        to_cast = {column: "int64" for column in self.integer_columns
+                   if column in valid.columns and not pd.api.types.is_integer_dtype(valid[column])}
+        return valid.astype(to_cast) if to_cast else valid
+
+    def invalid_rows(self) -> pd.DataFrame:
+
+        """
+        Returns the failing rows with a ``validation_errors`` column listing the failed checks.
+        """
+
+        invalid = self.data.loc[self.row_error_mask].copy()
+        if self.missing_columns:
+            invalid[VALIDATION_ERRORS_COLUMN] = "missing columns: " + ", ".join(self.missing_columns)
+        else:
+            flags = self.error_flags.loc[self.row_error_mask]
+            invalid[VALIDATION_ERRORS_COLUMN] = flags.dot(pd.Index(flags.columns) + ";").str.rstrip(";")
+        return invalid
+
+
+class SchemaValidator:
+
+    """
+    Validator compiled once from ``data_schema/schema.yaml``.
+
+    Every check runs as a single vectorized pass per column over the whole batch:
+    column presence, nulls, dtype coercibility (numeric and integral), allowed categories
+    from ``ordinal_categories`` and numeric bounds from ``numeric_bounds``. Failures are
+    reported per row so bad rows can be quarantined instead of failing the batch.
+
+    Args:
+        schema_config (dict): The parsed schema file.
+    """
+
+    def __init__(self, schema_config: dict):
+
+        try:
+            self.column_dtypes = {
+                name: dtype for entry in schema_config["columns"] for name, dtype in entry.items()
+            }
+            self.allowed_categories = {
+                column: list(categories) for column, categories in
+                zip(schema_config.get("ordinal_columns", []), schema_config.get("ordinal_categories", []))
+            }
+            self.numeric_bounds = {
+                column: (bounds[0], bounds[1]) for column, bounds in schema_config.get("numeric_bounds", {}).items()
+            }
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @classmethod
+    def from_yaml(cls, file_path: str) -> "SchemaValidator":
+        return cls(read_yaml_file(file_path))
+
+    @staticmethod
+    def _is_numeric(dtype: str) -> bool:
+        return dtype.startswith("int") or dtype.startswith("float")
+
+    def validate(self, dataframe: pd.DataFrame, optional_columns: tuple = ()) -> SchemaValidationResult:
+
+        """
+        Validates a batch against the schema.
+
+        Args:
+            dataframe (pd.DataFrame): The batch to validate.
+            optional_columns (tuple, optional): Schema columns that may be absent, e.g. the
+                target columns of a prediction request.
+
+        Returns:
+            SchemaValidationResult: The coerced batch and per-row error mask.
+        """
+
+        try:
+            expected_columns = [column for column in self.column_dtypes if column not in optional_columns]
+            missing_columns = [column for column in expected_columns if column not in dataframe.columns]
+
+            data = dataframe.copy()
+            checks = {}
+
+            for column in expected_columns:
+                if column in missing_columns:
+                    continue
+
+                dtype = self.column_dtypes[column]
+                values = data[column]
+                is_null = values.isna().to_numpy()
+                checks[f"{column}:missing_value"] = is_null
+
+                if self._is_numeric(dtype):
+                    coerced = pd.to_numeric(values, errors="coerce")
+                    coerced_values = coerced.to_numpy(dtype=np.float64)
+                    is_nan = np.isnan(coerced_values)
+                    checks[f"{column}:not_numeric"] = is_nan & ~is_null
+
+                    if dtype.startswith("int"):
+                        checks[f"{column}:not_integer"] = ~is_nan & (np.mod(coerced_values, 1) != 0)
+
+                    if column in self.numeric_bounds:
+                        lower, upper = self.numeric_bounds[column]
+                        with np.errstate(invalid="ignore"):
+                            checks[f"{column}:out_of_range"] = (coerced_values < lower) | (coerced_values > upper)
+
+                    data[column] = coerced
+
+                elif column in self.allowed_categories:
+                    checks[f"{column}:unknown_category"] = (
+                        ~values.isin(self.allowed_categories[column]).to_numpy() & ~is_null
+                    )
+
+            failed_checks = {name: mask for name, mask in checks.items() if mask.any()}
+            error_flags = pd.DataFrame(failed_checks, index=data.index, dtype=bool)
+
+            if missing_columns:
+                row_error_mask = np.ones(len(data), dtype=bool)
+            elif failed_checks:
+                row_error_mask = error_flags.to_numpy().any(axis=1)
+            else:
+                row_error_mask = np.zeros(len(data), dtype=bool)
+
+            if missing_columns or failed_checks:
+                logging.info(
+                    f"Schema validation: {int(row_error_mask.sum())} of {len(data)} rows invalid, "
+                    f"missing columns {missing_columns}, failed checks {sorted(failed_checks)}"
+                )
+
+            return SchemaValidationResult(
+                data=data,
+                row_error_mask=row_error_mask,
+                error_flags=error_flags,
+                missing_columns=missing_columns,
+                integer_columns=[column for column in expected_columns
+                                 if column not in missing_columns and self.column_dtypes[column].startswith("int")],
+            )
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @staticmethod
+    def quarantine(result: SchemaValidationResult, file_path: str) -> str:
+
+        """
+        Writes the invalid rows of a batch, with their failed checks, to a CSV file.
+
+        Args:
+            result (SchemaValidationResult): The validation outcome.
+            file_path (str): Destination file.
+
+        Returns:
+            str: The file path, or None if the batch had no invalid rows.
+        """
+
+        try:
+            if not result.row_error_mask.any():
+                return None
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            result.invalid_rows().to_csv(file_path, index=False, header=True)
+            logging.info(f"Quarantined {result.invalid_count} invalid rows to {file_path}")
+            return file_path
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
@@ -1,14 +1,13 @@
 import yaml
 from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
 from machine_predictive_maintenance.logging.logger import logging
+from machine_predictive_maintenance.profiling.profiler import profile_stage
 import os, sys
 import numpy as np
 import pandas as pd
 # import dill
 import pickle
-
-from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
+from typing import TYPE_CHECKING
 
 def read_yaml_file(file_path:str) -> dict:
     try:
@@ -31,15 +30,19 @@ def write_yaml_file(file_path: str, content: object, replace: bool = False) -> N
         raise MachinePredictiveMaintenanceException(e, sys)
 
 
-def save_numpy_array_data(file_path: str, array: np.array):
+def save_numpy_array_data(file_path: str, array: np.array, dtype: str = None):
     """
     Save numpy array data to file
     file_path: str location of file to save
     array: np.array data to save
+    dtype: str optional dtype the array is stored as, e.g. "float32"
     """
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path, exist_ok=True)
+
+        if dtype is not None:
+            array = array.astype(dtype, copy=False)
         
         with open(file_path, 'wb') as file_obj:
             np.save(file_path, array)
@@ -95,7 +98,7 @@ def drop_columns(df: pd.DataFrame, cols: list)-> pd.DataFrame:
     logging.info("Entered drop_columns methon of utils")
 
     try:
-        df = df.drop(columns=cols, axis=1)
+        df = df.drop(columns=cols)
 
         logging.info("Exited the drop_columns method of utils")
         
@@ -104,30 +107,76 @@ def drop_columns(df: pd.DataFrame, cols: list)-> pd.DataFrame:
         raise MachinePredictiveMaintenanceException(e, sys)
     
 
-def evaluate_models(X_train, y_train, X_test, y_test, models, param):
-
-    try:
-        report = {}
-
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
-            para = param[list(models.keys())[i]]
-
-            gs = GridSearchCV(model, para, cv=5)
-            gs.fit(X_train, y_train)
-
-            model.set_params(**gs.best_params_)
-            model.fit(X_train,y_train)
+def evaluate_models(X_train, y_train, X_test, y_test, models, param, tracker=None, fold_cache=None, n_jobs=None,
+                    trial_store=None):
 
-            y_train_pred = model.predict(X_train)
+    """
+    Tunes every candidate with a cross-validated grid search on F1, refits it on the full
+    train set and scores all candidates on the test set in one batch.
 
-            y_test_pred = model.predict(X_test)
+    All candidates search over the same cached folds of one memory-mapped training matrix.
+    With a trial store, finished trials are persisted and skipped when the search is resumed.
 
-            train_model_score = r2_score(y_train, y_train_pred)
+    Args:
+        X_train, y_train: Training features and labels.
+        X_test, y_test: Testing features and labels.
+        models (dict): Candidate estimators by name; they are refitted in place.
+        param (dict): Parameter grid by candidate name.
+        tracker (MlflowTracker, optional): Receives every grid search trial and the test scores.
+        fold_cache (FoldCache, optional): Shared folds over ``X_train``; built and removed here if omitted.
+        n_jobs (int, optional): Grid search worker processes.
+        trial_store (TrialStore, optional): Persisted per-trial results of an earlier attempt.
 
-            test_model_score = r2_score(y_test, y_test_pred)
+    Returns:
+        dict: Test F1 score by candidate name.
+    """
 
-            report[list(models.keys())[i]] = test_model_score
+    try:
+        # training-only imports, kept out of the serving import path
+        from machine_predictive_maintenance.utils.ml_utils.metric.classification_metric import (
+            f1_scorer,
+            get_classification_scores,
+        )
+        from machine_predictive_maintenance.utils.ml_utils.model.fold_cache import FoldCache
+        from machine_predictive_maintenance.utils.ml_utils.model.grid_search import grid_search
+
+        owns_fold_cache = fold_cache is None
+        if owns_fold_cache:
+            fold_cache = FoldCache(X_train, y_train)
+
+        try:
+            test_predictions = {}
+
+            for name, model in models.items():
+                para = param[name]
+
+                # the best parameters are refitted once below, not inside the search as well
+                with profile_stage(f"grid_search/{name}", rows=len(X_train)):
+                    trials, best_params = grid_search(name, model, para, fold_cache, scoring=f1_scorer, n_jobs=n_jobs,
+                                                      trial_store=trial_store)
+
+                with profile_stage(f"refit/{name}", rows=len(X_train)):
+                    model.set_params(**best_params)
+                    model.fit(fold_cache.X, fold_cache.y)
+
+                test_predictions[name] = model.predict(X_test)
+
+                if tracker is not None:
+                    # one step per trial, so the grid shows up as a curve per candidate
+                    for trial, (trial_params, score) in enumerate(trials):
+                        tracker.log_params({f"grid/{name}/trial_{trial}": trial_params})
+                        tracker.log_metrics({f"grid/{name}/cv_f1": score}, step=trial)
+                    tracker.log_params({f"{name}/{key}": value for key, value in best_params.items()})
+
+            test_metrics = get_classification_scores(y_test, test_predictions)
+            report = {name: metric.f1_score for name, metric in test_metrics.items()}
+
+            if tracker is not None:
+                tracker.log_metrics({f"{name}/test_f1": score for name, score in report.items()})
+        finally:
+            # also on a failing candidate, so the memory-mapped matrix is not left in the cache dir
+            if owns_fold_cache:
+                fold_cache.close()
 
         return report
     
@@ -135,15 +184,17 @@ def evaluate_models(X_train, y_train, X_test, y_test, models, param):
         raise MachinePredictiveMaintenanceException(e, sys)
     
 import pandas as pd
-from sklearn.compose import ColumnTransformer
-from sklearn.base import BaseEstimator
+if TYPE_CHECKING:
+    from sklearn.base import BaseEstimator
 from machine_predictive_maintenance.utils.main_utils.utils import read_yaml_file, drop_columns
 from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
 from machine_predictive_maintenance.logging.logger import logging
+from machine_predictive_maintenance.utils.main_utils.feature_engine import RollingFeatureEngine
 import numpy as np
 
 
-def processing_test_data(data: pd.DataFrame, schema_file: str, preprocessor: BaseEstimator) -> pd.DataFrame:
+def processing_test_data(data: pd.DataFrame, schema_file: str, preprocessor: "BaseEstimator",
+                         feature_engine: RollingFeatureEngine = None) -> pd.DataFrame:
     """
     Transforms the raw test data using the schema file and preprocessor.
 
@@ -151,6 +202,10 @@ def processing_test_data(data: pd.DataFrame, schema_file: str, preprocessor: Bas
         data (pd.DataFrame): The raw input data.
         schema_file (str): Path to the schema file (YAML).
         preprocessor (BaseEstimator): Pretrained preprocessing object (e.g., OrdinalEncoder, MinMaxScaler).
+        feature_engine (RollingFeatureEngine, optional): Engine holding per-machine history across
+            calls: the chunks of one input file, or a serving process's requests and events. If
+            omitted, rolling features only see the readings in ``data``. Unused unless the
+            schema enables rolling features.
 
     Returns:
         pd.DataFrame: Transformed test data ready for prediction.
@@ -166,12 +221,22 @@ def processing_test_data(data: pd.DataFrame, schema_file: str, preprocessor: Bas
         if 'Process temperature [K]' in df.columns:
             df['Process temperature [c]'] = df['Process temperature [K]'] - 273.15
 
+        # Per-machine rolling features
+        if RollingFeatureEngine.is_enabled(schema):
+            if feature_engine is None:
+                feature_engine = RollingFeatureEngine.from_schema(schema)
+            df = feature_engine.transform(df)
+
         # Drop unnecessary columns
         drop_cols = schema.get('drop_columns', [])
         df = drop_columns(df=df, cols=drop_cols)
 
-        # Extract features for transformation
-        input_features = df[schema['scaling_features'] + schema['ordinal_columns']]
+        # Extract features for transformation; models trained before a feature was added
+        # keep receiving only the columns they were fitted on
+        feature_columns = getattr(preprocessor, 'feature_names_in_', None)
+        if feature_columns is None:
+            feature_columns = schema['scaling_features'] + schema['ordinal_columns']
+        input_features = df[list(feature_columns)]
 
         # Apply preprocessing
         transformed_features = preprocessor.transform(input_features)
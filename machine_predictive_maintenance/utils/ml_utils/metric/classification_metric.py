@@ -1,33 +1,210 @@
 from machine_predictive_maintenance.entity.artifact_entity import ClassificationMetricArtifact
 from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
-from sklearn.metrics import f1_score, precision_score, recall_score
+import numpy as np
 import sys
 
-def get_classification_score(y_true, y_pred) -> ClassificationMetricArtifact:
+# column order of the confusion counts returned by confusion_counts
+CONFUSION_COUNT_NAMES = ("true_negatives", "false_positives", "false_negatives", "true_positives")
+
+
+def confusion_counts(y_true, y_pred) -> np.ndarray:
+
+    """
+    Compute binary confusion counts for one or many prediction vectors with a single ``np.bincount``.
+
+    Every (actual, predicted, vector) combination is encoded as one integer, so the counts of all
+    candidates (or folds) come out of one pass over the data instead of one confusion matrix per
+    metric and per candidate.
+
+    Args:
+        y_true (array-like): Ground truth 0/1 labels, shape ``(n,)`` or the same shape as ``y_pred``.
+        y_pred (array-like): Predicted 0/1 labels, shape ``(n,)`` or ``(n_vectors, n)``.
+
+    Returns:
+        np.ndarray: Counts of shape ``(n_vectors, 4)`` in ``CONFUSION_COUNT_NAMES`` order.
+    """
+
+    try:
+        y_pred = np.atleast_2d(np.asarray(y_pred)).astype(np.int64, copy=False)
+        y_true = np.broadcast_to(np.asarray(y_true).astype(np.int64, copy=False), y_pred.shape)
+
+        if y_pred.size and (min(y_true.min(), y_pred.min()) < 0 or max(y_true.max(), y_pred.max()) > 1):
+            raise ValueError("confusion_counts expects binary 0/1 labels")
+
+        n_vectors = y_pred.shape[0]
+        codes = 4 * np.arange(n_vectors)[:, None] + 2 * y_true + y_pred
+        return np.bincount(codes.ravel(), minlength=4 * n_vectors).reshape(n_vectors, 4)
+    except Exception as e:
+        raise MachinePredictiveMaintenanceException(e,sys)
+
+
+def metrics_from_counts(counts) -> dict:
+
+    """
+    Derive F1 score, precision, recall and balanced accuracy from confusion counts, vectorized
+    over any leading dimensions. Undefined ratios are 0, as in sklearn.
+
+    Args:
+        counts (array-like): Confusion counts with a last dimension in ``CONFUSION_COUNT_NAMES`` order.
+
+    Returns:
+        dict: Arrays keyed by ``f1_score``, ``precision_score``, ``recall_score`` and ``balanced_accuracy_score``.
+    """
+
+    counts = np.asarray(counts, dtype=np.float64)
+    tn, fp, fn, tp = np.moveaxis(counts, -1, 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+        specificity = np.where(tn + fp > 0, tn / (tn + fp), 0.0)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+        # averaged over the classes present, like sklearn's balanced_accuracy_score
+        present_classes = (tp + fn > 0).astype(np.float64) + (tn + fp > 0)
+        balanced_accuracy = np.where(present_classes > 0, (recall + specificity) / np.maximum(present_classes, 1), 0.0)
+
+    return {
+        "f1_score": f1,
+        "precision_score": precision,
+        "recall_score": recall,
+        "balanced_accuracy_score": balanced_accuracy,
+    }
+
+
+def ranking_scores(y_true, y_score) -> tuple:
+
+    """
+    Compute PR-AUC (average precision) and ROC-AUC from one sort of the scores.
+
+    Tied scores are treated as a single threshold, matching ``average_precision_score`` and
+    ``roc_auc_score``.
+
+    Args:
+        y_true (array-like): Ground truth 0/1 labels.
+        y_score (array-like): Positive-class probabilities or decision values.
+
+    Returns:
+        tuple: ``(pr_auc, roc_auc)``; each is None when only one class is present.
+    """
+
+    try:
+        y_true = np.asarray(y_true).astype(np.int64, copy=False)
+        y_score = np.asarray(y_score, dtype=np.float64)
+
+        order = np.argsort(y_score, kind="mergesort")[::-1]
+        sorted_score = y_score[order]
+        # index of the last row of every group of tied scores
+        threshold_index = np.r_[np.flatnonzero(np.diff(sorted_score)), len(sorted_score) - 1]
+        tps = np.cumsum(y_true[order])[threshold_index]
+        fps = threshold_index + 1 - tps
+
+        n_positive, n_negative = (tps[-1], fps[-1]) if len(tps) else (0, 0)
+        if n_positive == 0 or n_negative == 0:
+            return None, None
+
+        recall = np.r_[0.0, tps / n_positive]
+        precision = tps / (threshold_index + 1)
+        pr_auc = float(np.sum(np.diff(recall) * precision))
+
+        fpr = np.r_[0.0, fps / n_negative]
+        roc_auc = float(np.sum(np.diff(fpr) * (recall[1:] + recall[:-1]) / 2))
+        return pr_auc, roc_auc
+    except Exception as e:
+        raise MachinePredictiveMaintenanceException(e,sys)
+
+
+def get_classification_scores(y_true, y_preds: dict, y_scores: dict = None) -> dict:
+
+    """
+    Calculate classification metrics for several candidates at once.
+
+    The confusion counts of all candidates are computed in one batch; PR-AUC and ROC-AUC are
+    added for the candidates that have scores.
+
+    Args:
+        y_true (array-like): Ground truth (true labels).
+        y_preds (dict): Predicted labels by candidate name.
+        y_scores (dict, optional): Positive-class scores by candidate name.
+
+    Returns:
+        dict: ClassificationMetricArtifact by candidate name.
+    """
+
+    try:
+        names = list(y_preds)
+        metrics = metrics_from_counts(confusion_counts(y_true, np.stack([y_preds[name] for name in names])))
+        y_scores = y_scores or {}
+
+        scores = {}
+        for i, name in enumerate(names):
+            pr_auc, roc_auc = (None, None)
+            if y_scores.get(name) is not None:
+                pr_auc, roc_auc = ranking_scores(y_true, y_scores[name])
+
+            scores[name] = ClassificationMetricArtifact(
+                f1_score=float(metrics["f1_score"][i]),
+                precision_score=float(metrics["precision_score"][i]),
+                recall_score=float(metrics["recall_score"][i]),
+                balanced_accuracy_score=float(metrics["balanced_accuracy_score"][i]),
+                pr_auc_score=pr_auc,
+                roc_auc_score=roc_auc,
+            )
+        return scores
+    except Exception as e:
+        raise MachinePredictiveMaintenanceException(e,sys)
+
+
+def get_classification_score(y_true, y_pred, y_score=None) -> ClassificationMetricArtifact:
 
     """
-    Calculate classification metrics including F1 score, precision, and recall.
+    Calculate classification metrics including F1 score, precision, recall and balanced accuracy,
+    plus PR-AUC and ROC-AUC when scores are given.
 
     Args:
         y_true (array-like): Ground truth (true labels).
         y_pred (array-like): Predicted labels.
+        y_score (array-like, optional): Positive-class probabilities or decision values.
 
     Returns:
-        ClassificationMetricArtifact: An object containing F1 score, precision, and recall.
+        ClassificationMetricArtifact: An object containing the computed metrics.
+
+    """
+
+    try:
+        return get_classification_scores(y_true, {"model": y_pred}, {"model": y_score})["model"]
+    except Exception as e:
+        raise MachinePredictiveMaintenanceException(e,sys)
+
+
+def get_classification_score_from_counts(counts) -> ClassificationMetricArtifact:
+
+    """
+    Calculate classification metrics from confusion counts, for predictions that were
+    scored in chunks and never held in memory together.
+
+    Args:
+        counts (array-like): The four counts in ``CONFUSION_COUNT_NAMES`` order.
 
+    Returns:
+        ClassificationMetricArtifact: An object containing F1 score, precision, recall and balanced accuracy.
     """
 
     try:
-        model_f1_score = f1_score(y_true, y_pred)
-        model_recall_score = recall_score(y_true, y_pred)
-        model_precision_score=precision_score(y_true,y_pred)
-
-        classification_metric =  ClassificationMetricArtifact(
-            f1_score=model_f1_score,
-            precision_score=model_precision_score, 
-            recall_score=model_recall_score
+        metrics = metrics_from_counts(counts)
+        return ClassificationMetricArtifact(
+            f1_score=float(metrics["f1_score"]),
+            precision_score=float(metrics["precision_score"]),
+            recall_score=float(metrics["recall_score"]),
+            balanced_accuracy_score=float(metrics["balanced_accuracy_score"]),
         )
-        
-        return classification_metric
     except Exception as e:
-        raise MachinePredictiveMaintenanceException(e,sys)
\ No newline at end of file
+        raise MachinePredictiveMaintenanceException(e,sys)
+
+
+def f1_scorer(estimator, X, y) -> float:
+
+    """
+    Scorer for the grid search that ranks parameter sets by F1 with the same engine as the final evaluation.
+    """
+
+    return float(metrics_from_counts(confusion_counts(y, estimator.predict(X))[0])["f1_score"])
@@ -0,0 +1,81 @@
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.constant.training_pipeline import MODEL_TRAINER_CV_FOLDS
+
+
+class FoldCache:
+
+    """
+    Cross-validation folds computed once and shared by every candidate model and parameter set.
+
+    The training matrix is written to a ``.npy`` file and reopened as a read-only memory map.
+    The folds are stored as index arrays into it. Passing ``X``, ``y`` and ``splits`` to every
+    grid search means the folds are split once per training run instead of once per
+    candidate. joblib sends a memory map to worker processes by file name, so workers read the
+    same pages instead of each unpickling its own copy of the data.
+
+    The folds are the same ones ``cv=n_splits`` gives a classifier: an unshuffled ``StratifiedKFold``.
+
+    Args:
+        X (np.ndarray): Training features.
+        y (np.ndarray): Training labels.
+        n_splits (int): Number of folds.
+        cache_dir (str, optional): Where the memory-mapped matrix is written; a temporary
+            directory is used if omitted.
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, n_splits: int = MODEL_TRAINER_CV_FOLDS, cache_dir: str = None):
+
+        try:
+            from sklearn.model_selection import StratifiedKFold
+
+            self._owns_dir = cache_dir is None
+            self.cache_dir = tempfile.mkdtemp(prefix="fold_cache_") if self._owns_dir else cache_dir
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            self.file_path = os.path.join(self.cache_dir, "X_train.npy")
+            np.save(self.file_path, np.ascontiguousarray(X))
+            self.X = np.load(self.file_path, mmap_mode="r")
+            self.y = np.asarray(y)
+
+            self.splits = [
+                (train_index, test_index)
+                for train_index, test_index in StratifiedKFold(n_splits=n_splits).split(self.X, self.y)
+            ]
+
+            # identifies the data and folds, so persisted grid search trials are only reused for the same search
+            digest = hashlib.sha256()
+            digest.update(f"{self.X.shape}{self.X.dtype}{n_splits}".encode())
+            digest.update(np.ascontiguousarray(X))
+            digest.update(np.ascontiguousarray(self.y))
+            self.fingerprint = digest.hexdigest()
+            logging.info(f"Cached {n_splits} folds over {self.X.shape} training matrix at {self.file_path}")
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def close(self) -> None:
+
+        """
+        Drops the memory map and deletes its file.
+        """
+
+        self.X = None
+        if self._owns_dir:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+        elif os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def __enter__(self) -> "FoldCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+
+import numpy as np
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+from machine_predictive_maintenance.profiling.profiler import add_worker_usage, process_usage
+
+
+class TrialStore:
+
+    """
+    Grid search results persisted one trial per line, so an interrupted search resumes
+    where it stopped instead of starting over.
+
+    Every line of the JSON-lines file holds one finished (candidate, parameter set) trial
+    with its per-fold scores. The first line records the fingerprint of the training data
+    and folds; if it does not match the current fold cache, the stored trials were scored on
+    other data and the file is started afresh.
+
+    Args:
+        file_path (str): The trials file, usually ``model_trainer/grid_search_trials.jsonl``.
+        fingerprint (str): Identity of the training matrix and folds, see ``FoldCache.fingerprint``.
+    """
+
+    def __init__(self, file_path: str, fingerprint: str):
+
+        try:
+            self.file_path = file_path
+            self.fingerprint = fingerprint
+            self.trials = {}
+
+            if os.path.exists(file_path):
+                with open(file_path) as file:
+                    lines = [json.loads(line) for line in file if line.strip()]
+                if lines and lines[0].get("fingerprint") == fingerprint:
+                    for trial in lines[1:]:
+                        self.trials[(trial["model"], trial["key"])] = trial
+                    logging.info(f"Loaded {len(self.trials)} finished grid search trials from {file_path}")
+                else:
+                    logging.info(f"Grid search trials in {file_path} belong to other training data, starting afresh")
+                    lines = []
+            else:
+                lines = []
+
+            if not lines:
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, "w") as file:
+                    file.write(json.dumps({"fingerprint": fingerprint}) + "\n")
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @staticmethod
+    def trial_key(params: dict) -> str:
+        return json.dumps(params, sort_keys=True, default=str)
+
+    def get(self, model_name: str, params: dict) -> dict:
+        return self.trials.get((model_name, self.trial_key(params)))
+
+    def add(self, model_name: str, params: dict, fold_scores: list) -> dict:
+
+        """
+        Appends a finished trial and flushes it to disk before returning.
+
+        Args:
+            model_name (str): Candidate name.
+            params (dict): The trial's parameter set.
+            fold_scores (list): Validation score of every fold.
+
+        Returns:
+            dict: The stored trial.
+        """
+
+        try:
+            trial = {
+                "model": model_name,
+                "key": self.trial_key(params),
+                "fold_scores": [float(score) for score in fold_scores],
+                "mean_test_score": float(np.mean(fold_scores)),
+            }
+            with open(self.file_path, "a") as file:
+                file.write(json.dumps(trial) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self.trials[(model_name, trial["key"])] = trial
+            return trial
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+
+def _fit_and_score(estimator, params: dict, X, y, train_index, test_index, scoring, parent_pid: int) -> tuple:
+
+    """
+    Fits and scores one (parameter set, fold) task.
+
+    Returns:
+        tuple: The score, and the CPU seconds and peak RSS in MB of the worker process that ran
+            the task, including its OpenMP threads. Both are None when the task ran in the
+            calling process, whose own stage already measures it.
+    """
+
+    cpu_start, _ = process_usage()
+    estimator.set_params(**params)
+    estimator.fit(X[train_index], y[train_index])
+    score = scoring(estimator, X[test_index], y[test_index])
+    if os.getpid() == parent_pid:
+        return score, None, None
+    cpu_end, peak_rss_mb = process_usage()
+    # loky reuses its workers, so only the time since the task started belongs to it
+    cpu_time_s = cpu_end - cpu_start if cpu_start is not None else None
+    return score, cpu_time_s, peak_rss_mb
+
+
+def grid_search(name: str, estimator, param_grid: dict, fold_cache, scoring, n_jobs: int = None,
+                trial_store: TrialStore = None) -> tuple:
+
+    """
+    Cross-validated grid search that records every trial as soon as all its folds are scored.
+
+    Like ``GridSearchCV(refit=False)``, every (parameter set, fold) pair is one joblib task
+    over the shared memory-mapped matrix and ties go to the first parameter set in grid order.
+    Unlike it, trials already in ``trial_store`` are skipped and finished trials are written
+    while the remaining ones still run.
+
+    Args:
+        name (str): Candidate name, the key of its trials in the store.
+        estimator: Unfitted candidate; cloned for every task.
+        param_grid (dict): Parameter grid, as for ``GridSearchCV``.
+        fold_cache (FoldCache): Training matrix and folds.
+        scoring (callable): ``scoring(estimator, X, y) -> float``, higher is better.
+        n_jobs (int, optional): Worker processes.
+        trial_store (TrialStore, optional): Where finished trials are read from and written to.
+
+    Returns:
+        tuple: The trials as ``(params, mean_test_score)`` pairs in grid order, and the best params.
+    """
+
+    try:
+        from joblib import Parallel, delayed
+        from sklearn.base import clone
+        from sklearn.model_selection import ParameterGrid
+
+        candidates = list(ParameterGrid(param_grid))
+        scores = {}
+        pending = []
+        for index, params in enumerate(candidates):
+            stored = trial_store.get(name, params) if trial_store is not None else None
+            if stored is not None:
+                scores[index] = stored["mean_test_score"]
+            else:
+                pending.append(index)
+
+        if scores:
+            logging.info(f"{name}: {len(scores)} of {len(candidates)} trials restored, {len(pending)} to run")
+
+        n_splits = len(fold_cache.splits)
+        tasks = [(index, fold) for index in pending for fold in range(n_splits)]
+        fold_scores = {index: [] for index in pending}
+
+        # results arrive in submission order, so each trial is complete after its last fold
+        results = Parallel(n_jobs=n_jobs, return_as="generator")(
+            delayed(_fit_and_score)(clone(estimator), candidates[index], fold_cache.X, fold_cache.y,
+                                    *fold_cache.splits[fold], scoring, os.getpid())
+            for index, fold in tasks
+        )
+        for (index, fold), (score, cpu_time_s, peak_rss_mb) in zip(tasks, results):
+            # the workers' CPU time and memory count towards the profiler stage running the search
+            add_worker_usage(cpu_time_s, peak_rss_mb)
+            fold_scores[index].append(score)
+            if len(fold_scores[index]) == n_splits:
+                scores[index] = float(np.mean(fold_scores[index]))
+                if trial_store is not None:
+                    trial_store.add(name, candidates[index], fold_scores[index])
+
+        trials = [(params, scores[index]) for index, params in enumerate(candidates)]
+        best_index = int(np.argmax([score for _, score in trials]))
+        return trials, candidates[best_index]
+
+    except Exception as e:
+        raise MachinePredictiveMaintenanceException(e, sys)
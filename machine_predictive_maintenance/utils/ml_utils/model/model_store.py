@@ -0,0 +1,121 @@
+import sys
+import time
+import threading
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.cloud.model_puller import S3ModelPuller
+from machine_predictive_maintenance.entity.artifact_entity import ModelPullerArtifact
+from machine_predictive_maintenance.entity.config_entity import ModelPullerConfig
+from machine_predictive_maintenance.monitoring.metrics import MODEL_LOAD_TIME, MODEL_LOADS
+from machine_predictive_maintenance.utils.main_utils.utils import load_object
+from machine_predictive_maintenance.utils.ml_utils.model.estimator import MachinePredictiveModel
+
+
+class LoadedModel:
+
+    """
+    An immutable snapshot of the serving model, swapped as a whole so a request never
+    sees the preprocessor of one version paired with the model of another.
+
+    Args:
+        artifact (ModelPullerArtifact): Where the model files were loaded from.
+        preprocessor: The fitted preprocessing object.
+        model (MachinePredictiveModel): The wrapped estimator.
+    """
+
+    def __init__(self, artifact: ModelPullerArtifact, preprocessor, model: MachinePredictiveModel):
+        self.artifact = artifact
+        self.preprocessor = preprocessor
+        self.model = model
+
+    @property
+    def version(self) -> str:
+        return self.artifact.model_version
+
+
+class ModelStore:
+
+    """
+    Holds the model currently served by the app and refreshes it from S3.
+
+    Args:
+        model_puller_config (ModelPullerConfig): Configuration for locating and caching model versions.
+    """
+
+    def __init__(self, model_puller_config: ModelPullerConfig = None):
+
+        try:
+            self.model_puller_config = model_puller_config or ModelPullerConfig()
+            self.model_puller = S3ModelPuller(self.model_puller_config)
+            self.current: LoadedModel = None
+            self._refresh_lock = threading.Lock()
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @staticmethod
+    def load(artifact: ModelPullerArtifact) -> LoadedModel:
+
+        """
+        Loads the preprocessor and model described by an artifact.
+
+        Args:
+            artifact (ModelPullerArtifact): Paths of the model files.
+
+        Returns:
+            LoadedModel: The loaded snapshot.
+        """
+
+        try:
+            preprocessor = load_object(artifact.preprocessor_file_path)
+            model = MachinePredictiveModel(model=load_object(artifact.model_file_path))
+            return LoadedModel(artifact=artifact, preprocessor=preprocessor, model=model)
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    def refresh(self) -> bool:
+
+        """
+        Pulls the latest model version and swaps it in if its content changed.
+
+        Falls back to the local ``final_model/`` on the first load if S3 cannot be reached,
+        and keeps serving the current model on later failures.
+
+        Returns:
+            bool: True if a new model was loaded.
+        """
+
+        with self._refresh_lock:
+            start = time.perf_counter()
+            try:
+                artifact = self.model_puller.pull_latest_model()
+            except Exception as e:
+                logging.info(f"Could not pull model from S3: {e}")
+                if self.current is not None:
+                    return False
+                artifact = self.model_puller.get_local_model()
+
+            if self.current is not None and self.current.artifact.content_hash == artifact.content_hash:
+                return False
+
+            loaded_model = self.load(artifact)
+            self.current = loaded_model
+
+            MODEL_LOAD_TIME.set(loaded_model.version, value=time.perf_counter() - start)
+            MODEL_LOADS.inc(loaded_model.version)
+            logging.info(f"Serving model version {loaded_model.version} ({artifact.content_hash})")
+            return True
+
+    def get(self) -> LoadedModel:
+
+        """
+        Returns the current model snapshot, loading it on first use.
+
+        Returns:
+            LoadedModel: The model being served.
+        """
+
+        if self.current is None:
+            self.refresh()
+        return self.current
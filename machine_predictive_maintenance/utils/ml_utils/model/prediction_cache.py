@@ -0,0 +1,123 @@
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.logging.logger import logging
+
+from machine_predictive_maintenance.entity.config_entity import PredictionCacheConfig
+from machine_predictive_maintenance.monitoring.metrics import PREDICTION_CACHE_LOOKUPS, PREDICTION_CACHE_ENTRIES
+from machine_predictive_maintenance.utils.ml_utils.model.model_store import LoadedModel
+
+
+class PredictionCache:
+
+    """
+    LRU cache with a TTL in front of the model, for gateways that resend identical readings.
+
+    Rows are keyed on the model's input vector, i.e. the output of ``processing_test_data``.
+    Each vector is rounded to ``decimals`` places and the raw bytes are used as the key. Keying
+    after preprocessing means a reading is only served from cache when every feature the model
+    would see, including the per-machine rolling features, matches a previous row.
+
+    Entries belong to one model content hash. The cache empties itself the first time it sees a
+    different hash, so a hot-swapped model never serves its predecessor's results.
+
+    Args:
+        prediction_cache_config (PredictionCacheConfig): Size, TTL, rounding and on/off switch.
+    """
+
+    def __init__(self, prediction_cache_config: PredictionCacheConfig = None):
+
+        try:
+            self.prediction_cache_config = prediction_cache_config or PredictionCacheConfig()
+            self._entries = OrderedDict()
+            self._content_hash = None
+            self._lock = threading.Lock()
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
+
+    @property
+    def enabled(self) -> bool:
+        return self.prediction_cache_config.enabled
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        PREDICTION_CACHE_ENTRIES.set(value=0)
+
+    def _row_keys(self, features) -> list:
+        rounded = np.round(np.asarray(features, dtype=np.float64), self.prediction_cache_config.decimals)
+        # -0.0 and 0.0 round to different bytes
+        rounded += 0.0
+        rounded = np.ascontiguousarray(rounded)
+        return [row.tobytes() for row in rounded]
+
+    def predict(self, loaded_model: LoadedModel, features):
+
+        """
+        Predicts a batch, running the model only on rows not already cached.
+
+        Args:
+            loaded_model (LoadedModel): The model snapshot serving this batch.
+            features (pd.DataFrame): Model inputs as returned by ``processing_test_data``.
+
+        Returns:
+            np.ndarray: One prediction per row.
+        """
+
+        try:
+            if not self.enabled:
+                return loaded_model.model.predict(features)
+
+            content_hash = loaded_model.artifact.content_hash
+            keys = self._row_keys(features)
+            now = time.monotonic()
+            results = [None] * len(keys)
+            misses = []
+
+            with self._lock:
+                if content_hash != self._content_hash:
+                    if self._entries:
+                        logging.info(f"Model changed to {loaded_model.version}, dropping {len(self._entries)} cached predictions")
+                    self._entries.clear()
+                    self._content_hash = content_hash
+
+                for position, key in enumerate(keys):
+                    entry = self._entries.get(key)
+                    if entry is not None and entry[1] > now:
+                        self._entries.move_to_end(key)
+                        results[position] = entry[0]
+                    else:
+                        misses.append(position)
+
+            if misses:
+                miss_features = features.iloc[misses] if hasattr(features, "iloc") else features[misses]
+                miss_predictions = np.asarray(loaded_model.model.predict(miss_features))
+                expires_at = now + self.prediction_cache_config.ttl_seconds
+
+                with self._lock:
+                    # the model may have been swapped while predicting; don't store stale results
+                    store = content_hash == self._content_hash
+                    for position, prediction in zip(misses, miss_predictions):
+                        results[position] = prediction
+                        if store:
+                            self._entries[keys[position]] = (prediction, expires_at)
+                            self._entries.move_to_end(keys[position])
+                    while len(self._entries) > self.prediction_cache_config.max_entries:
+                        self._entries.popitem(last=False)
+
+            PREDICTION_CACHE_LOOKUPS.inc("hit", loaded_model.version, amount=len(keys) - len(misses))
+            PREDICTION_CACHE_LOOKUPS.inc("miss", loaded_model.version, amount=len(misses))
+            PREDICTION_CACHE_ENTRIES.set(value=len(self._entries))
+
+            return np.asarray(results)
+
+        except Exception as e:
+            raise MachinePredictiveMaintenanceException(e, sys)
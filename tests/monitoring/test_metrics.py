@@ -0,0 +1,68 @@
+import os
+
+from machine_predictive_maintenance.monitoring.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def make_registry(directory) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.register(Counter("requests_total", "Requests.", ("route",)))
+    registry.register(Gauge("cache_entries", "Cache entries.", ()))
+    registry.register(Gauge("load_seconds", "Load time.", ("model_version",), multiprocess_mode="max"))
+    registry.register(Histogram("latency_seconds", "Latency.", (), buckets=(0.1, 1.0)))
+    registry.enable_multiprocess(str(directory))
+    return registry
+
+
+def write_worker(registry: MetricsRegistry, pid: int, requests: int, entries: int, load_seconds: float,
+                 latency: float) -> None:
+
+    """
+    Writes the snapshot another worker would have written, by filling the registry and renaming
+    its file to the worker's pid.
+    """
+
+    registry.reset()
+    counter, gauge, load_gauge, histogram = registry.metrics
+    counter.inc("/predict", amount=requests)
+    gauge.set(value=entries)
+    load_gauge.set("v1", value=load_seconds)
+    histogram.observe(value=latency)
+    registry.write_snapshot()
+    os.replace(registry._snapshot_file_path(os.getpid()), registry._snapshot_file_path(pid))
+    registry.reset()
+
+
+def test_render_adds_up_every_worker(tmp_path):
+    registry = make_registry(tmp_path)
+    write_worker(registry, 101, requests=3, entries=10, load_seconds=2.0, latency=0.05)
+    write_worker(registry, 102, requests=4, entries=5, load_seconds=3.0, latency=0.5)
+
+    values = registry.collect()
+
+    assert values["machine_predictive_requests_total"] == {("/predict",): 7}
+    assert values["machine_predictive_cache_entries"] == {(): 15}
+    assert values["machine_predictive_load_seconds"] == {("v1",): 3.0}
+    assert values["machine_predictive_latency_seconds"] == {(): [[1, 1, 0], 0.55, 2]}
+    assert 'machine_predictive_requests_total{route="/predict"} 7' in registry.render()
+
+
+def test_dead_workers_keep_their_counters_but_not_their_gauges(tmp_path):
+    registry = make_registry(tmp_path)
+    write_worker(registry, 101, requests=3, entries=10, load_seconds=2.0, latency=0.05)
+    write_worker(registry, 102, requests=4, entries=5, load_seconds=3.0, latency=0.5)
+
+    registry.mark_process_dead(101)
+
+    values = registry.collect()
+    assert not os.path.exists(registry._snapshot_file_path(101))
+    assert values["machine_predictive_requests_total"] == {("/predict",): 7}
+    assert values["machine_predictive_cache_entries"] == {(): 5}
+    assert values["machine_predictive_latency_seconds"][()][2] == 2
+
+
+def test_without_a_directory_only_own_values_are_rendered():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("requests_total", "Requests.", ()))
+    counter.inc(amount=2)
+
+    assert registry.collect() == {"machine_predictive_requests_total": {(): 2}}
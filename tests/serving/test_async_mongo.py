@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("motor")
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from machine_predictive_maintenance.entity.config_entity import MongoConfig
+from machine_predictive_maintenance.serving.async_mongo import AsyncMongoClient
+
+
+@pytest.fixture
+def mongo_client(monkeypatch):
+    monkeypatch.setenv("MONGO_DB_URL", "mongodb://localhost:27017")
+    # the client looks motor up when it connects, so the stand-in is picked up
+    monkeypatch.setattr("motor.motor_asyncio.AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient)
+    client = AsyncMongoClient(MongoConfig())
+    yield client
+    client.close()
+
+
+def test_ping(mongo_client):
+    assert asyncio.run(mongo_client.ping())
+
+
+def test_insert_predictions_writes_every_record(mongo_client):
+
+    async def scenario():
+        records = [{"Product ID": f"M{index}", "predicted_column": index % 2} for index in range(5)]
+        inserted = await mongo_client.insert_predictions(records)
+        collection = mongo_client.database[mongo_client.mongo_config.prediction_collection_name]
+        return inserted, await collection.count_documents({})
+
+    assert asyncio.run(scenario()) == (5, 5)
+
+
+def test_insert_predictions_skips_empty_batches(mongo_client):
+    assert asyncio.run(mongo_client.insert_predictions([])) == 0
+
+
+def test_find_machine_history_is_newest_first_and_limited(mongo_client):
+
+    async def scenario():
+        collection = mongo_client.database[mongo_client.mongo_config.collection_name]
+        await collection.insert_many([{"UDI": udi, "Product ID": "M1"} for udi in range(1, 6)]
+                                     + [{"UDI": 6, "Product ID": "M2"}])
+        return await mongo_client.find_machine_history("M1", limit=3)
+
+    history = asyncio.run(scenario())
+    assert [reading["UDI"] for reading in history] == [5, 4, 3]
+    assert all("_id" not in reading for reading in history)
@@ -0,0 +1,150 @@
+import sys
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pandas")
+errors = pytest.importorskip("pymongo.errors")
+
+from machine_predictive_maintenance.entity.config_entity import PredictionSinkConfig
+from machine_predictive_maintenance.exception.exception import MachinePredictiveMaintenanceException
+from machine_predictive_maintenance.monitoring.metrics import PREDICTION_SINK_RECORDS
+from machine_predictive_maintenance.serving.prediction_sink import BufferedPredictionSink
+
+
+class StubMongoClient:
+
+    """
+    Stands in for AsyncMongoClient: the first ``failures`` inserts raise ``error``, wrapped
+    the way AsyncMongoClient wraps driver errors.
+    """
+
+    def __init__(self, failures: int = 0, error: Exception = None):
+        self.mongo_config = SimpleNamespace(mongo_db_url="mongodb://stub")
+        self.failures = failures
+        self.error = error or errors.AutoReconnect("primary stepped down")
+        self.attempts = 0
+        self.inserted = []
+
+    async def insert_predictions(self, records: list) -> int:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            try:
+                raise self.error
+            except Exception as e:
+                raise MachinePredictiveMaintenanceException(e, sys)
+        self.inserted.extend(records)
+        return len(records)
+
+
+def make_config(**overrides) -> PredictionSinkConfig:
+    config = PredictionSinkConfig()
+    config.enabled = True
+    config.flush_size = 10
+    config.flush_interval_seconds = 60.0
+    config.max_buffered_records = 100
+    config.max_retries = 3
+    config.retry_backoff_seconds = 0.0
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return config
+
+
+def records(count: int) -> list:
+    return [{"Product ID": f"M{index}", "predicted_column": 0} for index in range(count)]
+
+
+def sink_count(status: str) -> float:
+    return PREDICTION_SINK_RECORDS._values.get((status,), 0)
+
+
+def test_transient_errors_are_retried():
+    client = StubMongoClient(failures=2)
+    sink = BufferedPredictionSink(client, make_config())
+    sink.add(records(5))
+
+    asyncio.run(sink.flush())
+
+    assert client.attempts == 3
+    assert len(client.inserted) == 5
+    assert sink.buffered == 0
+
+
+def test_batch_is_dropped_after_the_last_retry():
+    client = StubMongoClient(failures=10)
+    sink = BufferedPredictionSink(client, make_config(max_retries=2))
+    sink.add(records(4))
+    failed_before = sink_count("failed")
+
+    asyncio.run(sink.flush())
+
+    assert client.attempts == 3
+    assert client.inserted == []
+    assert sink_count("failed") - failed_before == 4
+
+
+def test_non_transient_errors_are_not_retried():
+    client = StubMongoClient(failures=1, error=errors.OperationFailure("document failed validation"))
+    sink = BufferedPredictionSink(client, make_config())
+    sink.add(records(3))
+
+    asyncio.run(sink.flush())
+
+    assert client.attempts == 1
+    assert client.inserted == []
+
+
+def test_records_beyond_the_buffer_bound_are_dropped():
+    sink = BufferedPredictionSink(StubMongoClient(), make_config(max_buffered_records=5))
+    dropped_before = sink_count("dropped")
+
+    assert sink.add(records(8)) == 5
+    assert sink.add(records(1)) == 0
+    assert sink.buffered == 5
+    assert sink_count("dropped") - dropped_before == 4
+
+
+def test_stop_flushes_the_remaining_records():
+    client = StubMongoClient()
+    sink = BufferedPredictionSink(client, make_config(flush_size=1000))
+
+    async def scenario():
+        sink.start()
+        sink.add(records(7))
+        # below flush_size and well within the flush interval: only stop writes them
+        await asyncio.sleep(0)
+        assert client.inserted == []
+        await sink.stop()
+
+    asyncio.run(scenario())
+
+    assert len(client.inserted) == 7
+    assert sink.buffered == 0
+
+
+def test_reaching_flush_size_wakes_the_background_task():
+    client = StubMongoClient()
+    sink = BufferedPredictionSink(client, make_config(flush_size=5))
+
+    async def scenario():
+        sink.start()
+        sink.add(records(5))
+        for _ in range(100):
+            if client.inserted:
+                break
+            await asyncio.sleep(0.01)
+        written = len(client.inserted)
+        await sink.stop()
+        return written
+
+    assert asyncio.run(scenario()) == 5
+
+
+def test_disabled_sink_accepts_nothing():
+    client = StubMongoClient()
+    client.mongo_config.mongo_db_url = None
+    sink = BufferedPredictionSink(client, make_config())
+
+    assert sink.add(records(3)) == 0
+    assert sink.buffered == 0
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from machine_predictive_maintenance.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from machine_predictive_maintenance.utils.main_utils.feature_engine import RollingFeatureEngine
+from machine_predictive_maintenance.utils.main_utils.utils import processing_test_data, read_yaml_file
+
+
+class IdentityPreprocessor:
+
+    """
+    Passes the features through unchanged, so the test compares the features themselves.
+    """
+
+    def __init__(self, feature_names: list):
+        self.feature_names_in_ = np.array(feature_names, dtype=object)
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        return X.to_numpy()
+
+
+@pytest.fixture
+def schema(tmp_path) -> tuple:
+    schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+    schema_config["rolling_features"]["enabled"] = True
+    schema_file_path = tmp_path / "schema.yaml"
+    schema_file_path.write_text(yaml.safe_dump(schema_config))
+    return schema_config, str(schema_file_path)
+
+
+@pytest.fixture
+def split() -> pd.DataFrame:
+
+    """
+    A shuffled split with more readings per machine than the rolling window holds.
+    """
+
+    rng = np.random.default_rng(0)
+    machines = ["M1", "L2", "H3", "M4"]
+    n_rows = len(machines) * 25
+    df = pd.DataFrame({
+        "UDI": np.arange(1, n_rows + 1),
+        "Product ID": [machines[index % len(machines)] for index in range(n_rows)],
+        "Type": rng.choice(["L", "M", "H"], n_rows),
+        "Air temperature [K]": rng.uniform(295, 305, n_rows).round(1),
+        "Process temperature [K]": rng.uniform(305, 315, n_rows).round(1),
+        "Rotational speed [rpm]": rng.integers(1200, 2800, n_rows),
+        "Torque [Nm]": rng.uniform(10, 70, n_rows).round(1),
+        "Tool wear [min]": rng.integers(0, 250, n_rows),
+        TARGET_COLUMN: rng.integers(0, 2, n_rows),
+        "Failure Type": "No Failure",
+    })
+    return df.sample(frac=1, random_state=0)
+
+
+def stream(events: pd.DataFrame, schema_file_path: str, feature_engine: RollingFeatureEngine,
+           preprocessor: IdentityPreprocessor, batch_size: int) -> pd.DataFrame:
+    batches = [events.iloc[start:start + batch_size] for start in range(0, len(events), batch_size)]
+    return pd.concat([processing_test_data(data=batch, schema_file=schema_file_path, preprocessor=preprocessor,
+                                           feature_engine=feature_engine)
+                      for batch in batches], ignore_index=True)
+
+
+@pytest.mark.parametrize("batch_size", [1, 7])
+def test_streaming_a_split_reproduces_the_batch_rolling_features(schema, split, batch_size):
+    schema_config, schema_file_path = schema
+    expected = RollingFeatureEngine.from_schema(schema_config).transform(split).sort_values("UDI")
+
+    events = split.sort_values("UDI").drop(columns=[TARGET_COLUMN])
+    feature_engine = RollingFeatureEngine.from_schema(schema_config)
+    feature_names = feature_engine.feature_names
+    streamed = stream(events, schema_file_path, feature_engine, IdentityPreprocessor(feature_names), batch_size)
+
+    np.testing.assert_allclose(streamed[feature_names].to_numpy(dtype=float),
+                               expected[feature_names].to_numpy(dtype=float))
+
+
+def test_streaming_a_split_reproduces_get_input_features(schema, split):
+    pytest.importorskip("sklearn")
+    from machine_predictive_maintenance.components.data_transformation import DataTransformation
+
+    schema_config, schema_file_path = schema
+    expected = DataTransformation(None, None, schema_config=schema_config).get_input_features(split)
+    expected = expected.loc[split.sort_values("UDI").index]
+
+    events = split.sort_values("UDI").drop(columns=[TARGET_COLUMN])
+    streamed = stream(events, schema_file_path, RollingFeatureEngine.from_schema(schema_config),
+                      IdentityPreprocessor(list(expected.columns)), batch_size=1)
+
+    assert list(streamed.columns) == list(expected.columns)
+    for column in expected.columns:
+        if pd.api.types.is_numeric_dtype(expected[column]):
+            np.testing.assert_allclose(streamed[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float))
+        else:
+            assert streamed[column].tolist() == expected[column].tolist()
+
+
+def test_a_new_model_version_clears_the_history(schema, split):
+    schema_config, _ = schema
+    feature_engine = RollingFeatureEngine.from_schema(schema_config)
+
+    feature_engine.reset_for("v1")
+    feature_engine.transform(split.head(8))
+    feature_engine.reset_for("v1")
+    assert feature_engine.tracked_machines == 4
+
+    feature_engine.reset_for("v2")
+    assert feature_engine.tracked_machines == 0